@@ -3,6 +3,9 @@ from dateutil.tz import gettz
 from django.apps import AppConfig as DjangoAppConfig
 from django.conf import settings
 from django.core.management.color import color_style
+from django.utils.module_loading import import_string
+
+from .constants import FIRST_DOSE, SECOND_DOSE
 
 style = color_style()
 
@@ -11,6 +14,20 @@ class AppConfig(DjangoAppConfig):
     name = 'esr21_subject_validation'
     verbose_name = 'ESR21 Subject Validation'
 
+    def ready(self):
+        from .form_validators.instrumentation import register_sink
+        from .signals import connect_receivers
+
+        connect_receivers()
+
+        # e.g. ESR21_VALIDATION_SINKS = [
+        #     'esr21_subject_validation.form_validators.instrumentation.LoggingSink',
+        #     ('esr21_subject_validation.form_validators.instrumentation.FileSink',
+        #      {'path': '/var/log/esr21/validation.jsonl'})]
+        for sink in getattr(settings, 'ESR21_VALIDATION_SINKS', []):
+            sink, options = (sink, {}) if isinstance(sink, str) else sink
+            register_sink(import_string(sink)(**options))
+
 
 if settings.APP_NAME == 'esr21_subject_validation':
     from edc_protocol.apps import AppConfig as BaseEdcProtocolAppConfigs
@@ -24,3 +41,5 @@ if settings.APP_NAME == 'esr21_subject_validation':
             2021, 4, 15, 0, 0, 0, tzinfo=gettz('UTC'))
         study_close_datetime = datetime(
             2025, 12, 1, 0, 0, 0, tzinfo=gettz('UTC'))
+        # (min days, max days) between doses, see form_validators.dose_windows
+        dose_windows = {(FIRST_DOSE, SECOND_DOSE): (56, None)}
@@ -0,0 +1,2 @@
+from .runner import (
+    compare, load_baseline, measure, run_benchmarks, save_baseline, Regression)
@@ -0,0 +1,43 @@
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+
+PACKAGE = 'esr21_subject_validation.form_validators'
+
+# Run in a fresh interpreter, prints the seconds taken to set up Django
+# and import the package, and optionally every name it exports.
+script = """
+import time
+start = time.perf_counter()
+import django
+django.setup()
+import {package} as package
+if {eager}:
+    for name in package.__all__:
+        getattr(package, name)
+print(time.perf_counter() - start)
+"""
+
+
+def time_import(eager=False, package=PACKAGE):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+    output = subprocess.run(
+        [sys.executable, '-c', script.format(package=package, eager=eager)],
+        env=env, check=True, capture_output=True, text=True).stdout
+    return float(output.split()[-1])
+
+
+def measure_import_time(repeat=5, package=PACKAGE):
+    """Returns the median seconds for a new process to set up Django and
+    import `package`, lazily ('lazy') and with every exported name
+    loaded ('eager'), i.e. what a worker pays at boot with lazy loading
+    and what it paid when the package imported every validator.
+    """
+    return {
+        'lazy': statistics.median(
+            time_import(package=package) for _ in range(repeat)),
+        'eager': statistics.median(
+            time_import(eager=True, package=package) for _ in range(repeat))}
@@ -0,0 +1,137 @@
+import gc
+import json
+import platform
+import statistics
+import time
+from collections import namedtuple
+
+import django
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from edc_base.utils import get_utcnow
+
+Regression = namedtuple('Regression', 'name metric baseline current')
+
+# Metrics compared against a baseline and whether a run regresses when
+# the metric goes up (latency, queries) or down (throughput).
+compared_metrics = {
+    'p50_ms': True,
+    'p95_ms': True,
+    'ops_per_sec': False,
+    'queries_per_call': True}
+
+
+def validate(validator_cls, cleaned_data):
+    """Validates `cleaned_data` once and returns True if it is valid.
+    """
+    try:
+        validator_cls(cleaned_data=cleaned_data).validate()
+    except ValidationError:
+        return False
+    return True
+
+
+def measure(validator_cls, cleaned_data, iterations=200, warmup=20,
+            query_iterations=20):
+    """Returns the timings of validating `cleaned_data` with
+    `validator_cls` `iterations` times.
+
+    Queries are counted in a separate run of `query_iterations` calls
+    so that capturing them does not add to the timings.
+    """
+    for _ in range(warmup):
+        validate(validator_cls, cleaned_data)
+
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(query_iterations):
+            valid = validate(validator_cls, cleaned_data)
+
+    timings = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            validate(validator_cls, cleaned_data)
+            timings.append(time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    percentiles = statistics.quantiles(timings, n=100, method='inclusive')
+    return {
+        'valid': valid,
+        'iterations': iterations,
+        'ops_per_sec': round(len(timings) / sum(timings), 1),
+        'mean_ms': round(statistics.mean(timings) * 1000, 4),
+        'p50_ms': round(percentiles[49] * 1000, 4),
+        'p95_ms': round(percentiles[94] * 1000, 4),
+        'p99_ms': round(percentiles[98] * 1000, 4),
+        'queries_per_call': round(len(queries) / query_iterations, 2)}
+
+
+def run_benchmarks(scenarios, iterations=200, warmup=20, names=None):
+    """Runs the valid and invalid payload of each scenario and returns
+    the results keyed by `<validator>.valid` and `<validator>.invalid`.
+
+    The `valid` result of each benchmark records whether the payload
+    validated, so a payload that no longer exercises the path it was
+    written for shows up in the results.
+    """
+    results = {}
+    for name, scenario in sorted(scenarios.items()):
+        if names and name not in names:
+            continue
+        for payload in ['valid', 'invalid']:
+            result = measure(
+                scenario.validator_cls, getattr(scenario, payload),
+                iterations=iterations, warmup=warmup)
+            result['expected'] = payload == 'valid'
+            results[f'{name}.{payload}'] = result
+    return {
+        'meta': {
+            'created': get_utcnow().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'iterations': iterations},
+        'results': results}
+
+
+def save_baseline(run, path):
+    with open(path, 'w') as f:
+        json.dump(run, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, run, tolerance=0.10):
+    """Returns a list of Regressions, a metric of a benchmark in `run`
+    that is more than `tolerance` worse than in `baseline`. Any
+    increase in queries per call is a regression.
+
+    Benchmarks missing from either run are not compared.
+    """
+    regressions = []
+    baseline_results = baseline.get('results', {})
+    for name, result in sorted(run.get('results', {}).items()):
+        baseline_result = baseline_results.get(name)
+        if not baseline_result:
+            continue
+        for metric, higher_is_worse in compared_metrics.items():
+            before, after = baseline_result.get(metric), result.get(metric)
+            if before is None or after is None:
+                continue
+            if metric == 'queries_per_call':
+                regressed = after > before
+            elif higher_is_worse:
+                regressed = after > before * (1 + tolerance)
+            else:
+                regressed = after < before * (1 - tolerance)
+            if regressed:
+                regressions.append(Regression(name, metric, before, after))
+    return regressions
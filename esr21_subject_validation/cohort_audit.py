@@ -0,0 +1,162 @@
+"""Audits the vaccination details of the whole cohort against the dose
+rules of VaccineDetailsFormValidator without instantiating it, e.g. for
+DSMB reports, see the `audit_cohort` management command.
+
+The rows are read as columns, from the database with one `values_list`
+query per model or from a CSV export with the same column names, and
+each rule is a comparison over those columns:
+
+    validate_second_dose_dt: the first dose is captured, and the second
+        dose is not before it and within the dose window. A booster
+        dose is within its window if one is configured, see dose_windows.
+    validate_next_vaccination_dt: the next vaccination date is not
+        before the window of the next dose.
+    validate_expiry_dt_against_visit_dt: the expiry date is not before
+        the visit date.
+
+As in the validator, the second dose rules apply to the follow up
+schedules and to subjects whose vaccination history has no vaccine
+received before enrolment.
+
+Violations are written as the rows of a revalidate_crfs report.
+"""
+import csv
+
+from django.utils.dateparse import parse_date, parse_datetime
+from edc_constants.constants import NO
+
+from .constants import BOOSTER_DOSE, FIRST_DOSE, SECOND_DOSE
+from .form_validators.dose_windows import DoseWindows, as_date
+from .form_validators.model_resolver import get_model
+from .form_validators.rule_codes import (
+    VAX_BOOSTER_OUTSIDE_WINDOW, VAX_EXPIRY_BEFORE_VISIT, VAX_FIRST_DOSE_MISSING,
+    VAX_NEXT_BEFORE_WINDOW, VAX_SECOND_BEFORE_FIRST, VAX_SECOND_OUTSIDE_WINDOW)
+from .revalidation import has_field, report_fields
+
+columns = ['pk', 'subject_identifier', 'received_dose_before', 'vaccination_date',
+           'next_vaccination_date', 'expiry_date', 'visit_datetime',
+           'schedule_name', 'received_vaccine']
+
+lookups = {
+    'subject_identifier': 'subject_visit__subject_identifier',
+    'visit_datetime': 'subject_visit__report_datetime',
+    'schedule_name': 'subject_visit__appointment__schedule_name'}
+
+fu_schedule_names = ['esr21_fu_schedule', 'esr21_sub_fu_schedule']
+
+
+def load_rows(validator_cls=None):
+    """Returns the audited columns of every vaccination details row of
+    the models of `validator_cls`, by default VaccineDetailsFormValidator,
+    as a list of dictionaries.
+    """
+    if validator_cls is None:
+        from .form_validators import VaccineDetailsFormValidator as validator_cls
+    details_model_cls = get_model(validator_cls.vaccination_details_cls)
+    history_model_cls = get_model(validator_cls.vaccination_history_cls)
+
+    names = [name for name in columns[:-1]
+             if name in lookups or has_field(details_model_cls, name)]
+    received_vaccine = dict(history_model_cls._default_manager.values_list(
+        'subject_identifier', 'received_vaccine'))
+    rows = []
+    for values in details_model_cls._default_manager.values_list(
+            *[lookups.get(name, name) for name in names]).iterator():
+        row = dict.fromkeys(columns)
+        row.update(zip(names, values))
+        row['received_vaccine'] = received_vaccine.get(row['subject_identifier'])
+        rows.append(row)
+    return rows
+
+
+def read_rows(path):
+    """Returns the rows of a CSV export with a header of `columns`,
+    missing columns being empty.
+    """
+    rows = []
+    with open(path, newline='') as f:
+        for record in csv.DictReader(f):
+            row = {name: record.get(name) or None for name in columns}
+            for name in ['vaccination_date', 'visit_datetime']:
+                if row[name]:
+                    row[name] = parse_datetime(row[name]) or parse_date(row[name])
+            for name in ['next_vaccination_date', 'expiry_date']:
+                if row[name]:
+                    row[name] = parse_date(row[name])
+            rows.append(row)
+    return rows
+
+
+def audit_cohort(rows, dose_windows=None, model_label=''):
+    """Returns the report rows, see revalidation.report_fields, of the
+    violations of `rows`, dictionaries of `columns`.
+    """
+    dose_windows = dose_windows or DoseWindows.from_protocol()
+    dates = {}
+    for row in rows:
+        dates.setdefault(row['subject_identifier'], {})[
+            row['received_dose_before']] = as_date(row['vaccination_date'])
+
+    violations = []
+
+    def violation(row, field, rule, code, message):
+        violations.append([model_label, row['pk'], row['subject_identifier'],
+                           field, rule, code, message])
+
+    for row in rows:
+        dose = row['received_dose_before']
+        vaccination_date = as_date(row['vaccination_date'])
+        subject_dates = dates[row['subject_identifier']]
+
+        second_dose_rules = (row['schedule_name'] in fu_schedule_names
+                             or row['received_vaccine'] == NO)
+        if second_dose_rules and vaccination_date and dose == SECOND_DOSE:
+            first_dose_date = subject_dates.get(FIRST_DOSE)
+            if not first_dose_date:
+                violation(row, 'received_dose_before', 'validate_second_dose_dt',
+                          VAX_FIRST_DOSE_MISSING,
+                          'Please capture the first dose vaccination details, '
+                          'before second dose vaccination.')
+            elif (vaccination_date < first_dose_date or dose_windows.check(
+                    FIRST_DOSE, first_dose_date, SECOND_DOSE, vaccination_date)
+                    is not None):
+                violation(row, 'vaccination_date', 'validate_second_dose_dt',
+                          (VAX_SECOND_BEFORE_FIRST if vaccination_date < first_dose_date
+                           else VAX_SECOND_OUTSIDE_WINDOW),
+                          'Please make sure the second dose vaccination date '
+                          'is not before the first dose vaccination date or '
+                          'the before the vaccination window period.')
+        elif second_dose_rules and vaccination_date and dose == BOOSTER_DOSE:
+            if dose_windows.check(
+                    SECOND_DOSE, subject_dates.get(SECOND_DOSE),
+                    BOOSTER_DOSE, vaccination_date) is not None:
+                violation(row, 'vaccination_date', 'validate_second_dose_dt',
+                          VAX_BOOSTER_OUTSIDE_WINDOW,
+                          'Please make sure the booster dose vaccination date '
+                          'is within the vaccination window period after the '
+                          'second dose.')
+
+        following = dose_windows.following(dose)
+        if following and vaccination_date and row['next_vaccination_date']:
+            _, window = following
+            if (window.min_days and
+                    (row['next_vaccination_date'] - vaccination_date).days
+                    < window.min_days):
+                violation(row, 'next_vaccination_date', 'validate_next_vaccination_dt',
+                          VAX_NEXT_BEFORE_WINDOW,
+                          'The next vaccination date cannot be before the '
+                          'vaccination window period.')
+
+        visit_date = as_date(row['visit_datetime'])
+        if row['expiry_date'] and visit_date and row['expiry_date'] < visit_date:
+            violation(row, 'expiry_date', 'validate_expiry_dt_against_visit_dt',
+                      VAX_EXPIRY_BEFORE_VISIT,
+                      f'Expiry date cannot be before the visit date. {visit_date}.')
+    return violations
+
+
+def write_report(violations, report):
+    with open(report, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(report_fields)
+        writer.writerows(violations)
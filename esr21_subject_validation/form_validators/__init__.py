@@ -1,29 +1,86 @@
-from .adverse_event_record_form_validator import AdverseEventRecordFormValidator
-from .concomitant_medication_form_validator import ConcomitantMedicationFormValidator
-from .covid19_symptomatic_infections_form_validator import \
-    Covid19SymptomaticInfectionsFormValidator
-from .demographics_data_form_validator import DemographicsDataFormValidator
-from .eligibility_confirmation_validator import EligibilityConfirmationFormValidator
-from .hospitalisation_form_validator import HospitalisationFormValidator
-from .informed_consent_validator import InformedConsentFormValidator
-from .medical_history_form_validator import MedicalHistoryFormValidator
-from .personal_contact_information_form_validator import \
-    PersonalContactInformationFormValidator
-from .physical_exam_form_validator import PhysicalFormValidator
-from .preg_outcome_form_validator import OutcomeInlineFormValidator
-from .pregnancy_status_form_validator import PregnancyStatusFormValidator
-from .pregnancy_test_form_validator import PregnancyTestFormValidator
-from .rapid_hiv_testing_form_validator import RapidHivTestingFormValidator
-from .screening_eligibility_form_validator import ScreeningEligibilityFormValidator
-from .serious_adverse_event_record_form_validator import \
-    SeriousAdverseEventRecordFormValidator
-from .special_interest_ae_record_form_validator import \
-    SpecialInterestAERecordFormValidator
-from .subject_requisition_form_validator import SubjectRequisitionFormValidator
-from .targeted_physical_exam_form_validator import TargetedPhysicalExamFormValidator
-from .vaccination_details_form_validator import VaccineDetailsFormValidator
-from .vaccination_history_form_validator import VaccinationHistoryFormValidator
-from .vital_signs_form_validator import VitalSignsFormValidator
-from .protocol_deviations_form_validator import ProtocolDeviationFormValidator
+"""The ESR21 form validators.
 
+Each name is imported from its module on first access (PEP 562), so
+importing this package, e.g. while Django loads the app, does not import
+every validator and their dependencies.
+"""
+from importlib import import_module
 
+exports = {
+    'AdverseEventRecordFormValidator': 'adverse_event_record_form_validator',
+    'ConcomitantMedicationFormValidator': 'concomitant_medication_form_validator',
+    'Covid19SymptomaticInfectionsFormValidator':
+        'covid19_symptomatic_infections_form_validator',
+    'DemographicsDataFormValidator': 'demographics_data_form_validator',
+    'EligibilityConfirmationFormValidator': 'eligibility_confirmation_validator',
+    'HospitalisationFormValidator': 'hospitalisation_form_validator',
+    'InformedConsentFormValidator': 'informed_consent_validator',
+    'MedicalHistoryFormValidator': 'medical_history_form_validator',
+    'PersonalContactInformationFormValidator':
+        'personal_contact_information_form_validator',
+    'PhysicalFormValidator': 'physical_exam_form_validator',
+    'OutcomeInlineFormValidator': 'preg_outcome_form_validator',
+    'PregnancyStatusFormValidator': 'pregnancy_status_form_validator',
+    'PregnancyTestFormValidator': 'pregnancy_test_form_validator',
+    'RapidHivTestingFormValidator': 'rapid_hiv_testing_form_validator',
+    'ScreeningEligibilityFormValidator': 'screening_eligibility_form_validator',
+    'SeriousAdverseEventRecordFormValidator':
+        'serious_adverse_event_record_form_validator',
+    'SpecialInterestAERecordFormValidator':
+        'special_interest_ae_record_form_validator',
+    'SubjectRequisitionFormValidator': 'subject_requisition_form_validator',
+    'TargetedPhysicalExamFormValidator': 'targeted_physical_exam_form_validator',
+    'VaccineDetailsFormValidator': 'vaccination_details_form_validator',
+    'VaccinationHistoryFormValidator': 'vaccination_history_form_validator',
+    'VitalSignsFormValidator': 'vital_signs_form_validator',
+    'ProtocolDeviationFormValidator': 'protocol_deviations_form_validator',
+
+    'SubjectContext': 'subject_context',
+    'OverlaySubjectContext': 'subject_context',
+    'Repository': 'repositories',
+    'OrmRepository': 'repositories',
+    'InMemoryRepository': 'repositories',
+    'OverlayRepository': 'repositories',
+    'ValidationResult': 'batch_validation',
+    'validate_many': 'batch_validation',
+    'validate_formset': 'batch_validation',
+    'DataLoader': 'data_loader',
+    'DoseWindows': 'dose_windows',
+    'audit_dose_windows': 'dose_windows',
+    'RuleError': 'rule_runner_mixin',
+    'RuleTable': 'rule_table',
+    'REQUIRED_IF': 'rule_table',
+    'NOT_REQUIRED_IF': 'rule_table',
+    'APPLICABLE_IF': 'rule_table',
+    'register_sink': 'instrumentation',
+    'unregister_sink': 'instrumentation',
+    'FileSink': 'instrumentation',
+    'InMemoryAggregator': 'instrumentation',
+    'LoggingSink': 'instrumentation',
+    'ColumnComparison': 'sql_pushdown',
+    'find_violations': 'sql_pushdown',
+    'DependencyGraph': 'dependency_graph',
+    'get_graph': 'dependency_graph',
+    'LRUResultCache': 'result_cache',
+    'SQLiteResultCache': 'result_cache',
+    'PURE': 'rule_planner',
+    'QUERY': 'rule_planner',
+    'AGGREGATE': 'rule_planner',
+    'refine_rule_costs': 'rule_planner',
+}
+
+__all__ = list(exports)
+
+
+def __getattr__(name):
+    try:
+        module = exports[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
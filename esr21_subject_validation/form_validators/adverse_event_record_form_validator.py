@@ -1,19 +1,29 @@
-from django.core.exceptions import ValidationError
 from edc_constants.constants import YES
 from edc_form_validators import FormValidator
 
+from .rule_codes import AE_END_BEFORE_START
+from .rule_runner_mixin import RuleRunnerMixin
+from .rule_table import REQUIRED_IF, RuleTable
+from .sql_pushdown import ColumnComparison
 
-class AdverseEventRecordFormValidator(FormValidator):
+
+class AdverseEventRecordFormValidator(RuleRunnerMixin, FormValidator):
+
+    # validate_ae_end_date as columns, see sql_pushdown.find_violations
+    column_rules = (
+        *RuleTable(('status', 'resolved', 'stop_date', REQUIRED_IF)),
+        ColumnComparison('validate_ae_end_date', 'stop_date', 'lt', 'start_date'))
 
     def clean(self):
-        cleaned_data = self.cleaned_data
-        self.validate_ae_end_date(cleaned_data=cleaned_data)
-        self.validate_outcome()
-        self.validate_maae()
-        self.validate_treatment_given()
-        self.validate_discontinuation()
+        self.run_rules(
+            self.validate_ae_end_date,
+            self.validate_outcome,
+            self.validate_maae,
+            self.validate_treatment_given,
+            self.validate_discontinuation)
 
     def validate_ae_end_date(self, cleaned_data=None):
+        cleaned_data = cleaned_data or self.cleaned_data
         self.required_if(
             'resolved',
             field='status',
@@ -24,10 +34,9 @@ class AdverseEventRecordFormValidator(FormValidator):
         end_date = cleaned_data.get('stop_date', None)
 
         if end_date and end_date < start_date:
-            message = {'stop_date':
-                       'AE end date can not be before AE start date'}
-            self._errors.update(message)
-            raise ValidationError(message)
+            self.raise_validation_error(
+                'AE end date can not be before AE start date',
+                AE_END_BEFORE_START, field='stop_date')
 
     def validate_outcome(self):
         self.required_if(
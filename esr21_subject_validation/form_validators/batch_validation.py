@@ -0,0 +1,128 @@
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+
+from .subject_context import SubjectContext
+
+
+class ValidationResult:
+    """The outcome of validating one cleaned_data record.
+
+    `errors` is a dictionary of field name to a list of messages.
+    `rule_errors` lists every failing rule if the record was validated
+    with `collect=True`.
+    """
+
+    def __init__(self, cleaned_data=None, errors=None, rule_errors=None):
+        self.cleaned_data = cleaned_data
+        self.errors = errors or {}
+        self.rule_errors = rule_errors or []
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(errors={self.errors})'
+
+    @property
+    def valid(self):
+        return not self.errors
+
+    @property
+    def records(self):
+        """Returns the compact (code, field, severity, params) of each
+        failing rule, if validated with `collect=True`, see RuleError.
+        """
+        return [rule_error.record() for rule_error in self.rule_errors]
+
+
+def subject_key(cleaned_data):
+    """Returns the identifier records are grouped on.
+    """
+    subject_visit = cleaned_data.get('subject_visit')
+    return (getattr(subject_visit, 'subject_identifier', None)
+            or cleaned_data.get('subject_identifier')
+            or cleaned_data.get('screening_identifier')
+            or '')
+
+
+def validate_one(validator_cls, cleaned_data, collect=False):
+    form_validator = validator_cls(cleaned_data=cleaned_data)
+    if collect:
+        rule_errors = form_validator.collect_errors()
+        errors = {}
+        for rule_error in rule_errors:
+            errors.setdefault(rule_error.field, []).append(rule_error.message)
+        return ValidationResult(cleaned_data, errors, rule_errors)
+    try:
+        form_validator.validate()
+    except ValidationError as e:
+        if hasattr(e, 'error_dict'):
+            return ValidationResult(cleaned_data, e.message_dict)
+        return ValidationResult(cleaned_data, {NON_FIELD_ERRORS: e.messages})
+    return ValidationResult(cleaned_data)
+
+
+def validate_many(validator_cls, records, batch_size=500, collect=False,
+                  cache=None, *, repository=None):
+    """Validates each of `records`, cleaned_data dictionaries, with
+    `validator_cls` and returns a list of ValidationResults in the same
+    order as `records`.
+
+    Records are grouped by subject and validated `batch_size` at a time.
+    Each batch shares one SubjectContext that the validator's `prefetch`
+    classmethod fills with `IN` queries before any record is validated.
+
+    If `collect` is True every rule is run and all errors of a record
+    are returned, see RuleRunnerMixin.collect_errors().
+
+    Given a result cache, see result_cache, cached results are returned
+    as is and only the other records are prefetched and validated.
+
+    Rows are read from `repository`, see repositories, by default the
+    database.
+    """
+    records = list(records)
+    results = [None] * len(records)
+    if cache:
+        # subject visits given by primary key are loaded to key the results
+        with SubjectContext(repository=repository) as subject_context:
+            prefetch_subject_visits = getattr(
+                validator_cls, 'prefetch_subject_visits', None)
+            if prefetch_subject_visits:
+                prefetch_subject_visits(subject_context, records)
+            results = [cache.get(validator_cls, cleaned_data, collect, subject_context)
+                       for cleaned_data in records]
+    order = sorted((i for i, result in enumerate(results) if result is None),
+                   key=lambda i: subject_key(records[i]))
+    prefetch = getattr(validator_cls, 'prefetch', None)
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        with SubjectContext(repository=repository) as subject_context:
+            if prefetch:
+                prefetch(subject_context, [records[index] for index in batch])
+            for index in batch:
+                results[index] = validate_one(
+                    validator_cls, records[index], collect=collect)
+                if cache:
+                    cache.set(validator_cls, records[index], results[index],
+                              collect, subject_context)
+    return results
+
+
+def validate_formset(validator_cls, formset, collect=False, add_errors=True):
+    """Validates the forms of `formset`, or a list of forms, as one batch
+    so the rows the forms look up, e.g. their subject visits, are loaded
+    with one `IN` query per model, see validate_many().
+
+    Forms without cleaned_data, and those marked for deletion, are
+    skipped. If `add_errors` is True each form's errors are added to it.
+
+    Returns a list of (form, ValidationResult).
+    """
+    forms = [form for form in formset
+             if getattr(form, 'cleaned_data', None)
+             and not form.cleaned_data.get('DELETE')]
+    results = validate_many(
+        validator_cls, [form.cleaned_data for form in forms],
+        batch_size=len(forms) or 1, collect=collect)
+    if add_errors:
+        for form, result in zip(forms, results):
+            for field, messages in result.errors.items():
+                form.add_error(field if field in form.fields else None, messages)
+    return list(zip(forms, results))
@@ -1,3 +1,5 @@
+from functools import partial
+
 from edc_form_validators import FormValidator
 from .crf_form_validator import CRFFormValidator
 
@@ -6,10 +8,9 @@ class ConcomitantMedicationFormValidator(CRFFormValidator, FormValidator):
 
     def clean(self):
 
-        self.validate_other_specify(field='unit')
-
-        self.validate_other_specify(field='frequency')
-
-        self.validate_other_specify(field='route')
+        self.run_rules(
+            partial(self.validate_other_specify, field='unit'),
+            partial(self.validate_other_specify, field='frequency'),
+            partial(self.validate_other_specify, field='route'))
 
         super().clean()
@@ -2,16 +2,19 @@ from edc_constants.choices import YES
 from edc_constants.constants import OTHER
 from edc_form_validators import FormValidator
 
+from .rule_runner_mixin import RuleRunnerMixin
 
-class Covid19SymptomaticInfectionsFormValidator(FormValidator):
+
+class Covid19SymptomaticInfectionsFormValidator(RuleRunnerMixin, FormValidator):
 
     def clean(self):
         super().clean()
         
-        self.validate_m2m_required()
-        self.validate_other_specify()
-        self.validate_date_of_infection_required()
-        self.validate_hospital_visit_date_required()
+        self.run_rules(
+            self.validate_m2m_required,
+            self.validate_other_specify,
+            self.validate_date_of_infection_required,
+            self.validate_hospital_visit_date_required)
         
     def validate_other_specify(self):
          
@@ -1,23 +1,88 @@
-from django import forms
+from django.db import models
+from django.db.models import prefetch_related_objects
 # from django.apps import apps as django_apps
 # from edc_action_item.site_action_items import site_action_items
 # from edc_constants.constants import NO, NEW
 # from esr21_prn.action_items import CAREGIVEROFF_STUDY_ACTION
 
+from .model_resolver import get_model
+from .rule_codes import CRF_REPORT_BEFORE_VISIT
+from .rule_runner_mixin import RuleRunnerMixin
+from .subject_context import SubjectContextMixin
 
-class CRFFormValidator:
+
+class CRFFormValidator(SubjectContextMixin, RuleRunnerMixin):
+
+    subject_visit_model = 'esr21_subject.subjectvisit'
+
+    # label attributes of the models the rules read, and their fields
+    reads = {'subject_visit_model': ('report_datetime', 'appointment')}
+
+    rule_fields = {
+        'validate_against_visit_datetime': ('report_datetime', 'subject_visit')}
+
+    @classmethod
+    def subject_visit_loader(cls, subject_context):
+        return subject_context.loader(
+            get_model(cls.subject_visit_model), select_related=('appointment', ))
+
+    @classmethod
+    def prefetch(cls, subject_context, records):
+        """Loads the subject visits of `records` given by primary key,
+        and their appointments, with one query.
+        """
+        subject_visits = [cleaned_data.get('subject_visit') for cleaned_data in records]
+        keys = [subject_visit for subject_visit in subject_visits
+                if subject_visit is not None
+                and not isinstance(subject_visit, models.Model)]
+        if keys:
+            loader = cls.subject_visit_loader(subject_context)
+            loader.want(*keys)
+            loader.dispatch()
+
+    @classmethod
+    def prefetch_subject_visits(cls, subject_context, records):
+        """Returns the subject visits of `records`, given by primary key
+        or, as a ModelForm cleans them, as instances, with their
+        appointments loaded with one query.
+        """
+        subject_visits = [cleaned_data.get('subject_visit') for cleaned_data in records]
+        cls.subject_visit_loader(subject_context).load_many(
+            [subject_visit for subject_visit in subject_visits
+             if not isinstance(subject_visit, models.Model)])
+        subject_visits = [
+            cls.resolve_subject_visit(subject_context, subject_visit)
+            for subject_visit in subject_visits]
+        prefetch_related_objects(
+            [subject_visit for subject_visit in subject_visits if subject_visit],
+            'appointment')
+        return subject_visits
+
+    @classmethod
+    def resolve_subject_visit(cls, subject_context, subject_visit):
+        """Returns the subject visit, loaded through the subject context
+        if given by primary key.
+        """
+        if subject_visit is None or isinstance(subject_visit, models.Model):
+            return subject_visit
+        return cls.subject_visit_loader(subject_context).load(subject_visit)
+
+    @property
+    def subject_visit(self):
+        return self.resolve_subject_visit(
+            self.subject_context, self.cleaned_data.get('subject_visit'))
 
     def clean(self):
-        self.validate_against_visit_datetime(
-            self.cleaned_data.get('report_datetime'))
+        self.run_rules(self.validate_against_visit_datetime)
         super().clean()
 
-    def validate_against_visit_datetime(self, report_datetime):
-        
+    def validate_against_visit_datetime(self, report_datetime=None):
+        report_datetime = report_datetime or self.cleaned_data.get('report_datetime')
         if (report_datetime and report_datetime <
-                self.cleaned_data.get('subject_visit').report_datetime):
-            raise forms.ValidationError(
-                "Report datetime cannot be before visit datetime.")
+                self.subject_visit.report_datetime):
+            self.raise_validation_error(
+                'Report datetime cannot be before visit datetime.',
+                CRF_REPORT_BEFORE_VISIT)
 
     # def validate_offstudy_model(self):
         # caregiver_offstudy_cls = django_apps.get_model(
@@ -0,0 +1,78 @@
+from .repositories import OrmRepository
+
+
+class DataLoader:
+    """Loads the rows of a model by a key field, e.g. the subject visits
+    of every form of a formset by primary key.
+
+    Keys are collected with `want()` as each record is looked at and
+    the rows are loaded with one `IN` query the first time one of them
+    is needed, for example:
+
+        loader = DataLoader(SubjectVisit, select_related=('appointment', ))
+        loader.want(*[cleaned_data['subject_visit'] for cleaned_data in records])
+        subject_visit = loader.load(records[0]['subject_visit'])
+
+    Keys are converted by the key field, so a UUID primary key may be
+    given as a string. Rows are read from `repository`, by default the
+    database.
+    """
+
+    def __init__(self, model_cls, field='pk', select_related=(), *,
+                 repository=None):
+        self.model_cls = model_cls
+        self.repository = repository or OrmRepository()
+        self.field = field
+        self.select_related = select_related
+        self.key_field = (model_cls._meta.pk if field == 'pk'
+                          else model_cls._meta.get_field(field))
+        self.wanted = set()
+        self.rows = {}
+
+    def to_key(self, key):
+        return self.key_field.to_python(key)
+
+    def want(self, *keys):
+        keys = (self.to_key(key) for key in keys if key is not None)
+        self.wanted.update(key for key in keys if key not in self.rows)
+
+    def dispatch(self):
+        """Loads the wanted rows, keys without a row load as None.
+        """
+        if not self.wanted:
+            return
+        keys, self.wanted = self.wanted, set()
+        rows = dict.fromkeys(keys)
+        for obj in self.repository.filter(
+                self.model_cls, select_related=self.select_related,
+                **{f'{self.field}__in': keys}):
+            rows[getattr(obj, self.key_field.attname)] = obj
+        self.rows.update(rows)
+
+    def load(self, key):
+        """Returns the row of `key` or None, loading it together with
+        every wanted row if not loaded yet.
+        """
+        if key is None:
+            return None
+        key = self.to_key(key)
+        if key not in self.rows:
+            self.want(key)
+            self.dispatch()
+        return self.rows.get(key)
+
+    def load_many(self, keys):
+        keys = [None if key is None else self.to_key(key) for key in keys]
+        self.want(*keys)
+        self.dispatch()
+        return [self.rows.get(key) for key in keys]
+
+    def prime(self, objs):
+        """Adds rows already loaded, or not saved yet.
+        """
+        for obj in objs:
+            self.rows[getattr(obj, self.key_field.attname)] = obj
+
+    def clear(self):
+        self.wanted = set()
+        self.rows = {}
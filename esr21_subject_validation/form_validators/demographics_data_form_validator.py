@@ -1,10 +1,14 @@
-from django.core.exceptions import ValidationError
+from functools import partial
+
 from edc_constants.choices import NO
 from edc_form_validators import FormValidator
 from django import forms
 
+from .rule_codes import DEMOGRAPHICS_HOUSEHOLD_MEMBERS_NEGATIVE
+from .rule_runner_mixin import RuleRunnerMixin
+
 
-class DemographicsDataFormValidator(FormValidator):
+class DemographicsDataFormValidator(RuleRunnerMixin, FormValidator):
 
     def clean(self):
         """
@@ -15,14 +19,19 @@ class DemographicsDataFormValidator(FormValidator):
         """
         Will make the {varable}_other required
         """
-        self.validate_other_specify(field='ethnicity')
-        self.validate_other_specify(field='employment_status')
-        self.validate_other_specify(field='marital_status')
+        self.run_rules(
+            partial(self.validate_other_specify, field='ethnicity'),
+            partial(self.validate_other_specify, field='employment_status'),
+            partial(self.validate_other_specify, field='marital_status'),
+            self.validate_household_members)
 
+    def validate_household_members(self):
         """
         Number of people in a household cannot be negative
         """
         household_members = self.cleaned_data.get('household_members')
 
         if household_members and int(household_members) < 0:
-            raise ValidationError({'household_members': 'Number cannot be negative'})
+            self.raise_validation_error(
+                'Number cannot be negative', DEMOGRAPHICS_HOUSEHOLD_MEMBERS_NEGATIVE,
+                field='household_members')
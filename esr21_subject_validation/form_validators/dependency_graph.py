@@ -0,0 +1,70 @@
+"""The models, and fields of those models, each form validator reads
+besides its own cleaned data, declared on the validator as a dictionary
+of its label attribute to the fields, e.g.:
+
+    vaccination_details_cls = 'esr21_subject.vaccinationdetails'
+
+    reads = {'vaccination_details_cls': ('received_dose_before', 'vaccination_date')}
+
+and the graph of each model to the validators that read it, used to
+invalidate exactly the cached rows and results a saved row affects.
+"""
+from collections import defaultdict
+from functools import lru_cache
+
+# the labels of the models the exported validators read with their
+# default label attributes, so the signal receivers are connected
+# without importing the validators, see signals.connect_receivers()
+default_read_models = (
+    'esr21_subject.eligibilityconfirmation',
+    'esr21_subject.informedconsent',
+    'esr21_subject.subjectvisit',
+    'esr21_subject.vaccinationdetails',
+    'esr21_subject.vaccinationhistory')
+
+
+def read_models(validator_cls):
+    """Returns a dictionary of model label to the set of fields
+    `validator_cls` reads of it.
+    """
+    return {getattr(validator_cls, attr): frozenset(fields)
+            for attr, fields in getattr(validator_cls, 'reads', {}).items()}
+
+
+class DependencyGraph:
+
+    def __init__(self, validator_classes=()):
+        self.readers = defaultdict(dict)
+        for validator_cls in validator_classes:
+            self.add(validator_cls)
+
+    def add(self, validator_cls):
+        for label, fields in read_models(validator_cls).items():
+            self.readers[label][validator_cls] = fields
+
+    @property
+    def models(self):
+        """Returns the labels of the models read by any validator.
+        """
+        return list(self.readers)
+
+    def dependants(self, model_label, fields=None):
+        """Returns the validators that read `model_label` or, if the
+        changed `fields` are given, that read any of them.
+        """
+        return [validator_cls
+                for validator_cls, read in self.readers.get(model_label, {}).items()
+                if fields is None or read.intersection(fields)]
+
+
+@lru_cache(maxsize=None)
+def get_graph():
+    """Returns the DependencyGraph of the exported validators, built on
+    first use. Call `get_graph.cache_clear()` after changing a
+    validator's label attributes.
+    """
+    from .. import form_validators
+
+    return DependencyGraph(
+        getattr(form_validators, name) for name in form_validators.__all__
+        if name.endswith('FormValidator'))
@@ -0,0 +1,39 @@
+class DoseLedger:
+    """A subject's vaccination doses, keyed by `received_dose_before`,
+    together with the subject's vaccination history.
+    """
+
+    def __init__(self, doses=None, vaccination_history=None):
+        self.doses = doses or {}
+        self.vaccination_history = vaccination_history
+
+    def __contains__(self, dose):
+        return dose in self.doses
+
+    def dose(self, dose):
+        """Returns the vaccination details instance for the dose or None.
+        """
+        return self.doses.get(dose)
+
+    def vaccination_date(self, dose):
+        """Returns the vaccination date of the dose or None.
+        """
+        vaccination = self.doses.get(dose)
+        return vaccination.vaccination_date.date() if vaccination else None
+
+    def schedule_name(self, dose):
+        """Returns the schedule name of the visit the dose was given at
+        or None.
+        """
+        vaccination = self.doses.get(dose)
+        if vaccination:
+            return vaccination.subject_visit.appointment.schedule_name
+        return None
+
+    @property
+    def received_vaccine(self):
+        return getattr(self.vaccination_history, 'received_vaccine', None)
+
+    @property
+    def dose_quantity(self):
+        return getattr(self.vaccination_history, 'dose_quantity', None)
@@ -0,0 +1,112 @@
+"""The protocol's minimum and maximum number of days between doses,
+declared on the edc_protocol app config as a dictionary of dose
+transition to (min days, max days), either may be None, e.g.:
+
+    class EdcProtocolAppConfig(BaseEdcProtocolAppConfig):
+        dose_windows = {
+            (FIRST_DOSE, SECOND_DOSE): (56, None),
+            (SECOND_DOSE, BOOSTER_DOSE): (90, 365)}
+
+and checked for one record, `DoseWindows.check()`, or for the whole
+cohort in one pass over the vaccination dates, `audit_dose_windows()`.
+"""
+from collections import namedtuple
+from datetime import datetime
+
+from ..constants import FIRST_DOSE, SECOND_DOSE
+from .model_resolver import get_app_config
+
+DoseWindow = namedtuple('DoseWindow', 'min_days max_days')
+
+DoseWindowViolation = namedtuple(
+    'DoseWindowViolation', 'subject_identifier from_dose to_dose days window')
+
+default_dose_windows = {(FIRST_DOSE, SECOND_DOSE): DoseWindow(56, None)}
+
+
+def as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+class DoseWindows:
+
+    def __init__(self, windows=None):
+        self.windows = {
+            transition: DoseWindow(*window) for transition, window in (
+                default_dose_windows if windows is None else windows).items()}
+
+    @classmethod
+    def from_protocol(cls, protocol=None):
+        """Returns the DoseWindows of the edc_protocol app config, or the
+        defaults if it declares none.
+        """
+        protocol = protocol or get_app_config('edc_protocol')
+        return cls(getattr(protocol, 'dose_windows', None))
+
+    def window(self, from_dose, to_dose):
+        """Returns the DoseWindow of the transition or None.
+        """
+        return self.windows.get((from_dose, to_dose))
+
+    def following(self, dose):
+        """Returns the (next dose, DoseWindow) after `dose` or None.
+        """
+        for (from_dose, to_dose), window in self.windows.items():
+            if from_dose == dose:
+                return to_dose, window
+        return None
+
+    def check(self, from_dose, from_date, to_dose, to_date):
+        """Returns the number of days between the doses if outside the
+        window of the transition, otherwise None.
+
+        A dose before the one it follows is always outside the window.
+        """
+        window = self.window(from_dose, to_dose)
+        if not (window and from_date and to_date):
+            return None
+        days = (as_date(to_date) - as_date(from_date)).days
+        if (days < max(window.min_days or 0, 0)
+                or (window.max_days is not None and days > window.max_days)):
+            return days
+        return None
+
+    def check_timeline(self, dates, subject_identifier=None):
+        """Returns the DoseWindowViolations of a subject's dates,
+        a dictionary of dose to vaccination date.
+        """
+        violations = []
+        for (from_dose, to_dose), window in self.windows.items():
+            days = self.check(
+                from_dose, dates.get(from_dose), to_dose, dates.get(to_dose))
+            if days is not None:
+                violations.append(DoseWindowViolation(
+                    subject_identifier, from_dose, to_dose, days, window))
+        return violations
+
+
+def audit_dose_windows(rows, dose_windows=None):
+    """Returns the DoseWindowViolations of every subject of `rows`,
+    (subject identifier, dose, vaccination date) tuples in any order,
+    e.g. of vaccination_date_rows().
+
+    The rows are read once, so a queryset is streamed.
+    """
+    dose_windows = dose_windows or DoseWindows.from_protocol()
+    timelines = {}
+    for subject_identifier, dose, vaccination_date in rows:
+        timelines.setdefault(subject_identifier, {})[dose] = as_date(vaccination_date)
+    violations = []
+    for subject_identifier, dates in timelines.items():
+        violations.extend(dose_windows.check_timeline(dates, subject_identifier))
+    return violations
+
+
+def vaccination_date_rows(model_cls):
+    """Returns an iterator of the (subject identifier, dose, vaccination
+    date) of every row of `model_cls`, a vaccination details model, with
+    one query.
+    """
+    return model_cls._default_manager.values_list(
+        'subject_visit__subject_identifier', 'received_dose_before',
+        'vaccination_date').iterator()
@@ -1,22 +1,25 @@
-from django.apps import apps as django_apps
-from django.core.exceptions import ValidationError
 from edc_form_validators import FormValidator
 
+from .model_resolver import AppConfigAttribute, get_model
+from .rule_codes import ELIGIBILITY_REPORT_BEFORE_STUDY_OPEN
+from .rule_runner_mixin import RuleRunnerMixin
 
-class EligibilityConfirmationFormValidator(FormValidator):
 
-    edc_protocol = django_apps.get_app_config('edc_protocol')
+class EligibilityConfirmationFormValidator(RuleRunnerMixin, FormValidator):
+
+    edc_protocol = AppConfigAttribute('edc_protocol')
 
     @property
     def eligibility_confirmetion_cls(self):
-        return django_apps.get_model(self.eligibility_confirmetion_model)
+        return get_model(self.eligibility_confirmetion_model)
 
     def clean(self):
+        self.run_rules(self.validate_report_datetime)
 
+    def validate_report_datetime(self):
         report_datetime = self.cleaned_data.get('report_datetime')
         if (report_datetime and self.edc_protocol.study_open_datetime > report_datetime):
-            message = {
-                'report_datetime': ('Date cannot be before study starts. Study opened on'
-                                    f' {self.edc_protocol.study_open_datetime.date()}.')}
-            self._errors.update(message)
-            raise ValidationError(message)
+            self.raise_validation_error(
+                'Date cannot be before study starts. Study opened on %(study_open_date)s.',
+                ELIGIBILITY_REPORT_BEFORE_STUDY_OPEN, field='report_datetime',
+                study_open_date=self.edc_protocol.study_open_datetime.date())
@@ -1,40 +1,52 @@
-from django import forms
-from django.apps import apps as django_apps
-from django.core.exceptions import ValidationError
 
+from .model_resolver import get_model
+from .rule_codes import CONSENT_MISSING, CONSENT_REPORT_BEFORE_CONSENT
+from .rule_runner_mixin import RuleRunnerMixin
+from .subject_context import SubjectContextMixin
 
-class ESR21FormValidatorMixin:
+
+class ESR21FormValidatorMixin(SubjectContextMixin, RuleRunnerMixin):
 
     eligibility_confirmation_model = 'esr21_subject.eligibilityconfirmation'
     informed_consent_model = 'esr21_subject.informedconsent'
 
+    # label attributes of the models the rules read, and their fields
+    reads = {'informed_consent_model': ('subject_identifier', 'consent_datetime')}
+
     @property
     def eligibility_confirmation_cls(self):
-        return django_apps.get_model(self.eligibility_confirmation_model)
+        return get_model(self.eligibility_confirmation_model)
 
     @property
     def informed_consent_cls(self):
-        return django_apps.get_model(self.informed_consent_model)
+        return get_model(self.informed_consent_model)
 
     def validate_against_consent_datetime(self, report_datetime):
         """Returns an instance of the current informed consent or
         raises an exception if not found."""
 
-        consent = self.validate_against_consent(id=id)
+        status = self.subject_status(subject_identifier=self.subject_identifier)
+        if status and status.consented:
+            consent = status
+        else:
+            consent = self.validate_against_consent()
+            if not consent:
+                return
 
         if report_datetime and report_datetime < consent.consent_datetime:
-            raise forms.ValidationError(
-                "Report datetime cannot be before consent datetime")
+            self.raise_validation_error(
+                'Report datetime cannot be before consent datetime',
+                CONSENT_REPORT_BEFORE_CONSENT)
 
     def validate_against_consent(self):
         """Returns an instance of the current inofrmed consent version form or
         raises an exception if not found."""
-        consent = self.informed_consent_cls.objects.filter(
-            subject_identifier=self.subject_identifier).order_by(
-                '-consent_datetime').first()
+        consent = self.subject_context.informed_consent(
+            self.informed_consent_cls,
+            subject_identifier=self.subject_identifier)
 
         if not consent:
-            raise ValidationError(
-                'Please complete Informed Consent form '
-                f'before  proceeding.')
-        return consent
\ No newline at end of file
+            self.raise_validation_error(
+                'Please complete Informed Consent form before  proceeding.',
+                CONSENT_MISSING)
+        return consent
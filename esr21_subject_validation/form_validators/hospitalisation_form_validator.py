@@ -1,8 +1,12 @@
+from functools import partial
+
 from edc_constants.choices import NO
 from edc_form_validators import FormValidator
 
+from .rule_runner_mixin import RuleRunnerMixin
+
 
-class HospitalisationFormValidator(FormValidator):
+class HospitalisationFormValidator(RuleRunnerMixin, FormValidator):
 
     def clean(self):
         """
@@ -12,16 +16,14 @@ class HospitalisationFormValidator(FormValidator):
 
         """
         Stop date is required if the symptoms are no longer on going
-        """
-        self.required_if(NO, field='ongoing',
-                         field_required='stop_date')
 
-        """
         Will make the {varable}_other required 
         """
-        self.validate_other_specify(field='reason')
-
-        self.required_if('covid19_related_symptoms', field='reason',
-                         field_required='covid_symptoms')
+        self.run_rules(
+            partial(self.required_if, NO, field='ongoing',
+                    field_required='stop_date'),
+            partial(self.validate_other_specify, field='reason'),
+            partial(self.required_if, 'covid19_related_symptoms', field='reason',
+                    field_required='covid_symptoms'))
 
         # self.required_if_not_none(field='stop_date', field_required='hospitalisation_outcome')
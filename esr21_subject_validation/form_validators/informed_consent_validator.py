@@ -1,99 +1,131 @@
 import re
-from django.apps import apps as django_apps
-from django.core.exceptions import ValidationError
 from edc_base.utils import age
 from edc_constants.constants import MALE, FEMALE, YES
 from edc_form_validators import FormValidator
 
+from .form_validator_mixin import ESR21FormValidatorMixin
+from .model_resolver import get_model
+from .rule_codes import (
+    CONSENT_AGE_MISMATCH, CONSENT_DOB_MISMATCH, CONSENT_ELIGIBILITY_MISSING,
+    CONSENT_IDENTITY_FORMAT, CONSENT_IDENTITY_GENDER, CONSENT_IDENTITY_LENGTH,
+    CONSENT_IDENTITY_MISMATCH)
+from .rule_planner import AGGREGATE
 
-class InformedConsentFormValidator(FormValidator):
+
+class InformedConsentFormValidator(ESR21FormValidatorMixin, FormValidator):
     eligibility_confirmation_model = 'esr21_subject.eligibilityconfirmation'
     informed_consent_model = 'esr21_subject.informedconsent'
 
-    @property
-    def informed_consent_cls(self):
-        return django_apps.get_model(self.informed_consent_model)
+    reads = {
+        'eligibility_confirmation_model': ('screening_identifier', 'age_in_years'),
+        'informed_consent_model': (
+            'subject_identifier', 'screening_identifier', 'consent_datetime', 'dob')}
+
+    rule_fields = {
+        'validate_consent_dob_valid': (
+            'screening_identifier', 'dob', 'consent_datetime'),
+        'validate_identity_number': (
+            'identity', 'confirm_identity', 'identity_type', 'gender')}
+
+    rule_costs = {'validate_consent_dob_valid': AGGREGATE}
 
-    @property
-    def eligibility_confirmation_cls(self):
-        return django_apps.get_model(self.eligibility_confirmation_model)
+    @classmethod
+    def prefetch(cls, subject_context, records):
+        screening_identifiers = [
+            cleaned_data.get('screening_identifier') for cleaned_data in records]
+        subject_context.prefetch_eligibility_confirmations(
+            get_model(cls.eligibility_confirmation_model),
+            screening_identifiers)
+        subject_context.prefetch_informed_consents(
+            get_model(cls.informed_consent_model),
+            'screening_identifier', screening_identifiers)
+        cls.prefetch_subject_status(
+            subject_context, 'screening_identifier', screening_identifiers)
 
     def clean(self):
         self.screening_identifier = self.cleaned_data.get('screening_identifier')
         super().clean()
 
-        self.validate_gender_other()
-        self.validate_consent_dob_valid()
-        self.validate_identity_number(cleaned_data=self.cleaned_data)
+        self.run_rules(
+            self.validate_gender_other,
+            self.validate_consent_dob_valid,
+            self.validate_identity_number)
 
     def validate_gender_other(self):
         self.validate_other_specify(field='gender')
 
     def validate_identity_number(self, cleaned_data=None):
+        cleaned_data = cleaned_data or self.cleaned_data
         identity = cleaned_data.get('identity')
         if identity:
             id_regex = r'[A-Z0-9]+'
             if not re.match(id_regex, identity):
-                message = {'identity': 'Identity number must be digits.'}
-                self._errors.update(message)
-                raise ValidationError(message)
+                self.raise_validation_error(
+                    'Identity number must be digits.', CONSENT_IDENTITY_FORMAT,
+                    field='identity')
+                return
             if cleaned_data.get('identity') != cleaned_data.get(
                     'confirm_identity'):
-                msg = {'identity':
-                           '\'Identity\' must match \'confirm identity\'.'}
-                self._errors.update(msg)
-                raise ValidationError(msg)
+                self.raise_validation_error(
+                    '\'Identity\' must match \'confirm identity\'.',
+                    CONSENT_IDENTITY_MISMATCH, field='identity')
+                return
             if cleaned_data.get('identity_type') == 'national_identity_card':
                 if len(cleaned_data.get('identity')) != 9:
-                    msg = {'identity':
-                               'National identity provided should contain 9 values.'
-                               ' Please correct.'}
-                    self._errors.update(msg)
-                    raise ValidationError(msg)
+                    self.raise_validation_error(
+                        'National identity provided should contain 9 values.'
+                        ' Please correct.', CONSENT_IDENTITY_LENGTH, field='identity')
+                    return
                 gender = cleaned_data.get('gender')
                 if gender == FEMALE and cleaned_data.get('identity')[4] != '2':
-                    msg = {'identity':
-                               'Participant gender is Female. Please correct '
-                               'identity number.'}
-                    self._errors.update(msg)
-                    raise ValidationError(msg)
+                    self.raise_validation_error(
+                        'Participant gender is Female. Please correct '
+                        'identity number.', CONSENT_IDENTITY_GENDER, field='identity')
                 elif gender == MALE and cleaned_data.get('identity')[4] != '1':
-                    msg = {'identity':
-                               'Participant is Male. Please correct identity '
-                               'number.'}
-                    self._errors.update(msg)
-                    raise ValidationError(msg)
+                    self.raise_validation_error(
+                        'Participant is Male. Please correct identity '
+                        'number.', CONSENT_IDENTITY_GENDER, field='identity')
 
     def validate_consent_dob_valid(self):
-        consent_exist = self.informed_consent_cls.objects.filter(screening_identifier=self.screening_identifier)
         dob = self.cleaned_data.get('dob')
         consent_date = self.cleaned_data.get('consent_datetime').date()
         age_in_years = age(dob, consent_date).years
 
-        try:
-            eligibility_confirmation = self.eligibility_confirmation_cls.objects.get(
-                screening_identifier=self.screening_identifier)  
-        except self.eligibility_confirmation_cls.DoesNotExist:
-            raise ValidationError('Please complete the Eligibility Confirmation '
-                                  'form first.')
+        # the status row has the age_in_years and dob of the eligibility
+        # confirmation and consent, if the subject has a status row
+        status = self.subject_status(screening_identifier=self.screening_identifier)
+        if status:
+            eligibility_confirmation = status if status.eligibility_confirmed else None
+        else:
+            eligibility_confirmation = self.subject_context.eligibility_confirmation(
+                self.eligibility_confirmation_cls,
+                screening_identifier=self.screening_identifier)
+        if not eligibility_confirmation:
+            self.raise_validation_error(
+                'Please complete the Eligibility Confirmation form first.',
+                CONSENT_ELIGIBILITY_MISSING)
 
         else:
-            if consent_exist:
-                consent = consent_exist.order_by('-consent_datetime').first()
+            if status:
+                consent = status if status.consented else None
+            else:
+                consent = self.subject_context.informed_consent(
+                    self.informed_consent_cls,
+                    screening_identifier=self.screening_identifier)
+            if consent:
                 if (dob and dob != consent.dob):
-                    message = {'dob': 'The Date of birth does not '
-                               'match the dob from Consent'
-                               f'form. Expected \'{consent.dob}\' '
-                               }
-                    self._errors.update(message)
-                    raise ValidationError(message)
+                    self.raise_validation_error(
+                        'The Date of birth does not match the dob from Consent'
+                        'form. Expected \'%(consent_dob)s\' ', CONSENT_DOB_MISMATCH,
+                        field='dob', consent_dob=consent.dob)
 
             else:
                 if (eligibility_confirmation.age_in_years
                     and eligibility_confirmation.age_in_years != age_in_years):
-                    message = {'dob': 'The age derived from Date of birth does not '
-                               'match the age provided in the Eligibility Confirmation'
-                               f' form. Expected \'{eligibility_confirmation.age_in_years}\' '
-                               f'got \'{age_in_years}\''}
-                    self._errors.update(message)
-                    raise ValidationError(message)
+                    self.raise_validation_error(
+                        'The age derived from Date of birth does not '
+                        'match the age provided in the Eligibility Confirmation'
+                        ' form. Expected \'%(age_in_years)s\' got \'%(derived_age)s\'',
+                        CONSENT_AGE_MISMATCH, field='dob',
+                        age_in_years=eligibility_confirmation.age_in_years,
+                        derived_age=age_in_years)
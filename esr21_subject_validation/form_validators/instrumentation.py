@@ -0,0 +1,133 @@
+import json
+import logging
+import threading
+import time
+from collections import namedtuple
+
+from django.db import connection
+
+Measurement = namedtuple('Measurement', 'validator rule duration queries failed')
+
+logger = logging.getLogger(__name__)
+
+sinks = []
+
+
+def register_sink(sink):
+    """Registers a sink, an object with a `record(measurement)` method,
+    that is given a Measurement for every validation and every rule
+    run from now on.
+    """
+    if sink not in sinks:
+        sinks.append(sink)
+    return sink
+
+
+def unregister_sink(sink):
+    if sink in sinks:
+        sinks.remove(sink)
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def instrumented(validator, rule, func, *args):
+    """Calls `func(*args)` and records its wall time and the number of
+    queries it ran on the default database with every registered sink.
+
+    Validators only call this if a sink is registered, so there is no
+    overhead otherwise.
+    """
+    counter = QueryCounter()
+    failed = True
+    start = time.perf_counter()
+    try:
+        with connection.execute_wrapper(counter):
+            result = func(*args)
+        failed = False
+        return result
+    finally:
+        measurement = Measurement(
+            validator.__class__.__name__, rule,
+            time.perf_counter() - start, counter.count, failed)
+        for sink in list(sinks):
+            try:
+                sink.record(measurement)
+            except Exception:
+                logger.exception(f'Instrumentation sink {sink!r} failed.')
+
+
+class LoggingSink:
+    """Logs each measurement, by default at DEBUG level.
+    """
+
+    def __init__(self, logger=None, level=logging.DEBUG):
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def record(self, measurement):
+        self.logger.log(
+            self.level, '%s.%s %.3fms %s queries%s',
+            measurement.validator, measurement.rule,
+            measurement.duration * 1000, measurement.queries,
+            ' (failed)' if measurement.failed else '')
+
+
+class InMemoryAggregator:
+    """Totals the measurements per validator and rule, e.g. to rank the
+    slowest validators of a running process.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def record(self, measurement):
+        key = (measurement.validator, measurement.rule)
+        with self.lock:
+            stats = self.stats.setdefault(key, {
+                'calls': 0, 'failures': 0, 'total_time': 0.0,
+                'max_time': 0.0, 'queries': 0})
+            stats['calls'] += 1
+            stats['failures'] += measurement.failed
+            stats['total_time'] += measurement.duration
+            stats['max_time'] = max(stats['max_time'], measurement.duration)
+            stats['queries'] += measurement.queries
+
+    def summary(self):
+        """Returns a list of dictionaries, one per validator and rule,
+        ordered by total time, slowest first.
+        """
+        with self.lock:
+            summary = [
+                dict(stats, validator=validator, rule=rule,
+                     mean_time=stats['total_time'] / stats['calls'],
+                     queries_per_call=stats['queries'] / stats['calls'])
+                for (validator, rule), stats in self.stats.items()]
+        return sorted(summary, key=lambda stats: stats['total_time'], reverse=True)
+
+    def reset(self):
+        with self.lock:
+            self.stats = {}
+
+
+class FileSink:
+    """Appends each measurement to `path` as a line of JSON.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def record(self, measurement):
+        line = json.dumps(measurement._asdict())
+        with self.lock:
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
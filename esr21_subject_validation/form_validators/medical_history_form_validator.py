@@ -1,3 +1,5 @@
+from functools import partial
+
 from edc_constants.constants import YES, OTHER
 from edc_form_validators import FormValidator
 
@@ -8,23 +10,20 @@ class MedicalHistoryFormValidator(CRFFormValidator, FormValidator):
 
     def clean(self):
         super().clean()
-        self.m2m_required_if(YES,
-                             field='prior_covid_infection',
-                             m2m_field='covid_symptoms')
-
-        self.m2m_other_specify(OTHER,
-                               m2m_field='covid_symptoms',
-                               field_other='symptoms_other')
-
-        self.m2m_other_specify('HIV',
-                               m2m_field='comorbidities',
-                               field_other='received_art')
-
-        self.m2m_other_specify(OTHER,
-                               m2m_field='comorbidities',
-                               field_other='comorbidities_other')
-
-        self.required_if(YES,
-                         field='condition_related_meds',
-                         field_required='rel_conc_meds')
+        self.run_rules(
+            partial(self.m2m_required_if, YES,
+                    field='prior_covid_infection',
+                    m2m_field='covid_symptoms'),
+            partial(self.m2m_other_specify, OTHER,
+                    m2m_field='covid_symptoms',
+                    field_other='symptoms_other'),
+            partial(self.m2m_other_specify, 'HIV',
+                    m2m_field='comorbidities',
+                    field_other='received_art'),
+            partial(self.m2m_other_specify, OTHER,
+                    m2m_field='comorbidities',
+                    field_other='comorbidities_other'),
+            partial(self.required_if, YES,
+                    field='condition_related_meds',
+                    field_required='rel_conc_meds'))
 
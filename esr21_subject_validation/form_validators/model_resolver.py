@@ -0,0 +1,54 @@
+from functools import lru_cache
+
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+@lru_cache(maxsize=None)
+def get_model(label):
+    """Returns the model class of `label`, e.g. 'esr21_subject.informedconsent',
+    resolved once per process.
+
+    The cache is keyed on the label, so a validator whose label
+    attribute is overridden, as the tests do, resolves the new label.
+    """
+    return django_apps.get_model(label)
+
+
+def get_subject_status_model():
+    """Returns the model of the ESR21_SUBJECT_STATUS_MODEL setting or None,
+    see model_mixins.SubjectStatusModelMixin.
+    """
+    label = getattr(settings, 'ESR21_SUBJECT_STATUS_MODEL', None)
+    return get_model(label) if label else None
+
+
+@lru_cache(maxsize=None)
+def get_app_config(app_label):
+    return django_apps.get_app_config(app_label)
+
+
+class AppConfigAttribute:
+    """A class attribute that resolves to an app config on first use
+    rather than when the class is defined, e.g.:
+
+        edc_protocol = AppConfigAttribute('edc_protocol')
+
+    so that importing a validator does not need the app registry to be
+    ready.
+    """
+
+    def __init__(self, app_label):
+        self.app_label = app_label
+
+    def __get__(self, instance, owner):
+        return get_app_config(self.app_label)
+
+
+@receiver(setting_changed)
+def clear_model_cache(setting=None, **kwargs):
+    if setting == 'INSTALLED_APPS':
+        get_model.cache_clear()
+        get_app_config.cache_clear()
@@ -1,53 +1,38 @@
 from edc_constants.choices import YES, NO
 from edc_form_validators import FormValidator
 
+from .rule_runner_mixin import RuleRunnerMixin
+from .rule_table import NOT_REQUIRED_IF, REQUIRED_IF, RuleTable
 
-class PersonalContactInformationFormValidator(FormValidator):
 
-    def clean(self):
-        super().clean()
+class PersonalContactInformationFormValidator(RuleRunnerMixin, FormValidator):
+
+    may_call_work_rules = RuleTable(
+        ('may_call_work', YES, 'subject_work_place', REQUIRED_IF),
+        ('may_call_work', YES, 'subject_work_phone', REQUIRED_IF))
 
-        self.required_if(
-            YES,
-            field='may_visit_home',
-            field_required='physical_address')
+    may_contact_indirectly_rules = RuleTable(
+        ('may_contact_indirectly', NO, 'indirect_contact_phone', NOT_REQUIRED_IF),
+        ('may_contact_indirectly', YES, 'indirect_contact_name', REQUIRED_IF),
+        ('may_contact_indirectly', YES, 'indirect_contact_relation', REQUIRED_IF),
+        ('may_contact_indirectly', YES, 'indirect_contact_physical_address',
+         REQUIRED_IF),
+        ('may_contact_indirectly', YES, 'indirect_contact_cell', REQUIRED_IF))
 
-        self.required_if(
-            YES,
-            field='may_call',
-            field_required='subject_cell')
-        self.not_required_if(
-            NO,
-            field='may_call',
-            field_required='subject_phone'
-        )
+    conditional_rules = RuleTable(
+        ('may_visit_home', YES, 'physical_address', REQUIRED_IF),
+        ('may_call', YES, 'subject_cell', REQUIRED_IF),
+        ('may_call', NO, 'subject_phone', NOT_REQUIRED_IF),
+        *may_call_work_rules,
+        *may_contact_indirectly_rules)
 
-        self.validate_may_call_work()
+    def clean(self):
+        super().clean()
 
-        self.validate_may_contact_indirectly()
+        self.run_rule_table(self.conditional_rules)
 
     def validate_may_call_work(self):
-        fields = ['subject_work_place', 'subject_work_phone']
-
-        for field in fields:
-            self.required_if(
-                YES,
-                field='may_call_work',
-                field_required=field)
+        self.run_rule_table(self.may_call_work_rules)
 
     def validate_may_contact_indirectly(self):
-        fields = ['indirect_contact_name',
-                  'indirect_contact_relation',
-                  'indirect_contact_physical_address',
-                  'indirect_contact_cell']
-
-        self.not_required_if(
-            NO,
-            field='may_contact_indirectly',
-            field_required='indirect_contact_phone')
-
-        for field in fields:
-            self.required_if(
-                YES,
-                field='may_contact_indirectly',
-                field_required=field)
+        self.run_rule_table(self.may_contact_indirectly_rules)
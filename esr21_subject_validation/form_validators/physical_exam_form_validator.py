@@ -4,58 +4,30 @@ from edc_constants.constants import YES
 from edc_form_validators import FormValidator
 from django import forms
 
+from .rule_runner_mixin import RuleRunnerMixin
+from .rule_table import APPLICABLE_IF, REQUIRED_IF, RuleTable
+
+
+class PhysicalFormValidator(RuleRunnerMixin, FormValidator):
+
+    conditional_rules = RuleTable(
+        # 2 subsequence questions are required if the physical variable is a NO
+        ('physical_exam', NO, 'reason_not_done', APPLICABLE_IF),
+        ('physical_exam', YES, 'exam_date', REQUIRED_IF),
+        ('abnormalities_found', YES, 'abn_specify', REQUIRED_IF),
+        ('abnormalities_found', YES, 'clinically_significant', REQUIRED_IF),
+        # Description required if a check is abnormal
+        ('general_appearance', 'abnormal', 'abnormality_description', REQUIRED_IF),
+        ('face_check', 'abnormal', 'face_description', REQUIRED_IF),
+        ('neck_check', 'abnormal', 'neck_description', REQUIRED_IF),
+        ('respiratory_check', 'abnormal', 'respiratory_description', REQUIRED_IF),
+        ('cardiovascular_check', 'abnormal', 'cardiovascular_description',
+         REQUIRED_IF),
+        ('abdominal_check', 'abnormal', 'abdominal_description', REQUIRED_IF),
+        ('skin_check', 'abnormal', 'skin_description', REQUIRED_IF),
+        ('neurological_check', 'abnormal', 'neurological_description',
+         REQUIRED_IF))
 
-class PhysicalFormValidator(FormValidator):
     def clean(self):
         super().clean()
-        """
-        2 subsequence questions are required if the physical variable is a NO
-        """
-        self.applicable_if(NO,
-                           field='physical_exam',
-                           field_applicable='reason_not_done')
-        self.required_if(YES,
-                         field='physical_exam',
-                         field_required='exam_date')
-
-        fields_required = ['abn_specify', 'clinically_significant']
-
-        for field in fields_required:
-            self.required_if(YES,
-                             field='abnormalities_found',
-                             field_required=field)
-
-        """
-        Description required if a check is abnormal
-        """
-        self.required_if('abnormal',
-                         field='general_appearance',
-                         field_required='abnormality_description')
-
-        self.required_if('abnormal',
-                         field='face_check',
-                         field_required='face_description')
-
-        self.required_if('abnormal',
-                         field='neck_check',
-                         field_required='neck_description')
-
-        self.required_if('abnormal',
-                         field='respiratory_check',
-                         field_required='respiratory_description')
-
-        self.required_if('abnormal',
-                         field='cardiovascular_check',
-                         field_required='cardiovascular_description')
-
-        self.required_if('abnormal',
-                         field='abdominal_check',
-                         field_required='abdominal_description')
-
-        self.required_if('abnormal',
-                         field='skin_check',
-                         field_required='skin_description')
-
-        self.required_if('abnormal',
-                         field='neurological_check',
-                         field_required='neurological_description')
+        self.run_rule_table(self.conditional_rules)
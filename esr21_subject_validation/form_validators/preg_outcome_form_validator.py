@@ -1,3 +1,5 @@
+from functools import partial
+
 from edc_form_validators import FormValidator
 
 from esr21_subject_validation.form_validators.crf_form_validator import CRFFormValidator
@@ -5,15 +7,14 @@ from esr21_subject_validation.form_validators.crf_form_validator import CRFFormV
 
 class OutcomeInlineFormValidator(CRFFormValidator, FormValidator):
     def clean(self):
-        self.required_if(
-            'full_term',
-            field_required='method',
-            field='specify_outcome',
-            inverse=False
-        )
-        self.required_if(
-            'premature',
-            field_required='method',
-            field='specify_outcome',
-            inverse=False
-        )
\ No newline at end of file
+        self.run_rules(
+            partial(self.required_if,
+                    'full_term',
+                    field_required='method',
+                    field='specify_outcome',
+                    inverse=False),
+            partial(self.required_if,
+                    'premature',
+                    field_required='method',
+                    field='specify_outcome',
+                    inverse=False))
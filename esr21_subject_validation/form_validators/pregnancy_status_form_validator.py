@@ -1,9 +1,11 @@
-from django import forms
-from django.apps import apps as django_apps
+from functools import partial
+
 from edc_constants.constants import OTHER, NO, YES
 from edc_form_validators import FormValidator
 
 from .crf_form_validator import CRFFormValidator
+from .model_resolver import get_model
+from .rule_codes import PREGNANCY_LMP_IS_DELIVERY_DATE
 
 
 class PregnancyStatusFormValidator(CRFFormValidator, FormValidator):
@@ -12,25 +14,31 @@ class PregnancyStatusFormValidator(CRFFormValidator, FormValidator):
 
     @property
     def subject_consent_cls(self):
-        return django_apps.get_model(self.subject_consent_model)
+        return get_model(self.subject_consent_model)
 
     def clean(self):
 
-        self.m2m_required_if(YES,
-                             field='contraceptive_usage',
-                             m2m_field='contraceptive')
+        self.run_rules(
+            partial(self.m2m_required_if, YES,
+                    field='contraceptive_usage',
+                    m2m_field='contraceptive'),
+            self.validate_date_miscarriages,
+            partial(self.m2m_other_specify, OTHER,
+                    m2m_field='contraceptive',
+                    field_other='contraceptive_other',),
+            partial(self.validate_other_specify, field='post_menopausal'),
+            self.validate_start_date_menstrual_period,
+            self.validate_expected_delivery)
+
+        super().clean()
 
+    def validate_date_miscarriages(self):
         spontaneous_miscarriages = self.cleaned_data.get('number_miscarriages') or 0
 
         self.required_if_true(spontaneous_miscarriages > 0,
                               field_required='date_miscarriages',)
 
-        self.m2m_other_specify(OTHER,
-                               m2m_field='contraceptive',
-                               field_other='contraceptive_other',)
-
-        self.validate_other_specify(field='post_menopausal')
-
+    def validate_start_date_menstrual_period(self):
         amenorrhea_history = self.cleaned_data.get('amenorrhea_history')
         primary_amenorrhea = self.cleaned_data.get('primary_amenorrhea')
 
@@ -38,13 +46,12 @@ class PregnancyStatusFormValidator(CRFFormValidator, FormValidator):
             (amenorrhea_history == NO and primary_amenorrhea == NO),
             field_required='start_date_menstrual_period')
 
+    def validate_expected_delivery(self):
         start_date_menstrual_period = self.cleaned_data.get('start_date_menstrual_period')
         expected_delivery = self.cleaned_data.get('expected_delivery')
 
         if start_date_menstrual_period and expected_delivery:
             if start_date_menstrual_period == expected_delivery:
-                msg = 'Start date of menstrual period cannot be the same as date of'\
-                    ' expected delivery'
-                raise forms.ValidationError(msg)
-
-        super().clean()
+                self.raise_validation_error(
+                    'Start date of menstrual period cannot be the same as date of'
+                    ' expected delivery', PREGNANCY_LMP_IS_DELIVERY_DATE)
@@ -1,8 +1,14 @@
+from functools import partial
+
 from edc_constants.choices import YES
 from edc_form_validators import FormValidator
 
-class PregnancyTestFormValidator(FormValidator):
+from .rule_runner_mixin import RuleRunnerMixin
+
+
+class PregnancyTestFormValidator(RuleRunnerMixin, FormValidator):
 
     def clean(self):
         super().clean()
-        self.required_if(YES, field = 'preg_performed', field_required='result')
+        self.run_rules(
+            partial(self.required_if, YES, field='preg_performed', field_required='result'))
@@ -1,7 +1,12 @@
+from functools import partial
+
 from edc_form_validators import FormValidator
-from django.core.exceptions import ValidationError
 
-class ProtocolDeviationFormValidator(FormValidator):
+from .rule_codes import DEVIATION_NAME_MISSING
+from .rule_runner_mixin import RuleRunnerMixin
+
+
+class ProtocolDeviationFormValidator(RuleRunnerMixin, FormValidator):
     
     def clean(self):
         super().clean()
@@ -9,16 +14,16 @@ class ProtocolDeviationFormValidator(FormValidator):
         required_fields = ['deviation_form_name','deviation_name',
                            'subject_identifiers','deviation_description']
         
-        for r_field in required_fields:
-            self.required_if_not_none(
-                field='deviation_name',
-                field_required=r_field)
-            
+        self.run_rules(*[
+            partial(self.required_if_not_none,
+                    field='deviation_name',
+                    field_required=r_field) for r_field in required_fields])
+
+        self.run_rules(self.validate_deviation_name)
+
+    def validate_deviation_name(self):
         deviation_name = self.cleaned_data.get('deviation_name')
         if deviation_name is None:
-            message = {'deviation_name':
-                           ('A protocol deviation name has to be provided')}
-            raise ValidationError(message)
-            
-                 
-            
\ No newline at end of file
+            self.raise_validation_error(
+                'A protocol deviation name has to be provided',
+                DEVIATION_NAME_MISSING, field='deviation_name')
@@ -1,33 +1,36 @@
+from functools import partial
+
 from dateutil.relativedelta import relativedelta
 from edc_constants.choices import YES
 from edc_form_validators import FormValidator
-from django.core.exceptions import ValidationError
 from edc_constants.constants import NO, POS, NEG
 from edc_base.utils import get_utcnow
 
+from .rule_codes import HIV_RAPID_TEST_REQUIRED
+from .rule_runner_mixin import RuleRunnerMixin
+
 
-class RapidHivTestingFormValidator(FormValidator):
+class RapidHivTestingFormValidator(RuleRunnerMixin, FormValidator):
 
     def clean(self):
         super().clean()
 
-        self.validate_consent_status()
+        self.run_rules(self.validate_consent_status)
 
         prev_hiv_fields = ['hiv_test_date', 'hiv_result', 'evidence_hiv_status']
 
-        for field in prev_hiv_fields:
-            self.required_if(
-                YES,
-                field='prev_hiv_test',
-                field_required=field
-            )
+        self.run_rules(*[
+            partial(self.required_if,
+                    YES,
+                    field='prev_hiv_test',
+                    field_required=field) for field in prev_hiv_fields])
 
         rapid_test_fields = ['rapid_test_date', 'rapid_test_result']
-        for field in rapid_test_fields:
-            self.required_if(
-                YES,
-                field='rapid_test_done',
-                field_required=field)
+        self.run_rules(*[
+            partial(self.required_if,
+                    YES,
+                    field='rapid_test_done',
+                    field_required=field) for field in rapid_test_fields])
 
     def validate_consent_status(self):
         """A function to validate the consent status of a participant and 
@@ -66,8 +69,9 @@ class RapidHivTestingFormValidator(FormValidator):
 
         if (consent == YES and hiv_result == NEG):
             if rapid_test_done != YES:
-                message = {'rapid_test_done': 'A test needs to be processed'}
-                raise ValidationError(message)  
+                self.raise_validation_error(
+                    'A test needs to be processed', HIV_RAPID_TEST_REQUIRED,
+                    field='rapid_test_done')
             # else:
             #     if rapid_test_date is not None and rapid_test_date:
             #         if rapid_test_result is None:
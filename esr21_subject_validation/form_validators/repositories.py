@@ -0,0 +1,165 @@
+"""Where a SubjectContext reads the subject rows the form validators
+look up: the database, rows held in memory, or rows held in memory over
+the database.
+
+For example, to validate without the database:
+
+    repository = InMemoryRepository([subject_visit, consent, history])
+    VaccineDetailsFormValidator(
+        cleaned_data=cleaned_data, repository=repository).validate()
+
+Lookups are keyword arguments as for `QuerySet.filter()`, limited to
+exact and `__in` lookups, e.g. `subject_visit__subject_identifier`.
+"""
+from django.core.exceptions import ObjectDoesNotExist
+
+
+def lookup_value(obj, path):
+    """Returns the value of a lookup path, e.g.
+    'subject_visit__subject_identifier', of `obj`.
+    """
+    for attr in path.split('__'):
+        try:
+            obj = getattr(obj, attr, None)
+        except ObjectDoesNotExist:
+            return None
+    return obj
+
+
+def matches(obj, lookup):
+    for path, value in lookup.items():
+        if path.endswith('__in'):
+            if lookup_value(obj, path[:-len('__in')]) not in value:
+                return False
+        elif lookup_value(obj, path) != value:
+            return False
+    return True
+
+
+def identifiers_of(obj):
+    """Returns the subject and screening identifiers of `obj`.
+    """
+    identifiers = {
+        getattr(obj, 'subject_identifier', None),
+        getattr(obj, 'screening_identifier', None),
+        lookup_value(obj, 'subject_visit__subject_identifier')}
+    identifiers.discard(None)
+    return identifiers
+
+
+class Repository:
+    """The base of the repositories. Subclasses return the rows of a
+    model matching a lookup, `filter()`.
+    """
+
+    def filter(self, model_cls, select_related=(), **lookup):
+        raise NotImplementedError
+
+    def get(self, model_cls, **lookup):
+        """Returns the row matching the lookup or None.
+        """
+        rows = self.filter(model_cls, **lookup)
+        if len(rows) > 1:
+            raise model_cls.MultipleObjectsReturned(
+                f'{len(rows)} {model_cls._meta.label_lower} rows match {lookup}.')
+        return rows[0] if rows else None
+
+    def first(self, model_cls, **lookup):
+        rows = sorted(self.filter(model_cls, **lookup), key=lambda obj: str(obj.pk))
+        return rows[0] if rows else None
+
+    def latest(self, model_cls, field, **lookup):
+        """Returns the row matching the lookup with the latest `field`,
+        or None.
+        """
+        return max(self.filter(model_cls, **lookup),
+                   key=lambda obj: getattr(obj, field), default=None)
+
+    def values_list(self, model_cls, fields, **lookup):
+        return [tuple(lookup_value(obj, field) for field in fields)
+                for obj in self.filter(model_cls, **lookup)]
+
+
+class OrmRepository(Repository):
+    """Reads the rows from the database, the default.
+    """
+
+    def filter(self, model_cls, select_related=(), **lookup):
+        return list(model_cls._default_manager.filter(
+            **lookup).select_related(*select_related))
+
+    def get(self, model_cls, **lookup):
+        try:
+            return model_cls._default_manager.get(**lookup)
+        except model_cls.DoesNotExist:
+            return None
+
+    def first(self, model_cls, **lookup):
+        return model_cls._default_manager.filter(**lookup).first()
+
+    def latest(self, model_cls, field, **lookup):
+        return model_cls._default_manager.filter(**lookup).order_by(
+            f'-{field}').first()
+
+    def values_list(self, model_cls, fields, **lookup):
+        return list(model_cls._default_manager.filter(
+            **lookup).values_list(*fields))
+
+
+class InMemoryRepository(Repository):
+    """Reads the rows added to it, e.g. unsaved instances built by a
+    batch job or a test, and never the database.
+
+    Related rows are read from the instances, so add them with their
+    relations set, e.g. a vaccination details with its subject visit
+    and the visit's appointment.
+    """
+
+    def __init__(self, rows=()):
+        self.rows = {}
+        self.add(*rows)
+
+    def add(self, *objs):
+        for obj in objs:
+            key = obj.pk if obj.pk is not None else ('unsaved', id(obj))
+            self.rows.setdefault(obj.__class__, {})[key] = obj
+
+    def filter(self, model_cls, select_related=(), **lookup):
+        return [obj for obj in self.rows.get(model_cls, {}).values()
+                if matches(obj, lookup)]
+
+
+class OverlayRepository(InMemoryRepository):
+    """Reads the rows added to it as if they were rows of `repository`,
+    by default the database. An added row replaces the row of
+    `repository` with the same primary key.
+    """
+
+    def __init__(self, repository=None, rows=()):
+        self.repository = repository or OrmRepository()
+        super().__init__(rows)
+
+    def filter(self, model_cls, select_related=(), **lookup):
+        added = self.rows.get(model_cls, {})
+        return super().filter(model_cls, **lookup) + [
+            obj for obj in self.repository.filter(
+                model_cls, select_related=select_related, **lookup)
+            if obj.pk not in added]
+
+    def get(self, model_cls, **lookup):
+        return (Repository.get(self, model_cls, **lookup)
+                if self.rows.get(model_cls) else
+                self.repository.get(model_cls, **lookup))
+
+    def first(self, model_cls, **lookup):
+        return (super().first(model_cls, **lookup) if self.rows.get(model_cls)
+                else self.repository.first(model_cls, **lookup))
+
+    def latest(self, model_cls, field, **lookup):
+        return (super().latest(model_cls, field, **lookup) if self.rows.get(model_cls)
+                else self.repository.latest(model_cls, field, **lookup))
+
+    def values_list(self, model_cls, fields, **lookup):
+        return (super().values_list(model_cls, fields, **lookup)
+                if self.rows.get(model_cls) else
+                self.repository.values_list(model_cls, fields, **lookup))
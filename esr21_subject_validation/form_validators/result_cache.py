@@ -0,0 +1,284 @@
+"""Caches of validation results, so revalidating an unchanged record
+costs a hash and a lookup.
+
+A result is keyed on the validator class, its `rules_version`, a stable
+hash of the cleaned_data and the version of each model the validator
+reads, see dependency_graph, for each subject or screening identifier of
+the record. Saving or deleting a row of a model bumps its version for
+the row's subjects in every live cache of the process and in the
+configured cache, see get_result_cache() and signals.invalidate(), so
+only the results of the validators that read it are missed. Only the
+configured cache sees the saves of other processes, e.g. of the web
+processes. Bump a validator's `rules_version` when its rules change.
+
+Related instances in the cleaned_data, e.g. the subject visit, are
+hashed on their own concrete fields, not on the rows they relate to.
+Records without a subject or screening identifier, e.g. of a subject
+visit that does not exist, are not cached.
+Rows changed without a post_save or post_delete signal, e.g. by
+`update()`, are not seen.
+
+For example:
+
+    cache = LRUResultCache(maxsize=10000)
+    validate_many(VaccineDetailsFormValidator, records, cache=cache)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import date, time
+from functools import lru_cache
+from weakref import WeakSet
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import models
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .batch_validation import ValidationResult
+from .dependency_graph import read_models
+from .rule_runner_mixin import RuleError
+
+
+def stable_value(value):
+    """Returns `value` as JSON serializable data that is the same for
+    equal values in any process.
+    """
+    if isinstance(value, models.Model):
+        return [value._meta.label_lower] + [
+            stable_value(getattr(value, field.attname))
+            for field in value._meta.concrete_fields]
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (list, tuple)):
+        return [stable_value(item) for item in value]
+    if isinstance(value, (set, frozenset, models.QuerySet)):
+        return sorted(
+            (stable_value(item) for item in value), key=json.dumps)
+    return str(value)
+
+
+def content_hash(cleaned_data):
+    data = json.dumps(
+        {field: stable_value(value) for field, value in cleaned_data.items()},
+        sort_keys=True)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def record_identifiers(cleaned_data, validator_cls=None, subject_context=None):
+    """Returns the sorted subject and screening identifiers of a record.
+
+    A subject visit given by primary key is loaded with the validator's
+    `resolve_subject_visit()` through `subject_context`, the record has
+    no identifiers if it cannot be.
+    """
+    subject_visit = cleaned_data.get('subject_visit')
+    if subject_visit is not None and not isinstance(subject_visit, models.Model):
+        resolve_subject_visit = getattr(validator_cls, 'resolve_subject_visit', None)
+        if resolve_subject_visit is None or subject_context is None:
+            return []
+        subject_visit = resolve_subject_visit(subject_context, subject_visit)
+        if subject_visit is None:
+            return []
+    identifiers = {
+        getattr(subject_visit, 'subject_identifier', None),
+        cleaned_data.get('subject_identifier'),
+        cleaned_data.get('screening_identifier')}
+    identifiers.discard(None)
+    return sorted(str(identifier) for identifier in identifiers)
+
+
+class ResultCache:
+    """The base of the result caches. Subclasses store the results,
+    `get_result()` and `set_result()`, and the versions of the rows of
+    each subject, `version()` and `bump()`.
+    """
+
+    live = WeakSet()
+
+    def __init__(self):
+        ResultCache.live.add(self)
+
+    def key(self, validator_cls, cleaned_data, collect=False, subject_context=None):
+        """Returns the key of the result or None if the record has no
+        identifiers, its result is not cached as no save would miss it.
+        """
+        identifiers = record_identifiers(cleaned_data, validator_cls, subject_context)
+        if not identifiers:
+            return None
+        versions = [
+            (label, identifier, self.version(label, identifier))
+            for label in sorted(read_models(validator_cls))
+            for identifier in identifiers]
+        key = json.dumps([
+            f'{validator_cls.__module__}.{validator_cls.__qualname__}',
+            getattr(validator_cls, 'rules_version', 1),
+            collect, content_hash(cleaned_data), versions])
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, validator_cls, cleaned_data, collect=False, subject_context=None):
+        """Returns the cached ValidationResult or None.
+        """
+        key = self.key(validator_cls, cleaned_data, collect, subject_context)
+        data = None if key is None else self.get_result(key)
+        if data is None:
+            return None
+        return ValidationResult(
+            cleaned_data, data['errors'],
+            [RuleError(*rule_error) for rule_error in data['rule_errors']])
+
+    def set(self, validator_cls, cleaned_data, result, collect=False,
+            subject_context=None):
+        key = self.key(validator_cls, cleaned_data, collect, subject_context)
+        if key is None:
+            return
+        self.set_result(key, {
+            'errors': {field: [str(message) for message in messages]
+                       for field, messages in result.errors.items()},
+            'rule_errors': [
+                [rule_error.field, rule_error.rule, str(rule_error.message),
+                 rule_error.code, rule_error.severity, rule_error.params]
+                for rule_error in result.rule_errors]})
+
+    def invalidate(self, model_label, identifiers):
+        """Misses the results that read the rows of `model_label` of any
+        of `identifiers` from now on.
+        """
+        for identifier in identifiers:
+            self.bump(model_label, str(identifier))
+
+    def get_result(self, key):
+        raise NotImplementedError
+
+    def set_result(self, key, data):
+        raise NotImplementedError
+
+    def version(self, model_label, identifier):
+        raise NotImplementedError
+
+    def bump(self, model_label, identifier):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class LRUResultCache(ResultCache):
+    """Keeps the `maxsize` most recently used results in memory.
+    """
+
+    def __init__(self, maxsize=10000):
+        super().__init__()
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.clear()
+
+    def get_result(self, key):
+        with self.lock:
+            try:
+                self.results.move_to_end(key)
+            except KeyError:
+                return None
+            return self.results[key]
+
+    def set_result(self, key, data):
+        with self.lock:
+            self.results[key] = data
+            self.results.move_to_end(key)
+            while len(self.results) > self.maxsize:
+                self.results.popitem(last=False)
+
+    def version(self, model_label, identifier):
+        return self.versions.get((model_label, identifier), 0)
+
+    def bump(self, model_label, identifier):
+        with self.lock:
+            key = (model_label, identifier)
+            self.versions[key] = self.versions.get(key, 0) + 1
+
+    def clear(self):
+        self.results = OrderedDict()
+        self.versions = {}
+
+
+class SQLiteResultCache(ResultCache):
+    """Keeps results in a SQLite file, shared by processes and kept
+    between runs, e.g. of revalidate_crfs.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.local = threading.local()
+        with self.db:
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS result (key TEXT PRIMARY KEY, data TEXT)')
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS version (model TEXT, identifier TEXT, '
+                'version INTEGER, PRIMARY KEY (model, identifier))')
+
+    @property
+    def db(self):
+        """Returns a connection of this thread and process.
+        """
+        if getattr(self.local, 'pid', None) != os.getpid():
+            self.local.db = sqlite3.connect(self.path, timeout=30)
+            self.local.pid = os.getpid()
+        return self.local.db
+
+    def get_result(self, key):
+        row = self.db.execute(
+            'SELECT data FROM result WHERE key = ?', (key, )).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_result(self, key, data):
+        with self.db:
+            self.db.execute(
+                'INSERT OR REPLACE INTO result (key, data) VALUES (?, ?)',
+                (key, json.dumps(data)))
+
+    def version(self, model_label, identifier):
+        row = self.db.execute(
+            'SELECT version FROM version WHERE model = ? AND identifier = ?',
+            (model_label, identifier)).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, model_label, identifier):
+        with self.db:
+            self.db.execute(
+                'INSERT INTO version (model, identifier, version) VALUES (?, ?, 1) '
+                'ON CONFLICT (model, identifier) DO UPDATE SET version = version + 1',
+                (model_label, identifier))
+
+    def clear(self):
+        with self.db:
+            self.db.execute('DELETE FROM result')
+            self.db.execute('DELETE FROM version')
+
+
+@lru_cache(maxsize=None)
+def get_result_cache():
+    """Returns the result cache of the ESR21_VALIDATION_CACHE setting, a
+    dotted path or a (dotted path, kwargs) tuple, or None, e.g.:
+
+        ESR21_VALIDATION_CACHE = (
+            'esr21_subject_validation.form_validators.result_cache.SQLiteResultCache',
+            {'path': '/var/lib/esr21/validation-cache.db'})
+    """
+    cache = getattr(settings, 'ESR21_VALIDATION_CACHE', None)
+    if not cache:
+        return None
+    cache, options = (cache, {}) if isinstance(cache, str) else cache
+    return import_string(cache)(**options)
+
+
+@receiver(setting_changed)
+def clear_result_cache(setting=None, **kwargs):
+    if setting == 'ESR21_VALIDATION_CACHE':
+        get_result_cache.cache_clear()
@@ -0,0 +1,114 @@
+"""The stable codes of the rules, one per way a rule fails, so that
+reports and dashboards group violations on the code rather than on the
+message. A released code is never renamed or reused; a rule that
+changes meaning gets a new code.
+
+Rules raise with RuleRunnerMixin.raise_validation_error(), the message
+arguments given as params, e.g.:
+
+    self.raise_validation_error(
+        'The participant received AstraZeneca (AZD 1222) as first dose '
+        'on date %(first_dose_date)s', VAX_HISTORY_FIRST_DOSE_DATE,
+        field='dose1_date', first_dose_date=first_dose_date)
+
+and the codes of the edc_form_validators rules, e.g. `required_if`,
+are mapped to the FIELD_* codes, see stable_code().
+"""
+from edc_form_validators import (
+    APPLICABLE_ERROR, INVALID_ERROR, NOT_APPLICABLE_ERROR, NOT_REQUIRED_ERROR,
+    REQUIRED_ERROR)
+
+ERROR = 'error'
+WARNING = 'warning'
+
+# edc_form_validators field rules
+FIELD_REQUIRED = 'FIELD_REQUIRED'
+FIELD_NOT_REQUIRED = 'FIELD_NOT_REQUIRED'
+FIELD_APPLICABLE = 'FIELD_APPLICABLE'
+FIELD_NOT_APPLICABLE = 'FIELD_NOT_APPLICABLE'
+FIELD_INVALID = 'FIELD_INVALID'
+FIELD_OTHER_SPECIFY = 'FIELD_OTHER_SPECIFY'
+UNCODED = 'UNCODED'
+
+# CRFs and consent
+CRF_REPORT_BEFORE_VISIT = 'CRF_REPORT_BEFORE_VISIT'
+CONSENT_MISSING = 'CONSENT_MISSING'
+CONSENT_REPORT_BEFORE_CONSENT = 'CONSENT_REPORT_BEFORE_CONSENT'
+CONSENT_IDENTITY_FORMAT = 'CONSENT_IDENTITY_FORMAT'
+CONSENT_IDENTITY_MISMATCH = 'CONSENT_IDENTITY_MISMATCH'
+CONSENT_IDENTITY_LENGTH = 'CONSENT_IDENTITY_LENGTH'
+CONSENT_IDENTITY_GENDER = 'CONSENT_IDENTITY_GENDER'
+CONSENT_ELIGIBILITY_MISSING = 'CONSENT_ELIGIBILITY_MISSING'
+CONSENT_DOB_MISMATCH = 'CONSENT_DOB_MISMATCH'
+CONSENT_AGE_MISMATCH = 'CONSENT_AGE_MISMATCH'
+ELIGIBILITY_REPORT_BEFORE_STUDY_OPEN = 'ELIGIBILITY_REPORT_BEFORE_STUDY_OPEN'
+SCREENING_REPORT_BEFORE_STUDY_OPEN = 'SCREENING_REPORT_BEFORE_STUDY_OPEN'
+
+# vaccination details
+VAX_FIRST_DOSE_MISSING = 'VAX_FIRST_DOSE_MISSING'
+VAX_SECOND_BEFORE_FIRST = 'VAX_SECOND_BEFORE_FIRST'
+VAX_SECOND_OUTSIDE_WINDOW = 'VAX_SECOND_OUTSIDE_WINDOW'
+VAX_BOOSTER_OUTSIDE_WINDOW = 'VAX_BOOSTER_OUTSIDE_WINDOW'
+VAX_NEXT_BEFORE_WINDOW = 'VAX_NEXT_BEFORE_WINDOW'
+VAX_DATE_BEFORE_VISIT = 'VAX_DATE_BEFORE_VISIT'
+VAX_EXPIRY_BEFORE_VISIT = 'VAX_EXPIRY_BEFORE_VISIT'
+VAX_NEXT_BEFORE_VISIT = 'VAX_NEXT_BEFORE_VISIT'
+VAX_EXPECTED_SECOND_DOSE = 'VAX_EXPECTED_SECOND_DOSE'
+VAX_EXPECTED_BOOSTER_DOSE = 'VAX_EXPECTED_BOOSTER_DOSE'
+
+# vaccination history
+VAX_HISTORY_DOSE_COUNT = 'VAX_HISTORY_DOSE_COUNT'
+VAX_HISTORY_FIRST_DOSE_IN_EDC = 'VAX_HISTORY_FIRST_DOSE_IN_EDC'
+VAX_HISTORY_FIRST_DOSE_NOT_IN_EDC = 'VAX_HISTORY_FIRST_DOSE_NOT_IN_EDC'
+VAX_HISTORY_FIRST_DOSE_DATE = 'VAX_HISTORY_FIRST_DOSE_DATE'
+VAX_HISTORY_SECOND_DOSE_IN_EDC = 'VAX_HISTORY_SECOND_DOSE_IN_EDC'
+VAX_HISTORY_SECOND_DOSE_NOT_IN_EDC = 'VAX_HISTORY_SECOND_DOSE_NOT_IN_EDC'
+VAX_HISTORY_SECOND_DOSE_DATE = 'VAX_HISTORY_SECOND_DOSE_DATE'
+
+# adverse events
+AE_END_BEFORE_START = 'AE_END_BEFORE_START'
+AESI_END_BEFORE_START = 'AESI_END_BEFORE_START'
+AESI_AWARE_BEFORE_START = 'AESI_AWARE_BEFORE_START'
+SAE_AWARE_BEFORE_START = 'SAE_AWARE_BEFORE_START'
+SAE_ADMISSION_BEFORE_START = 'SAE_ADMISSION_BEFORE_START'
+SAE_ADMISSION_AFTER_END = 'SAE_ADMISSION_AFTER_END'
+SAE_DISCHARGE_BEFORE_ADMISSION = 'SAE_DISCHARGE_BEFORE_ADMISSION'
+
+# other CRFs
+DEMOGRAPHICS_HOUSEHOLD_MEMBERS_NEGATIVE = 'DEMOGRAPHICS_HOUSEHOLD_MEMBERS_NEGATIVE'
+DEVIATION_NAME_MISSING = 'DEVIATION_NAME_MISSING'
+HIV_RAPID_TEST_REQUIRED = 'HIV_RAPID_TEST_REQUIRED'
+PREGNANCY_LMP_IS_DELIVERY_DATE = 'PREGNANCY_LMP_IS_DELIVERY_DATE'
+
+edc_codes = {
+    REQUIRED_ERROR: FIELD_REQUIRED,
+    NOT_REQUIRED_ERROR: FIELD_NOT_REQUIRED,
+    APPLICABLE_ERROR: FIELD_APPLICABLE,
+    NOT_APPLICABLE_ERROR: FIELD_NOT_APPLICABLE,
+    INVALID_ERROR: FIELD_INVALID}
+
+# the edc_form_validators rules that raise without a code
+edc_rule_codes = {
+    'validate_other_specify': FIELD_OTHER_SPECIFY,
+    'required_if': FIELD_REQUIRED,
+    'required_if_true': FIELD_REQUIRED,
+    'not_required_if': FIELD_NOT_REQUIRED,
+    'applicable_if': FIELD_APPLICABLE,
+    'applicable_if_true': FIELD_APPLICABLE,
+    'not_applicable_if': FIELD_NOT_APPLICABLE,
+    'm2m_required': FIELD_REQUIRED,
+    'm2m_other_specify': FIELD_OTHER_SPECIFY}
+
+# code to severity, codes not listed are errors
+severities = {}
+
+
+def stable_code(code, rule=None):
+    """Returns the stable code of an error `code`, or of the rule named
+    `rule` if the error has none.
+    """
+    return edc_codes.get(code, code) or edc_rule_codes.get(rule) or UNCODED
+
+
+def severity(code):
+    return severities.get(code, ERROR)
@@ -0,0 +1,53 @@
+"""Orders a validator's rules cheapest first, so an invalid submission
+fails on an in-memory check before any rule queries the database.
+
+Validators tag their rules by name with an estimated cost in
+`rule_costs`, e.g.:
+
+    rule_costs = {'validate_consent_dob_valid': AGGREGATE}
+
+untagged rules being PURE. Costs measured by an InMemoryAggregator,
+see instrumentation, replace the tags once given to
+refine_rule_costs().
+"""
+PURE = 'pure'
+QUERY = 'query'
+AGGREGATE = 'aggregate'
+
+tiers = {PURE: 0, QUERY: 1, AGGREGATE: 2}
+
+# (validator class name, rule name): (tier, mean time) measured
+observed = {}
+
+
+def tier(queries_per_call):
+    if not queries_per_call:
+        return tiers[PURE]
+    if queries_per_call <= 1:
+        return tiers[QUERY]
+    return tiers[AGGREGATE]
+
+
+def rule_cost(validator, name):
+    """Returns the sortable cost, (tier, mean time), of the rule `name`
+    of `validator`, measured if refined, otherwise as tagged.
+    """
+    try:
+        return observed[(validator.__class__.__name__, name)]
+    except KeyError:
+        return (tiers[validator.rule_costs.get(name, PURE)], 0.0)
+
+
+def refine_rule_costs(aggregator):
+    """Replaces the tagged cost of each rule in the aggregator's summary
+    by its measured queries per call and mean time.
+    """
+    for stats in aggregator.summary():
+        if stats['rule'] in ('validate', 'collect_errors'):
+            continue
+        observed[(stats['validator'], stats['rule'])] = (
+            tier(stats['queries_per_call']), stats['mean_time'])
+
+
+def reset_rule_costs():
+    observed.clear()
@@ -0,0 +1,234 @@
+from collections import namedtuple
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import NON_FIELD_ERRORS, FieldDoesNotExist, ValidationError
+
+from . import instrumentation, rule_planner
+from .rule_codes import ERROR, severity, stable_code
+from .rule_table import APPLICABLE_IF, rule_error
+
+
+class RuleError(namedtuple(
+        'RuleError', 'field rule message code severity params',
+        defaults=(ERROR, None))):
+    """A failing rule, `code` being its stable code, see rule_codes,
+    and `params` the arguments of its message.
+    """
+
+    __slots__ = ()
+
+    def record(self):
+        """Returns the compact (code, field, severity, params) of the
+        error, without the message.
+        """
+        return (self.code, self.field, self.severity, self.params or {})
+
+
+def message_params(params):
+    """Returns the message arguments as JSON serializable values.
+    """
+    return {name: value if isinstance(value, (str, int, float, bool)) or value is None
+            else str(value) for name, value in (params or {}).items()}
+
+
+def rule_name(rule):
+    """Returns the name of a rule, a bound method or a partial of one.
+    """
+    return getattr(getattr(rule, 'func', rule), '__name__', repr(rule))
+
+
+def changed_fields(instance, cleaned_data):
+    """Returns the set of fields of `cleaned_data` whose value differs
+    from that of the saved `instance`.
+    """
+    changed = set()
+    for name, value in cleaned_data.items():
+        try:
+            field = instance._meta.get_field(name)
+        except FieldDoesNotExist:
+            changed.add(name)
+            continue
+        if field.many_to_many:
+            saved = {obj.pk for obj in getattr(instance, name).all()}
+            value = {getattr(obj, 'pk', obj) for obj in value or []}
+        elif field.is_relation:
+            saved = getattr(instance, field.attname)
+            value = getattr(value, 'pk', value)
+        else:
+            saved = getattr(instance, name)
+        if value != saved:
+            changed.add(name)
+    return changed
+
+
+class RuleRunnerMixin:
+    """A form validator mixin that runs the validator's rules in turn.
+
+    By default the first failing rule raises a ValidationError, as
+    `validate()` always has. `collect_errors()` instead runs every rule
+    and returns a list of RuleErrors. While collecting, the errors of
+    `raise_validation_error()` and of rule tables are recorded without
+    raising; only the edc_form_validators methods called directly still
+    raise.
+
+    If an instrumentation sink is registered, the validation and each
+    rule it runs are timed and their queries counted, see
+    instrumentation.register_sink().
+
+    If `incremental`, or the ESR21_INCREMENTAL_VALIDATION setting, is
+    True and a saved instance is edited, a rule listed in `rule_fields`,
+    rule name to the cleaned_data fields it reads, is skipped if none of
+    those fields changed; the saved instance passed it already. Rules
+    not listed always run.
+
+    If `plan`, or the ESR21_PLAN_RULES setting, is True, the rules of
+    each `run_rules()` call run cheapest first, see rule_planner, so the
+    first failing rule to raise may differ from the declared order.
+    """
+
+    collect = False
+
+    current_rule = None
+
+    rule_fields = {}
+
+    rule_costs = {}
+
+    def __init__(self, *args, incremental=None, plan=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if incremental is None:
+            incremental = getattr(settings, 'ESR21_INCREMENTAL_VALIDATION', False)
+        if plan is None:
+            plan = getattr(settings, 'ESR21_PLAN_RULES', False)
+        self.incremental = incremental
+        self.plan = plan
+
+    @property
+    def changed_fields(self):
+        """Returns the set of fields changed against the instance, or
+        None if not editing a saved instance.
+        """
+        try:
+            return self._changed_fields
+        except AttributeError:
+            self._changed_fields = None
+            if getattr(self.instance, 'pk', None) is not None:
+                self._changed_fields = changed_fields(self.instance, self.cleaned_data)
+            return self._changed_fields
+
+    def skip_rule(self, rule):
+        if not self.incremental:
+            return False
+        fields = self.rule_fields.get(rule_name(rule))
+        return (fields is not None and self.changed_fields is not None
+                and not self.changed_fields.intersection(fields))
+
+    def validate(self):
+        if instrumentation.sinks:
+            return instrumentation.instrumented(self, 'validate', super().validate)
+        return super().validate()
+
+    def run_rules(self, *rules):
+        if self.plan and not self.collect:
+            rules = sorted(
+                rules, key=lambda rule: rule_planner.rule_cost(self, rule_name(rule)))
+        for rule in rules:
+            self.run_rule(rule)
+
+    def run_rule(self, rule):
+        if self.skip_rule(rule):
+            return None
+        call = rule
+        if instrumentation.sinks:
+            call = partial(instrumentation.instrumented, self, rule_name(rule), rule)
+        if not self.collect:
+            return call()
+        error_codes = len(self._error_codes)
+        current_rule, self.current_rule = self.current_rule, rule
+        try:
+            call()
+        except ValidationError as e:
+            self.add_rule_errors(rule, e, self._error_codes[error_codes:])
+        finally:
+            self.current_rule = current_rule
+
+    def run_rule_table(self, rule_table):
+        """Runs the violated rows of a RuleTable through the
+        edc_form_validators method the row's kind names.
+        """
+        for rule in rule_table.violations(self.cleaned_data):
+            if self.collect:
+                field, message, code = rule_error(rule, self.cleaned_data)
+                self.record_error(rule.kind, field, message, code)
+                continue
+            dependent = ('field_applicable' if rule.kind == APPLICABLE_IF
+                         else 'field_required')
+            self.run_rule(partial(
+                getattr(self, rule.kind), *rule.responses,
+                field=rule.field, **{dependent: rule.dependent}))
+
+    def raise_validation_error(self, message, code, field=None, **params):
+        """Raises a ValidationError of `message`, formatted with the
+        message arguments `params`, with the stable `code`, see
+        rule_codes, on `field` or, if not given, on the form.
+
+        While collecting errors the error is recorded against the running
+        rule instead and None is returned, so a rule that would go on to
+        use what it just found missing must return after it.
+        """
+        if self.collect:
+            return self.record_error(
+                rule_name(self.current_rule), field, message, code, params)
+        error = ValidationError(message, code=code, params=params or None)
+        self._error_codes.append(code)
+        if field:
+            self._errors.update({field: message % params if params else message})
+            raise ValidationError({field: error})
+        raise error
+
+    def record_error(self, rule, field, message, code, params=None):
+        """Records a RuleError of the rule named `rule`, as if its
+        ValidationError had been raised and caught.
+        """
+        message = message % params if params else message
+        self._error_codes.append(code)
+        if field:
+            self._errors.update({field: message})
+        code = stable_code(code, rule)
+        self.rule_errors.append(RuleError(
+            field or NON_FIELD_ERRORS, rule, message, code, severity(code),
+            message_params(params)))
+
+    def add_rule_errors(self, rule, error, codes=None):
+        code = (codes or [None])[0] or getattr(error, 'code', None)
+        if hasattr(error, 'error_dict'):
+            errors = error.error_dict.items()
+        else:
+            errors = [(NON_FIELD_ERRORS, error.error_list)]
+        for field, field_errors in errors:
+            for field_error in field_errors:
+                error_code = stable_code(field_error.code or code, rule_name(rule))
+                for message in field_error:
+                    self.rule_errors.append(RuleError(
+                        field, rule_name(rule), message, error_code,
+                        severity(error_code), message_params(field_error.params)))
+
+    def collect_errors(self):
+        """Runs every rule and returns a list of RuleErrors, empty if
+        the cleaned_data is valid.
+        """
+        self.collect = True
+        self.current_rule = self.clean
+        self.rule_errors = []
+        try:
+            if instrumentation.sinks:
+                instrumentation.instrumented(self, 'collect_errors', self.clean)
+            else:
+                self.clean()
+        except ValidationError as e:
+            self.add_rule_errors(self.clean, e)
+        finally:
+            self.collect = False
+            self.current_rule = None
+        return self.rule_errors
@@ -0,0 +1,102 @@
+from collections import namedtuple
+
+from edc_constants.constants import NOT_APPLICABLE
+from edc_form_validators import (
+    APPLICABLE_ERROR, NOT_APPLICABLE_ERROR, NOT_REQUIRED_ERROR, REQUIRED_ERROR)
+
+REQUIRED_IF = 'required_if'
+NOT_REQUIRED_IF = 'not_required_if'
+APPLICABLE_IF = 'applicable_if'
+
+ConditionalRule = namedtuple('ConditionalRule', 'field responses dependent kind')
+
+
+def _required_if(field, responses, dependent):
+    def violated(cleaned_data):
+        if field not in cleaned_data:
+            return False
+        value = cleaned_data.get(dependent)
+        return ((cleaned_data.get(field) in responses)
+                == (not value or value == NOT_APPLICABLE))
+    return violated
+
+
+def _not_required_if(field, responses, dependent):
+    def violated(cleaned_data):
+        if field not in cleaned_data or dependent not in cleaned_data:
+            return False
+        value = cleaned_data.get(dependent)
+        return ((cleaned_data.get(field) in responses)
+                != (not value or value == NOT_APPLICABLE))
+    return violated
+
+
+def _applicable_if(field, responses, dependent):
+    def violated(cleaned_data):
+        if field not in cleaned_data or dependent not in cleaned_data:
+            return False
+        return ((cleaned_data.get(field) in responses)
+                == (cleaned_data.get(dependent) == NOT_APPLICABLE))
+    return violated
+
+
+compilers = {
+    REQUIRED_IF: _required_if,
+    NOT_REQUIRED_IF: _not_required_if,
+    APPLICABLE_IF: _applicable_if}
+
+
+def rule_error(rule, cleaned_data):
+    """Returns the (field, message, code) of the error the
+    edc_form_validators method of a violated rule raises.
+    """
+    triggered = cleaned_data.get(rule.field) in rule.responses
+    if rule.kind == APPLICABLE_IF:
+        if triggered:
+            return rule.dependent, 'This field is applicable', APPLICABLE_ERROR
+        return rule.dependent, 'This field is not applicable', NOT_APPLICABLE_ERROR
+    if triggered == (rule.kind == REQUIRED_IF):
+        return rule.dependent, 'This field is required.', REQUIRED_ERROR
+    return rule.dependent, 'This field is not required.', NOT_REQUIRED_ERROR
+
+
+class RuleTable:
+    """A declarative table of conditional field rules, one row per
+    (trigger field, trigger values, dependent field, rule kind), e.g.:
+
+        conditional_rules = RuleTable(
+            ('physical_exam', NO, 'reason_not_done', APPLICABLE_IF),
+            ('physical_exam', YES, 'exam_date', REQUIRED_IF))
+
+    The rows are compiled once, when the validator class is defined, to
+    a flat list of predicates that checks a cleaned_data dictionary in
+    one pass. Only a violated row goes through the edc_form_validators
+    method of the same name (see `RuleRunnerMixin.run_rule_table`), or
+    while collecting errors is recorded with that method's message and
+    code, see rule_error(), so error messages and codes are unchanged.
+    """
+
+    def __init__(self, *rows):
+        self.rules = []
+        for field, responses, dependent, kind in rows:
+            if not isinstance(responses, (list, tuple)):
+                responses = (responses, )
+            self.rules.append(
+                ConditionalRule(field, tuple(responses), dependent, kind))
+        self.rules = tuple(self.rules)
+        self.evaluators = tuple(
+            (compilers[rule.kind](rule.field, rule.responses, rule.dependent), rule)
+            for rule in self.rules)
+
+    def __iter__(self):
+        return iter(self.rules)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def violations(self, cleaned_data):
+        """Yields each violated rule, in table order.
+        """
+        for violated, rule in self.evaluators:
+            if violated(cleaned_data):
+                yield rule
@@ -1,32 +1,38 @@
-from django.apps import apps as django_apps
-from django.core.exceptions import ValidationError
+from functools import partial
+
 from edc_constants.constants import YES, OTHER
 from edc_form_validators import FormValidator
 
+from .model_resolver import AppConfigAttribute, get_model
+from .rule_codes import SCREENING_REPORT_BEFORE_STUDY_OPEN
+from .rule_runner_mixin import RuleRunnerMixin
+
 
-class ScreeningEligibilityFormValidator(FormValidator):
-    edc_protocol = django_apps.get_app_config('edc_protocol')
+class ScreeningEligibilityFormValidator(RuleRunnerMixin, FormValidator):
+    edc_protocol = AppConfigAttribute('edc_protocol')
 
     @property
     def screening_eligibility_cls(self):
-        return django_apps.get_model(self.screening_eligibility_model)
+        return get_model(self.screening_eligibility_model)
 
     def clean(self):
-        report_datetime = self.cleaned_data.get('report_datetime')
-
-        self.m2m_required_if(YES,
-                             field='symptomatic_infections_experiences',
-                             m2m_field='symptomatic_infections')
-
-        self.m2m_other_specify(OTHER,
-                               m2m_field='symptomatic_infections',
-                               field_other='symptomatic_infections_other', )
+        self.run_rules(
+            partial(self.m2m_required_if, YES,
+                    field='symptomatic_infections_experiences',
+                    m2m_field='symptomatic_infections'),
+            partial(self.m2m_other_specify, OTHER,
+                    m2m_field='symptomatic_infections',
+                    field_other='symptomatic_infections_other', ),
+            self.validate_report_datetime,
+            partial(self.required_if, YES, field='childbearing_potential',
+                    field_required='birth_control'),
+            partial(self.required_if, YES, field='birth_control',
+                    field_required='birthcontrol_agreement'))
 
+    def validate_report_datetime(self):
+        report_datetime = self.cleaned_data.get('report_datetime')
         if report_datetime and self.edc_protocol.study_open_datetime > report_datetime:
-            message = {
-                'report_datetime': ('Date cannot be before study starts. Study opened on'
-                                    f' {self.edc_protocol.study_open_datetime.date()}.')}
-            self._errors.update(message)
-            raise ValidationError(message)
-        self.required_if(YES, field='childbearing_potential', field_required='birth_control')
-        self.required_if(YES, field='birth_control', field_required='birthcontrol_agreement')
+            self.raise_validation_error(
+                'Date cannot be before study starts. Study opened on %(study_open_date)s.',
+                SCREENING_REPORT_BEFORE_STUDY_OPEN, field='report_datetime',
+                study_open_date=self.edc_protocol.study_open_datetime.date())
@@ -1,28 +1,36 @@
-from django.core.exceptions import ValidationError
 from edc_constants.constants import OTHER
 from edc_form_validators import FormValidator
 
+from .rule_codes import (
+    SAE_ADMISSION_AFTER_END, SAE_ADMISSION_BEFORE_START, SAE_AWARE_BEFORE_START,
+    SAE_DISCHARGE_BEFORE_ADMISSION)
+from .rule_runner_mixin import RuleRunnerMixin
+from .sql_pushdown import ColumnComparison
 
-class SeriousAdverseEventRecordFormValidator(FormValidator):
+
+class SeriousAdverseEventRecordFormValidator(RuleRunnerMixin, FormValidator):
+
+    column_rules = (
+        ColumnComparison('validate_date_aware_of', 'date_aware_of', 'lt', 'start_date'),)
 
     def clean(self):
-        cleaned_data = self.cleaned_data
-        self.validate_date_aware_of(cleaned_data=cleaned_data)
-        self.validate_hospitalization(cleaned_data=cleaned_data)
-        self.validate_incapacity()
-        self.validate_medical_event()
+        self.run_rules(
+            self.validate_date_aware_of,
+            self.validate_hospitalization,
+            self.validate_incapacity,
+            self.validate_medical_event)
 
     def validate_date_aware_of(self, cleaned_data=None):
+        cleaned_data = cleaned_data or self.cleaned_data
         date_aware_of = cleaned_data.get('date_aware_of')
         start_date = cleaned_data.get('start_date')
         if date_aware_of and date_aware_of < start_date:
-            message = {'date_aware_of':
-                       'The date investigator became aware of SAE can not be '
-                       'before the start date.'}
-            self._errors.update(message)
-            raise ValidationError(message)
+            self.raise_validation_error(
+                'The date investigator became aware of SAE can not be '
+                'before the start date.', SAE_AWARE_BEFORE_START, field='date_aware_of')
 
     def validate_hospitalization(self, cleaned_data=None):
+        cleaned_data = cleaned_data or self.cleaned_data
         qs = cleaned_data.get('seriousness_criteria')
         if qs and qs.count() > 0:
             selected = {obj.short_name: obj.name for obj in qs}
@@ -46,20 +54,19 @@ class SeriousAdverseEventRecordFormValidator(FormValidator):
         end_date = cleaned_data.get('resolution_date')
         if admission_date:
             if admission_date < start_date:
-                message = {'admission_date':
-                           'Admission date cannot be before the SAE start date'}
-                self._errors.update(message)
-                raise ValidationError(message)
+                self.raise_validation_error(
+                    'Admission date cannot be before the SAE start date',
+                    SAE_ADMISSION_BEFORE_START, field='admission_date')
+                return
             if end_date and admission_date > end_date:
-                message = {'admission_date':
-                           'Admission date cannot be after the SAE end date'}
-                self._errors.update(message)
-                raise ValidationError(message)
+                self.raise_validation_error(
+                    'Admission date cannot be after the SAE end date',
+                    SAE_ADMISSION_AFTER_END, field='admission_date')
+                return
         if discharge_date and discharge_date < admission_date:
-            message = {'discharge_date':
-                       'Discharge date cannot be before the admission date'}
-            self._errors.update(message)
-            raise ValidationError(message)
+            self.raise_validation_error(
+                'Discharge date cannot be before the admission date',
+                SAE_DISCHARGE_BEFORE_ADMISSION, field='discharge_date')
 
     def validate_incapacity(self):
         self.m2m_other_specify(
@@ -1,30 +1,36 @@
-from django.core.exceptions import ValidationError
 from edc_form_validators import FormValidator
 
+from .rule_codes import AESI_AWARE_BEFORE_START, AESI_END_BEFORE_START
+from .rule_runner_mixin import RuleRunnerMixin
+from .sql_pushdown import ColumnComparison
 
-class SpecialInterestAERecordFormValidator(FormValidator):
+
+class SpecialInterestAERecordFormValidator(RuleRunnerMixin, FormValidator):
+
+    column_rules = (
+        ColumnComparison('validate_aesi_end_date', 'end_date', 'lt', 'start_date'),
+        ColumnComparison('validate_date_aware_of', 'date_aware_of', 'lt', 'start_date'))
 
     def clean(self):
-        cleaned_data = self.cleaned_data
-        self.validate_aesi_end_date(cleaned_data=cleaned_data)
-        self.validate_date_aware_of(cleaned_data=cleaned_data)
+        self.run_rules(
+            self.validate_aesi_end_date,
+            self.validate_date_aware_of)
 
     def validate_aesi_end_date(self, cleaned_data=None):
+        cleaned_data = cleaned_data or self.cleaned_data
         start_date = cleaned_data.get('start_date')
         end_date = cleaned_data.get('end_date', None)
 
         if end_date and end_date < start_date:
-            message = {'end_date':
-                       'AESI end date can not be before AESI start date'}
-            self._errors.update(message)
-            raise ValidationError(message)
+            self.raise_validation_error(
+                'AESI end date can not be before AESI start date',
+                AESI_END_BEFORE_START, field='end_date')
 
     def validate_date_aware_of(self, cleaned_data=None):
+        cleaned_data = cleaned_data or self.cleaned_data
         date_aware_of = cleaned_data.get('date_aware_of')
         start_date = cleaned_data.get('start_date')
         if date_aware_of and date_aware_of < start_date:
-            message = {'date_aware_of':
-                       'The date investigator became aware of AESI can not be '
-                       'before the start date.'}
-            self._errors.update(message)
-            raise ValidationError(message)
+            self.raise_validation_error(
+                'The date investigator became aware of AESI can not be '
+                'before the start date.', AESI_AWARE_BEFORE_START, field='date_aware_of')
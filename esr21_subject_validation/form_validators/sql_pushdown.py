@@ -0,0 +1,115 @@
+from collections import namedtuple
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import F, Q
+from edc_constants.constants import NOT_APPLICABLE
+
+from .rule_table import APPLICABLE_IF, NOT_REQUIRED_IF, REQUIRED_IF, ConditionalRule
+
+ColumnComparison = namedtuple('ColumnComparison', 'rule field lookup other')
+ColumnComparison.__doc__ = """A rule violated if `field <lookup> other` for
+two columns of the same row, e.g. the AE end date before its start date:
+
+    ColumnComparison('validate_ae_end_date', 'stop_date', 'lt', 'start_date')
+
+Rows where either column is empty do not violate the rule.
+"""
+
+
+def get_field(model_cls, name):
+    try:
+        return model_cls._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def is_text(field):
+    return isinstance(field, (models.CharField, models.TextField))
+
+
+def empty(field):
+    """Returns a Q of the rows where `field` is empty as the validators
+    see it, i.e. `not value or value == NOT_APPLICABLE`.
+    """
+    q = Q(**{f'{field.name}__isnull': True})
+    if is_text(field):
+        q |= Q(**{field.name: ''}) | Q(**{field.name: NOT_APPLICABLE})
+    elif isinstance(field, models.BooleanField):
+        q |= Q(**{field.name: False})
+    elif isinstance(field, (models.IntegerField, models.FloatField,
+                            models.DecimalField)):
+        q |= Q(**{field.name: 0})
+    return q
+
+
+def response_in(field, responses):
+    q = Q(**{f'{field.name}__in': [r for r in responses if r is not None]})
+    if None in responses:
+        q |= Q(**{f'{field.name}__isnull': True})
+    return q
+
+
+def compile_rule(rule, model_cls):
+    """Returns a Q of the rows of `model_cls` that violate `rule`, a
+    ColumnComparison or a RuleTable row, or None if the model does not
+    have the rule's fields.
+    """
+    if isinstance(rule, ColumnComparison):
+        if not (get_field(model_cls, rule.field) and get_field(model_cls, rule.other)):
+            return None
+        return Q(**{f'{rule.field}__{rule.lookup}': F(rule.other)})
+
+    field = get_field(model_cls, rule.field)
+    dependent = get_field(model_cls, rule.dependent)
+    if not (field and dependent):
+        return None
+    triggered = response_in(field, rule.responses)
+    if rule.kind == REQUIRED_IF:
+        return (triggered & empty(dependent)) | (~triggered & ~empty(dependent))
+    if rule.kind == NOT_REQUIRED_IF:
+        return (triggered & ~empty(dependent)) | (~triggered & empty(dependent))
+    if rule.kind == APPLICABLE_IF:
+        if is_text(dependent):
+            not_applicable = Q(**{dependent.name: NOT_APPLICABLE})
+        else:
+            not_applicable = Q(pk__in=[])
+        return (triggered & not_applicable) | (~triggered & ~not_applicable)
+    raise ValueError(f'Unknown rule kind {rule.kind!r}.')
+
+
+def rule_label(rule):
+    if isinstance(rule, ConditionalRule):
+        return f'{rule.kind}:{rule.field}:{rule.dependent}'
+    return rule.rule
+
+
+def compile_rules(validator_cls, model_cls):
+    """Returns a dictionary of rule label to Q for each of the
+    validator's `conditional_rules` and `column_rules` that `model_cls`
+    has the fields for.
+    """
+    rules = (list(getattr(validator_cls, 'conditional_rules', None) or [])
+             + list(getattr(validator_cls, 'column_rules', None) or []))
+    compiled = {}
+    for rule in rules:
+        q = compile_rule(rule, model_cls)
+        if q is not None:
+            compiled[rule_label(rule)] = q
+    return compiled
+
+
+def find_violations(validator_cls, queryset):
+    """Returns a dictionary of rule label to a queryset of the stored
+    rows, of `queryset` or a model class, that violate the rule.
+
+    Each queryset is one query when evaluated, e.g.
+    `.values_list('pk', flat=True)`, and no instances are validated in
+    Python. Only rules declared as RuleTable rows or ColumnComparisons
+    are compiled; the validator's other rules still need `validate()`.
+    """
+    if isinstance(queryset, type):
+        queryset = queryset._default_manager.all()
+    return {
+        label: queryset.filter(q)
+        for label, q in compile_rules(validator_cls, queryset.model).items()}
@@ -0,0 +1,289 @@
+from contextvars import ContextVar
+from weakref import WeakSet
+
+from .data_loader import DataLoader
+from .dose_ledger import DoseLedger
+from .model_resolver import get_subject_status_model
+from .repositories import OrmRepository, OverlayRepository, identifiers_of
+
+_active_subject_context = ContextVar('subject_context', default=None)
+
+
+class SubjectContext:
+    """Caches the per-subject rows the form validators look up so that
+    each row is read once per request or batch.
+
+    Entering the context makes it the active context for every validator
+    instantiated inside the block, for example:
+
+        with SubjectContext():
+            VaccineDetailsFormValidator(cleaned_data=cleaned_data).validate()
+            VaccinationHistoryFormValidator(cleaned_data=other).validate()
+
+    Rows are read from `repository`, see repositories, by default the
+    database. Saved and deleted rows are dropped from every live
+    context, see signals.invalidate().
+    """
+
+    live = WeakSet()
+
+    def __init__(self, *, repository=None):
+        self.repository = repository or OrmRepository()
+        self._cache = {}
+        self._loaders = {}
+        self._tokens = []
+        SubjectContext.live.add(self)
+
+    def __enter__(self):
+        self._tokens.append(_active_subject_context.set(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        _active_subject_context.reset(self._tokens.pop())
+
+    @classmethod
+    def active(cls):
+        """Returns the subject context of the enclosing block, if any.
+        """
+        return _active_subject_context.get()
+
+    def _cached(self, key, loader):
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = loader()
+            return value
+
+    def clear(self):
+        self._cache = {}
+        self._loaders = {}
+
+    def loader(self, model_cls, field='pk', select_related=()):
+        """Returns the DataLoader of the rows of `model_cls` by `field`
+        shared by every validator using this context.
+        """
+        key = (model_cls, field, tuple(select_related))
+        try:
+            return self._loaders[key]
+        except KeyError:
+            loader = self._loaders[key] = DataLoader(
+                model_cls, field=field, select_related=select_related,
+                repository=self.repository)
+            return loader
+
+    def invalidate(self, model_cls, identifiers=None):
+        """Drops the cached rows of `model_cls` of any of the subject or
+        screening `identifiers`, or all of them if none are given.
+        The rows of `model_cls` loaded by a DataLoader are all dropped.
+        """
+        for (loader_model_cls, *_), loader in self._loaders.items():
+            if loader_model_cls is model_cls:
+                loader.clear()
+        for key in list(self._cache):
+            kind, key_model_cls, lookup = key
+            if key_model_cls is not model_cls:
+                continue
+            values = ({value for _, value in lookup} if isinstance(lookup, tuple)
+                      else {lookup})
+            if not identifiers or values.intersection(identifiers):
+                self._cache.pop(key, None)
+
+    def _missing(self, kind, model_cls, keys):
+        return [key for key in set(keys)
+                if key and (kind, model_cls, key) not in self._cache]
+
+    def prefetch_informed_consents(self, model_cls, field, values):
+        """Loads the latest informed consent for each of the values of
+        `field`, e.g. subject_identifier, with one query.
+        """
+        values = [value for value in set(values) if value and (
+            'informed_consent', model_cls, ((field, value), )) not in self._cache]
+        consents = dict.fromkeys(values)
+        for consent in sorted(self.repository.filter(
+                model_cls, **{f'{field}__in': values}),
+                key=lambda consent: consent.consent_datetime):
+            consents[getattr(consent, field)] = consent
+        for value, consent in consents.items():
+            self._cache[('informed_consent', model_cls, ((field, value), ))] = consent
+
+    def prefetch_subject_statuses(self, model_cls, field, values):
+        """Loads the subject status row of each of the values of `field`,
+        subject_identifier or screening_identifier, with one query.
+        """
+        values = [value for value in set(values) if value and (
+            'subject_status', model_cls, ((field, value), )) not in self._cache]
+        statuses = dict.fromkeys(values)
+        for status in self.repository.filter(model_cls, **{f'{field}__in': values}):
+            statuses[getattr(status, field)] = status
+        for value, status in statuses.items():
+            self._cache[('subject_status', model_cls, ((field, value), ))] = status
+
+    def prefetch_eligibility_confirmations(self, model_cls, screening_identifiers):
+        keys = self._missing(
+            'eligibility_confirmation', model_cls, screening_identifiers)
+        objs = dict.fromkeys(keys)
+        for obj in self.repository.filter(model_cls, screening_identifier__in=keys):
+            objs[obj.screening_identifier] = obj
+        for key, obj in objs.items():
+            self._cache[('eligibility_confirmation', model_cls, key)] = obj
+
+    def prefetch_vaccination_histories(self, model_cls, subject_identifiers):
+        keys = self._missing('vaccination_history', model_cls, subject_identifiers)
+        objs = dict.fromkeys(keys)
+        for obj in self.repository.filter(model_cls, subject_identifier__in=keys):
+            objs[obj.subject_identifier] = obj
+        for key, obj in objs.items():
+            self._cache[('vaccination_history', model_cls, key)] = obj
+
+    def prefetch_vaccination_details(self, model_cls, subject_identifiers):
+        keys = self._missing('vaccination_details', model_cls, subject_identifiers)
+        doses = {key: {} for key in keys}
+        for obj in self.repository.filter(
+                model_cls, select_related=('subject_visit__appointment', ),
+                subject_visit__subject_identifier__in=keys):
+            doses[obj.subject_visit.subject_identifier][obj.received_dose_before] = obj
+        for key, objs in doses.items():
+            self._cache[('vaccination_details', model_cls, key)] = objs
+
+    def informed_consent(self, model_cls, **lookup):
+        """Returns the latest informed consent matching the lookup,
+        e.g. subject_identifier or screening_identifier, or None.
+        """
+        return self._cached(
+            ('informed_consent', model_cls, tuple(lookup.items())),
+            lambda: self.repository.latest(model_cls, 'consent_datetime', **lookup))
+
+    def subject_status(self, model_cls, **lookup):
+        """Returns the subject status row matching the lookup,
+        subject_identifier or screening_identifier, or None.
+        """
+        return self._cached(
+            ('subject_status', model_cls, tuple(lookup.items())),
+            lambda: self.repository.first(model_cls, **lookup))
+
+    def eligibility_confirmation(self, model_cls, screening_identifier=None):
+        """Returns the eligibility confirmation for the screening
+        identifier or None.
+        """
+        return self._cached(
+            ('eligibility_confirmation', model_cls, screening_identifier),
+            lambda: self.repository.get(
+                model_cls, screening_identifier=screening_identifier))
+
+    def vaccination_history(self, model_cls, subject_identifier=None):
+        """Returns the vaccination history for the subject or None.
+        """
+        return self._cached(
+            ('vaccination_history', model_cls, subject_identifier),
+            lambda: self.repository.get(
+                model_cls, subject_identifier=subject_identifier))
+
+    def vaccination_details(self, model_cls, subject_identifier=None):
+        """Returns a dictionary of the subject's vaccination details
+        keyed by `received_dose_before`.
+        """
+        return self._cached(
+            ('vaccination_details', model_cls, subject_identifier),
+            lambda: {
+                obj.received_dose_before: obj for obj in self.repository.filter(
+                    model_cls, select_related=('subject_visit__appointment', ),
+                    subject_visit__subject_identifier=subject_identifier)})
+
+    def vaccination_dates(self, model_cls, subject_identifier=None):
+        """Returns a dictionary of the subject's vaccination dates
+        keyed by `received_dose_before`.
+
+        Reuses the subject's vaccination details if already loaded.
+        """
+        details_key = ('vaccination_details', model_cls, subject_identifier)
+        if details_key in self._cache:
+            return {dose: obj.vaccination_date
+                    for dose, obj in self._cache[details_key].items()}
+        return self._cached(
+            ('vaccination_dates', model_cls, subject_identifier),
+            lambda: dict(self.repository.values_list(
+                model_cls, ('received_dose_before', 'vaccination_date'),
+                subject_visit__subject_identifier=subject_identifier)))
+
+    def dose_ledger(self, details_model_cls, history_model_cls,
+                    subject_identifier=None):
+        """Returns a DoseLedger of the subject's vaccination details,
+        with their visits and appointments, and vaccination history.
+        """
+        return DoseLedger(
+            doses=self.vaccination_details(
+                details_model_cls, subject_identifier=subject_identifier),
+            vaccination_history=self.vaccination_history(
+                history_model_cls, subject_identifier=subject_identifier))
+
+
+class OverlaySubjectContext(SubjectContext):
+    """A SubjectContext whose lookups see the rows added with `add()`,
+    unsaved instances, as if they were saved, e.g. the earlier records
+    of a sync batch, see repositories.OverlayRepository.
+
+    The subject status table is not read since it does not know about
+    the added rows.
+    """
+
+    def __init__(self, *, repository=None):
+        super().__init__(repository=OverlayRepository(repository))
+
+    def add(self, obj):
+        """Adds `obj`, an unsaved instance, and drops the cached rows of
+        its model of its subject.
+        """
+        self.repository.add(obj)
+        self.invalidate(obj.__class__, identifiers_of(obj))
+        if obj.pk is not None:
+            for (model_cls, field, _), loader in self._loaders.items():
+                if model_cls is obj.__class__ and field == 'pk':
+                    loader.prime([obj])
+
+    def prefetch_subject_statuses(self, model_cls, field, values):
+        pass
+
+    def subject_status(self, model_cls, **lookup):
+        return None
+
+
+class SubjectContextMixin:
+    """A form validator mixin that reads subject rows through a
+    SubjectContext.
+
+    Uses the `subject_context` passed in, otherwise a context private to
+    this validator instance reading `repository` if given, otherwise the
+    active context, otherwise a private context reading the database.
+    """
+
+    def __init__(self, *args, subject_context=None, repository=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not subject_context and repository:
+            subject_context = SubjectContext(repository=repository)
+        self.subject_context = (
+            subject_context or SubjectContext.active() or SubjectContext())
+
+    def subject_status(self, **lookup):
+        """Returns the subject's status row, if a status model is
+        configured and the row exists, otherwise None.
+        """
+        model_cls = get_subject_status_model()
+        if not model_cls or not any(lookup.values()):
+            return None
+        return self.subject_context.subject_status(model_cls, **lookup)
+
+    @classmethod
+    def prefetch_subject_status(cls, subject_context, field, values):
+        """Loads the status rows of the values of `field`, if a status
+        model is configured, with one query.
+        """
+        model_cls = get_subject_status_model()
+        if model_cls:
+            subject_context.prefetch_subject_statuses(model_cls, field, values)
+
+    @classmethod
+    def prefetch(cls, subject_context, records):
+        """Override to bulk load the rows this validator looks up for
+        all of `records`, a list of cleaned_data dictionaries.
+        """
+        pass
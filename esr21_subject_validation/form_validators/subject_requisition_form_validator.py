@@ -1,3 +1,5 @@
+from functools import partial
+
 from edc_form_validators import FormValidator
 from .crf_form_validator import CRFFormValidator
 
@@ -7,8 +9,8 @@ class SubjectRequisitionFormValidator(CRFFormValidator, FormValidator):
     def clean(self):
         super().clean()
 
-        self.validate_other_specify(field='reason_not_drawn')
-
-        self.validate_other_specify(field='item_type')
-
-        self.required_if('urgent', field='priority', field_required='urgent_specify')
+        self.run_rules(
+            partial(self.validate_other_specify, field='reason_not_drawn'),
+            partial(self.validate_other_specify, field='item_type'),
+            partial(self.required_if, 'urgent', field='priority',
+                    field_required='urgent_specify'))
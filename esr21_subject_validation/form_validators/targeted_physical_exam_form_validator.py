@@ -1,28 +1,26 @@
 from edc_constants.choices import YES, NO
 from edc_form_validators import FormValidator
 
+from .rule_runner_mixin import RuleRunnerMixin
+from .rule_table import REQUIRED_IF, RuleTable
 
-class TargetedPhysicalExamFormValidator(FormValidator):
 
-    def clean(self):
-        super().clean()
+class TargetedPhysicalExamFormValidator(RuleRunnerMixin, FormValidator):
+
+    physical_exam_performed_rules = RuleTable(
+        ('physical_exam_performed', YES, 'area_performed', REQUIRED_IF),
+        ('physical_exam_performed', YES, 'exam_date', REQUIRED_IF),
+        ('physical_exam_performed', YES, 'abnormalities', REQUIRED_IF))
 
-        self.required_if(
-            NO,
-            field='physical_exam_performed',
-            field_required='reason_not_done')
+    conditional_rules = RuleTable(
+        ('physical_exam_performed', NO, 'reason_not_done', REQUIRED_IF),
+        *physical_exam_performed_rules,
+        ('abnormalities', YES, 'if_abnormalities', REQUIRED_IF))
 
-        self.validate_physical_exam_performed()
+    def clean(self):
+        super().clean()
 
-        self.required_if(
-            YES,
-            field='abnormalities',
-            field_required='if_abnormalities')
+        self.run_rule_table(self.conditional_rules)
 
     def validate_physical_exam_performed(self):
-        fields = ['area_performed', 'exam_date', 'abnormalities']
-        for field in fields:
-            self.required_if(
-                YES,
-                field='physical_exam_performed',
-                field_required=field)
+        self.run_rule_table(self.physical_exam_performed_rules)
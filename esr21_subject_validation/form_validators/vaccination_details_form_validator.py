@@ -1,83 +1,164 @@
-from django.apps import apps as django_apps
-from django.core.exceptions import ValidationError
+from functools import partial
+
 from edc_constants.constants import YES, NO
 from edc_form_validators import FormValidator
 
 from ..constants import FIRST_DOSE, SECOND_DOSE, BOOSTER_DOSE
 from .crf_form_validator import CRFFormValidator
+from .dose_windows import DoseWindows
+from .model_resolver import AppConfigAttribute, get_model
+from .rule_codes import (
+    VAX_BOOSTER_OUTSIDE_WINDOW, VAX_DATE_BEFORE_VISIT, VAX_EXPECTED_BOOSTER_DOSE,
+    VAX_EXPECTED_SECOND_DOSE, VAX_EXPIRY_BEFORE_VISIT, VAX_FIRST_DOSE_MISSING,
+    VAX_NEXT_BEFORE_VISIT, VAX_NEXT_BEFORE_WINDOW, VAX_SECOND_BEFORE_FIRST,
+    VAX_SECOND_OUTSIDE_WINDOW)
+from .rule_planner import AGGREGATE
+from .rule_table import APPLICABLE_IF, REQUIRED_IF, RuleTable
 
 
 class VaccineDetailsFormValidator(CRFFormValidator, FormValidator):
-    edc_protocol = django_apps.get_app_config('edc_protocol')
+    edc_protocol = AppConfigAttribute('edc_protocol')
 
     vaccination_details_cls = 'esr21_subject.vaccinationdetails'
     vaccination_history_cls = 'esr21_subject.vaccinationhistory'
 
+    # label attributes of the models the rules read, and their fields
+    reads = {
+        **CRFFormValidator.reads,
+        'vaccination_details_cls': (
+            'subject_visit', 'received_dose_before', 'vaccination_date'),
+        'vaccination_history_cls': (
+            'subject_identifier', 'received_vaccine', 'dose_quantity')}
+
+    received_dose_rules = RuleTable(
+        ('received_dose', YES, 'vaccination_site', REQUIRED_IF),
+        ('received_dose', YES, 'vaccination_date', REQUIRED_IF),
+        ('received_dose', YES, 'lot_number', REQUIRED_IF),
+        ('received_dose', YES, 'expiry_date', REQUIRED_IF),
+        ('received_dose', YES, 'provider_name', REQUIRED_IF),
+        ('received_dose', YES, 'received_dose_before', APPLICABLE_IF),
+        ('received_dose', YES, 'location', APPLICABLE_IF),
+        ('received_dose', YES, 'admin_per_protocol', APPLICABLE_IF),
+        ('admin_per_protocol', NO, 'reason_not_per_protocol', REQUIRED_IF))
+
+    # runs after the location other-specify check, as it always has
+    next_vaccination_rules = RuleTable(
+        ('received_dose_before', (FIRST_DOSE, SECOND_DOSE), 'next_vaccination_date',
+         REQUIRED_IF))
+
+    conditional_rules = RuleTable(*received_dose_rules, *next_vaccination_rules)
+
+    rule_fields = {
+        **CRFFormValidator.rule_fields,
+        'validate_next_vaccination_required': (
+            'received_dose_before', 'next_vaccination_date'),
+        'validate_vaccination_date': (
+            'subject_visit', 'received_dose_before', 'vaccination_date'),
+        'validate_next_vaccination_dt': (
+            'next_vaccination_date', 'received_dose_before', 'vaccination_date'),
+        'validate_first_dose_against_second_dose': (
+            'subject_visit', 'received_dose_before'),
+        'validate_vaccination_date_against_consent_date': (
+            'subject_visit', 'vaccination_date'),
+        'validate_expiry_dt_against_visit_dt': ('subject_visit', 'expiry_date'),
+        'validate_next_vaccination_dt_against_visit_date': (
+            'subject_visit', 'next_vaccination_date')}
+
+    # both read the subject's dose ledger, vaccination details and history
+    rule_costs = {
+        'validate_vaccination_date': AGGREGATE,
+        'validate_first_dose_against_second_dose': AGGREGATE}
+
     @property
     def vaccination_details_model_cls(self):
-        return django_apps.get_model(self.vaccination_details_cls)
+        return get_model(self.vaccination_details_cls)
 
     @property
     def vaccination_history_model_cls(self):
-        return django_apps.get_model(self.vaccination_history_cls)
+        return get_model(self.vaccination_history_cls)
+
+    @classmethod
+    def prefetch(cls, subject_context, records):
+        """Loads the subject visits, their appointments and, for their
+        subjects, the vaccination details, histories and status rows.
+        """
+        subject_visits = cls.prefetch_subject_visits(subject_context, records)
+        subject_identifiers = [
+            visit.subject_identifier for visit in subject_visits if visit]
+        subject_context.prefetch_vaccination_details(
+            get_model(cls.vaccination_details_cls), subject_identifiers)
+        subject_context.prefetch_vaccination_histories(
+            get_model(cls.vaccination_history_cls), subject_identifiers)
+        cls.prefetch_subject_status(
+            subject_context, 'subject_identifier', subject_identifiers)
 
     def clean(self):
         super().clean()
 
-        required_fields = ['vaccination_site', 'vaccination_date',
-                           'lot_number', 'expiry_date', 'provider_name']
-
-        for required_field in required_fields:
-            self.required_if(YES,
-                             field='received_dose',
-                             field_required=required_field)
-
-        applicable_fields = ['received_dose_before', 'location',
-                             'admin_per_protocol']
-
-        for applicable_field in applicable_fields:
-            self.applicable_if(YES,
-                               field='received_dose',
-                               field_applicable=applicable_field)
+        self.run_rule_table(self.received_dose_rules)
 
-        self.required_if(NO,
-                         field='admin_per_protocol',
-                         field_required='reason_not_per_protocol')
+        self.run_rules(
+            partial(self.validate_other_specify, field='location'),
+            self.validate_next_vaccination_required,
+            self.validate_vaccination_date,
+            self.validate_next_vaccination_dt,
+            self.validate_first_dose_against_second_dose,
+            self.validate_vaccination_date_against_consent_date,
+            self.validate_expiry_dt_against_visit_dt,
+            self.validate_next_vaccination_dt_against_visit_date)
 
-        self.validate_other_specify(field='location')
-
-        self.required_if(*[FIRST_DOSE, SECOND_DOSE],
-                         field='received_dose_before',
-                         field_required='next_vaccination_date')
-
-        self.validate_vaccination_date()
+    @property
+    def subject_identifier(self):
+        return self.subject_visit.subject_identifier
 
-        self.validate_next_vaccination_dt()
+    @property
+    def current_schedule(self):
+        try:
+            return self._current_schedule
+        except AttributeError:
+            self._current_schedule = (
+                self.subject_visit.appointment.schedule_name)
+            return self._current_schedule
 
-        self.validate_first_dose_against_second_dose()
+    @property
+    def dose_windows(self):
+        return DoseWindows.from_protocol(self.edc_protocol)
 
-        self.validate_vaccination_date_against_consent_date()
+    @property
+    def dose_ledger(self):
+        """Returns the subject's doses and vaccination history, read
+        once and shared by all the dose rules.
+        """
+        return self.subject_context.dose_ledger(
+            self.vaccination_details_model_cls,
+            self.vaccination_history_model_cls,
+            subject_identifier=self.subject_identifier)
 
-        self.validate_expiry_dt_against_visit_dt()
+    @property
+    def vaccination_history(self):
+        """Returns the subject's status row if there is one, otherwise
+        the dose ledger; either has the history's `received_vaccine` and
+        `dose_quantity`.
+        """
+        return (self.subject_status(subject_identifier=self.subject_identifier)
+                or self.dose_ledger)
 
-        self.validate_next_vaccination_dt_against_visit_date()
+    def validate_next_vaccination_required(self):
+        self.run_rule_table(self.next_vaccination_rules)
 
     def validate_vaccination_date(self):
         """
         Validate second dose vaccination datetime not before first dose
-        datetime, and not before 56days window period.
+        datetime, and within the protocol's dose window, see dose_windows.
         """
-        subject_identifier = self.cleaned_data.get('subject_visit').subject_identifier
-
-        current_schedule = self.cleaned_data.get('subject_visit').appointment.schedule_name
         schedule_names = ['esr21_fu_schedule', 'esr21_sub_fu_schedule']
-        vaccination_history = self.vaccination_history_model_obj(
-            subject_identifier=subject_identifier)
-        if current_schedule not in schedule_names:
-            if getattr(vaccination_history, 'received_vaccine', None) == NO:
-                self.validate_second_dose_dt(subject_identifier=subject_identifier)
+        if self.current_schedule not in schedule_names:
+            if self.vaccination_history.received_vaccine == NO:
+                self.validate_second_dose_dt(
+                    subject_identifier=self.subject_identifier)
         else:
-            self.validate_second_dose_dt(subject_identifier=subject_identifier)
+            self.validate_second_dose_dt(
+                subject_identifier=self.subject_identifier)
 
     def validate_second_dose_dt(self, subject_identifier=None):
         vaccination_datetime = self.cleaned_data.get('vaccination_date')
@@ -86,19 +167,33 @@ class VaccineDetailsFormValidator(CRFFormValidator, FormValidator):
             second_dose_dt = vaccination_datetime.date()
             vaccination = self.vaccination_details_model_obj(
                 dose_received=FIRST_DOSE, subject_identifier=subject_identifier)
+            if not vaccination:
+                return
             first_dose_dt = vaccination.vaccination_date.date()
 
             second_before_first = True if second_dose_dt < first_dose_dt else False
 
-            difference = (second_dose_dt - first_dose_dt).days
-            second_lt_window = True if difference < 56 else False
-
-            if second_before_first or second_lt_window:
-                message = {'vaccination_date':
-                           'Please make sure the second dose vaccination date '
-                           'is not before the first dose vaccination date or '
-                           'the before the vaccination window period.'}
-                raise ValidationError(message)
+            second_outside_window = self.dose_windows.check(
+                FIRST_DOSE, first_dose_dt, SECOND_DOSE, second_dose_dt) is not None
+
+            if second_before_first or second_outside_window:
+                self.raise_validation_error(
+                    'Please make sure the second dose vaccination date '
+                    'is not before the first dose vaccination date or '
+                    'the before the vaccination window period.',
+                    (VAX_SECOND_BEFORE_FIRST if second_before_first
+                     else VAX_SECOND_OUTSIDE_WINDOW), field='vaccination_date')
+        elif (vaccination_datetime and dose_received == BOOSTER_DOSE
+              and self.dose_windows.window(SECOND_DOSE, BOOSTER_DOSE)):
+            second_dose = self.vaccination_details_model_obj(
+                dose_received=SECOND_DOSE, subject_identifier=subject_identifier)
+            if second_dose and self.dose_windows.check(
+                    SECOND_DOSE, second_dose.vaccination_date,
+                    BOOSTER_DOSE, vaccination_datetime) is not None:
+                self.raise_validation_error(
+                    'Please make sure the booster dose vaccination date '
+                    'is within the vaccination window period after the '
+                    'second dose.', VAX_BOOSTER_OUTSIDE_WINDOW, field='vaccination_date')
 
     def validate_next_vaccination_dt(self):
         """
@@ -109,105 +204,89 @@ class VaccineDetailsFormValidator(CRFFormValidator, FormValidator):
         dose_received = self.cleaned_data.get('received_dose_before')
         vaccination_datetime = self.cleaned_data.get('vaccination_date')
 
-        if vaccination_datetime and dose_received == FIRST_DOSE:
-            first_dose_dt = vaccination_datetime.date()
-            date_diff = (next_vaccination_dt - first_dose_dt).days
+        following = self.dose_windows.following(dose_received)
 
-            if date_diff < 56:
-                message = {'next_vaccination_date':
-                           'The next vaccination date cannot be before the '
-                           'vaccination window period.'}
-                raise ValidationError(message)
+        if vaccination_datetime and next_vaccination_dt and following:
+            _, window = following
+            date_diff = (next_vaccination_dt - vaccination_datetime.date()).days
+
+            if window.min_days and date_diff < window.min_days:
+                self.raise_validation_error(
+                    'The next vaccination date cannot be before the '
+                    'vaccination window period.', VAX_NEXT_BEFORE_WINDOW,
+                    field='next_vaccination_date')
 
     def vaccination_details_model_obj(
             self, dose_received='first_dose', subject_identifier=None):
-        try:
-            vaccination = self.vaccination_details_model_cls.objects.get(
-                subject_visit__subject_identifier=subject_identifier,
-                received_dose_before=dose_received)
-        except self.vaccination_details_model_cls.DoesNotExist:
-            if dose_received == FIRST_DOSE:
-                msg = {'received_dose_before':
-                       'Please capture the first dose vaccination details, '
-                       'before second dose vaccination.'}
-                raise ValidationError(msg)
-            pass
-        else:
-            return vaccination
-
-        self.validate_consent_date()
+        vaccination = self.subject_context.dose_ledger(
+            self.vaccination_details_model_cls,
+            self.vaccination_history_model_cls,
+            subject_identifier=subject_identifier).dose(dose_received)
+        if not vaccination and dose_received == FIRST_DOSE:
+            self.raise_validation_error(
+                'Please capture the first dose vaccination details, '
+                'before second dose vaccination.', VAX_FIRST_DOSE_MISSING,
+                field='received_dose_before')
+        return vaccination
 
     def vaccination_history_model_obj(self, subject_identifier=None):
-        try:
-            vaccination_history = self.vaccination_history_model_cls.objects.get(
-                subject_identifier=subject_identifier)
-        except self.vaccination_history_model_cls.DoesNotExist:
-            return None
-        else:
-            return vaccination_history
+        return self.subject_context.dose_ledger(
+            self.vaccination_details_model_cls,
+            self.vaccination_history_model_cls,
+            subject_identifier=subject_identifier).vaccination_history
 
     def validate_vaccination_date_against_consent_date(self):
-        report_datetime = self.cleaned_data.get('subject_visit').report_datetime
+        report_datetime = self.subject_visit.report_datetime
         vaccination_date = self.cleaned_data.get('vaccination_date')
 
         if vaccination_date and vaccination_date < report_datetime:
-            message = {'vaccination_date':
-                       ('Vaccination date cannot be before visit report date.'
-                        f' {report_datetime}.')}
-            raise ValidationError(message)
+            self.raise_validation_error(
+                'Vaccination date cannot be before visit report date. %(report_datetime)s.',
+                VAX_DATE_BEFORE_VISIT, field='vaccination_date',
+                report_datetime=report_datetime)
 
     def validate_first_dose_against_second_dose(self):
         current_dose = self.cleaned_data.get('received_dose_before')
-        subject_identifier = self.cleaned_data.get('subject_visit').subject_identifier
-        current_schedule = self.cleaned_data.get('subject_visit').appointment.schedule_name
         schedule_names = ['esr21_fu_schedule', 'esr21_sub_fu_schedule']
 
-        if current_schedule in schedule_names:
+        if self.current_schedule in schedule_names:
             if current_dose == 'second_dose':
-                try:
-                    self.vaccination_details_model_cls.objects.get(
-                        subject_visit__subject_identifier=subject_identifier,
-                        received_dose_before='first_dose')
-                except self.vaccination_details_model_cls.DoesNotExist:
-                    message = f'Vaccination details for the first dose do not exist'
-                    raise ValidationError(message)
+                if FIRST_DOSE not in self.dose_ledger:
+                    self.raise_validation_error(
+                        'Vaccination details for the first dose do not exist',
+                        VAX_FIRST_DOSE_MISSING)
 
     def validate_expiry_dt_against_visit_dt(self):
-        report_datetime = self.cleaned_data.get('subject_visit').report_datetime
+        report_datetime = self.subject_visit.report_datetime
         expiry_date = self.cleaned_data.get('expiry_date')
 
         report_dt = report_datetime.date()
         if expiry_date and expiry_date < report_dt:
-                message = {'expiry_date':
-                           f'Expiry date cannot be before the visit date. {report_dt}.'}
-                raise ValidationError(message)
+                self.raise_validation_error(
+                    'Expiry date cannot be before the visit date. %(report_date)s.',
+                    VAX_EXPIRY_BEFORE_VISIT, field='expiry_date', report_date=report_dt)
 
     def validate_next_vaccination_dt_against_visit_date(self):
-        report_datetime = self.cleaned_data.get('subject_visit').report_datetime
+        report_datetime = self.subject_visit.report_datetime
         next_vaccination_dt = self.cleaned_data.get('next_vaccination_date')
 
         if next_vaccination_dt:
             report_dt = report_datetime.date()
             if next_vaccination_dt < report_dt:
-                message = {'next_vaccination_date':
-                           ('Vaccination date cannot be before the visit report'
-                            f' date. {report_datetime}.')}
-                raise ValidationError(message)
+                self.raise_validation_error(
+                    'Vaccination date cannot be before the visit report'
+                    ' date. %(report_datetime)s.', VAX_NEXT_BEFORE_VISIT,
+                    field='next_vaccination_date', report_datetime=report_datetime)
 
     def validate_vac_history_against_vac_d(self):
-        subject_identifier = self.cleaned_data.get('subject_visit').subject_identifier
         dose_received = self.cleaned_data.get('received_dose_before')
 
-        vaccination_history = self.vaccination_history_model_obj(
-            subject_identifier=subject_identifier)
-        if getattr(vaccination_history, 'received_vaccine', None) == YES:
-            if getattr(vaccination_history, 'dose_quantity', None) == '1' and dose_received != SECOND_DOSE:
-                message = {
-                    'received_dose_before':
-                    'Participant has a first dose please select SECOND DOSE'}
-                raise ValidationError(message)
-            elif getattr(vaccination_history, 'dose_quantity', None) == '2' and dose_received != BOOSTER_DOSE:
-                message = {
-                    'received_dose_before':
-                    'Participant has a first dose and second dose please select the BOOSTER DOSE'}
-                raise ValidationError(message)
+        if self.vaccination_history.received_vaccine == YES:
+            if self.vaccination_history.dose_quantity == '1' and dose_received != SECOND_DOSE:
+                self.raise_validation_error(
+                    'Participant has a first dose please select SECOND DOSE',
+                    VAX_EXPECTED_SECOND_DOSE, field='received_dose_before')
+            elif self.vaccination_history.dose_quantity == '2' and dose_received != BOOSTER_DOSE:
+                self.raise_validation_error(
+                    'Participant has a first dose and second dose please select the '
+                    'BOOSTER DOSE', VAX_EXPECTED_BOOSTER_DOSE, field='received_dose_before')
@@ -1,153 +1,212 @@
-from django.apps import apps as django_apps
-from django.core.exceptions import ValidationError
+import warnings
+from functools import partial
+
 from edc_constants.constants import YES
 from edc_form_validators import FormValidator
 
 from esr21_subject_validation.constants import SECOND_DOSE, FIRST_DOSE
+from .model_resolver import get_model
+from .rule_codes import (
+    VAX_HISTORY_DOSE_COUNT, VAX_HISTORY_FIRST_DOSE_DATE,
+    VAX_HISTORY_FIRST_DOSE_IN_EDC, VAX_HISTORY_FIRST_DOSE_NOT_IN_EDC,
+    VAX_HISTORY_SECOND_DOSE_DATE, VAX_HISTORY_SECOND_DOSE_IN_EDC,
+    VAX_HISTORY_SECOND_DOSE_NOT_IN_EDC)
+from .rule_planner import QUERY
+from .rule_runner_mixin import RuleRunnerMixin
+from .subject_context import SubjectContextMixin
+
+
+class VaccinationHistoryFormValidator(SubjectContextMixin, RuleRunnerMixin,
+                                      FormValidator):
+    vaccination_details_cls = 'esr21_subject.vaccinationdetails'
 
+    # label attributes of the models the rules read, and their fields
+    reads = {'vaccination_details_cls': (
+        'subject_visit', 'received_dose_before', 'vaccination_date')}
 
-class VaccinationHistoryFormValidator(FormValidator):
-    vaccination_details_cls = 'esr21_subject.vaccinationdetails'
+    rule_fields = {
+        'validate_number_of_doses': (
+            'subject_identifier', 'dose_quantity', 'dose1_product_name',
+            'dose2_product_name'),
+        'validate_first_dose': ('subject_identifier', 'dose1_product_name'),
+        'validate_first_dose_date': (
+            'subject_identifier', 'dose1_product_name', 'dose1_date'),
+        'validate_second_dose': ('subject_identifier', 'dose2_product_name'),
+        'validate_second_dose_date': (
+            'subject_identifier', 'dose2_product_name', 'dose2_date')}
+
+    # the dose rules share the subject's dose map, one query
+    rule_costs = dict.fromkeys(rule_fields, QUERY)
 
     @property
     def vaccination_details_model_cls(self):
-        return django_apps.get_model(self.vaccination_details_cls)
+        return get_model(self.vaccination_details_cls)
+
+    @classmethod
+    def prefetch(cls, subject_context, records):
+        subject_identifiers = [
+            cleaned_data.get('subject_identifier') for cleaned_data in records]
+        subject_context.prefetch_vaccination_details(
+            get_model(cls.vaccination_details_cls), subject_identifiers)
+        cls.prefetch_subject_status(
+            subject_context, 'subject_identifier', subject_identifiers)
 
     def clean(self):
 
-        self.required_if(
-            YES,
-            field='received_vaccine',
-            field_required='dose_quantity', )
+        self.run_rules(
+            partial(self.required_if,
+                    YES,
+                    field='received_vaccine',
+                    field_required='dose_quantity', ))
 
         dose1_required = ['dose1_product_name', 'dose1_date']
         dose_quantity = self.cleaned_data.get('dose_quantity')
 
-        for dose1_field in dose1_required:
-            self.required_if_true(
-                dose_quantity in ['1', '2','3'],
-                field_required=dose1_field)
+        self.run_rules(*[
+            partial(self.required_if_true,
+                    dose_quantity in ['1', '2','3'],
+                    field_required=dose1_field) for dose1_field in dose1_required])
 
         fields_other = {'dose1_product_name': 'dose1_product_other',
                         'dose2_product_name': 'dose2_product_other',
                         'dose3_product_name': 'dose3_product_other'}
 
-        for field, field_other in fields_other.items():
-            self.validate_other_specify(
-                field=field,
-                other_specify_field=field_other)
+        self.run_rules(*[
+            partial(self.validate_other_specify,
+                    field=field,
+                    other_specify_field=field_other)
+            for field, field_other in fields_other.items()])
 
         dose2_required = ['dose2_product_name', 'dose2_date']
 
-
-        for dose2_field in dose2_required:
-            self.required_if_true(
-                dose_quantity in ['2','3'],
-                field_required=dose2_field)
+        self.run_rules(*[
+            partial(self.required_if_true,
+                    dose_quantity in ['2','3'],
+                    field_required=dose2_field) for dose2_field in dose2_required])
             
         dose3_required = ['dose3_product_name', 'dose3_date']
             
-        for dose3_field in dose3_required:
-            self.required_if(
-                '3',
-                field='dose_quantity',
-                field_required=dose3_field)       
-
-        self.validate_number_of_doses()
-        self.validate_first_dose()
-        self.validate_first_dose_date()
-        self.validate_second_dose()
-        self.validate_second_dose_date()
+        self.run_rules(*[
+            partial(self.required_if,
+                    '3',
+                    field='dose_quantity',
+                    field_required=dose3_field) for dose3_field in dose3_required])
+
+        self.run_rules(
+            self.validate_number_of_doses,
+            self.validate_first_dose,
+            self.validate_first_dose_date,
+            self.validate_second_dose,
+            self.validate_second_dose_date)
 
-    def vaccination_details_objs(self, subject_identifier):
-        return self.vaccination_details_model_cls.objects.filter(
-            subject_visit__subject_identifier=subject_identifier)
+    @property
+    def dose_map(self):
+        """Returns the subject's vaccination dates keyed by
+        `received_dose_before`, from the subject's status row if there
+        is one, otherwise read in one query.
+        """
+        subject_identifier = self.cleaned_data.get('subject_identifier')
+        status = self.subject_status(subject_identifier=subject_identifier)
+        if status:
+            return status.vaccination_dates
+        return self.subject_context.vaccination_dates(
+            self.vaccination_details_model_cls,
+            subject_identifier=subject_identifier)
 
     def validate_number_of_doses(self):
-        subject_identifier = self.cleaned_data.get('subject_identifier')
         dose_received = self.cleaned_data.get('dose_quantity')
         dose2_product_name = self.cleaned_data.get('dose2_product_name')
         dose1_product_name = self.cleaned_data.get('dose1_product_name')
-        vac_details_count = self.vaccination_details_objs(subject_identifier).count()
-        message = {
-            'dose_quantity': f'The participant has received {vac_details_count} doses'
-                             f' of AstraZeneca (AZD 1222), Please correct your entry'}
+        vac_details_count = len(self.dose_map)
         if str(vac_details_count) == dose_received and not (
                 dose1_product_name == 'azd_1222' or dose2_product_name == 'azd_1222'):
-            raise ValidationError(message)
+            self.raise_validation_error(
+                'The participant has received %(dose_count)s doses'
+                ' of AstraZeneca (AZD 1222), Please correct your entry',
+                VAX_HISTORY_DOSE_COUNT, field='dose_quantity',
+                dose_count=vac_details_count)
         # elif not str(vac_details_count) == dose_received and vac_details_count > 0:
         #     raise ValidationError(message)
 
+    def dose_date(self, dose):
+        """Returns the vaccination date of the dose or None.
+        """
+        return self.dose_map.get(dose)
+
+    def vaccination_details_objs(self, subject_identifier):
+        """Deprecated, the rules read the dose map, see `dose_map`.
+        """
+        warnings.warn(
+            'vaccination_details_objs() is deprecated, use dose_map.',
+            DeprecationWarning, stacklevel=2)
+        return self.vaccination_details_model_cls.objects.filter(
+            subject_visit__subject_identifier=subject_identifier)
+
     def dose_received(self, subject_identifier, dose):
-        try:
-            dose_received = self.vaccination_details_model_cls.objects.get(
-                subject_visit__subject_identifier=subject_identifier,
-                received_dose_before=dose)
-        except self.vaccination_details_model_cls.DoesNotExist:
-            pass
-        else:
-            return dose_received
+        """Deprecated, returns the subject's vaccination details of
+        the dose or None. Use `dose_date()` for its vaccination date.
+        """
+        warnings.warn(
+            'dose_received() is deprecated, use dose_date().',
+            DeprecationWarning, stacklevel=2)
+        return self.subject_context.vaccination_details(
+            self.vaccination_details_model_cls,
+            subject_identifier=subject_identifier).get(dose)
 
     def validate_first_dose(self):
-        subject_identifier = self.cleaned_data.get('subject_identifier')
         dose1_product_name = self.cleaned_data.get('dose1_product_name')
-        first_dose = self.dose_received(subject_identifier=subject_identifier,
-                                        dose=FIRST_DOSE)
+        first_dose = self.dose_date(FIRST_DOSE)
         if not dose1_product_name == 'azd_1222' and first_dose:
-            message = {
-                'dose1_product_name': f'The EDC has a record that the participate '
-                                      f'received AstraZeneca (AZD 1222) as a first dose,'
-                                      f' Please recheck the participants\'s dose records'}
-            raise ValidationError(message)
+            self.raise_validation_error(
+                'The EDC has a record that the participate '
+                'received AstraZeneca (AZD 1222) as a first dose,'
+                ' Please recheck the participants\'s dose records',
+                VAX_HISTORY_FIRST_DOSE_IN_EDC, field='dose1_product_name')
         elif not first_dose and dose1_product_name == 'azd_1222':
-            message = {
-                'dose1_product_name': f'The EDC has a no record that the participate'
-                                      f' received AstraZeneca (AZD 1222) as a first dose,'
-                                      f' Please recheck the participants\'s dose records'}
-            raise ValidationError(message)
+            self.raise_validation_error(
+                'The EDC has a no record that the participate'
+                ' received AstraZeneca (AZD 1222) as a first dose,'
+                ' Please recheck the participants\'s dose records',
+                VAX_HISTORY_FIRST_DOSE_NOT_IN_EDC, field='dose1_product_name')
 
     def validate_first_dose_date(self):
-        subject_identifier = self.cleaned_data.get('subject_identifier')
         dose1_date = self.cleaned_data.get('dose1_date')
         dose1_product_name = self.cleaned_data.get('dose1_product_name')
-        first_dose = self.dose_received(subject_identifier=subject_identifier,
-                                        dose=FIRST_DOSE)
+        first_dose = self.dose_date(FIRST_DOSE)
         if dose1_product_name == 'azd_1222' and first_dose:
-            first_dose_date = first_dose.vaccination_date.date()
+            first_dose_date = first_dose.date()
             if not (first_dose_date == dose1_date):
-                message = {
-                    'dose1_date': f'The participant received AstraZeneca (AZD 1222) as'
-                                  f' first dose on date {first_dose_date}'}
-                raise ValidationError(message)
+                self.raise_validation_error(
+                    'The participant received AstraZeneca (AZD 1222) as'
+                    ' first dose on date %(first_dose_date)s',
+                    VAX_HISTORY_FIRST_DOSE_DATE, field='dose1_date',
+                    first_dose_date=first_dose_date)
 
     def validate_second_dose(self):
-        subject_identifier = self.cleaned_data.get('subject_identifier')
         dose2_product_name = self.cleaned_data.get('dose2_product_name')
-        second_dose = self.dose_received(subject_identifier=subject_identifier,
-                                         dose=SECOND_DOSE)
+        second_dose = self.dose_date(SECOND_DOSE)
         if not dose2_product_name == 'azd_1222' and second_dose:
-            message = {
-                'dose2_product_name': f'The EDC has a record that the participate '
-                                      f'received AstraZeneca (AZD 1222) as a second dose,'
-                                      f' Please recheck the participants\'s dose record'}
-            raise ValidationError(message)
+            self.raise_validation_error(
+                'The EDC has a record that the participate '
+                'received AstraZeneca (AZD 1222) as a second dose,'
+                ' Please recheck the participants\'s dose record',
+                VAX_HISTORY_SECOND_DOSE_IN_EDC, field='dose2_product_name')
         elif not second_dose and dose2_product_name == 'azd_1222':
-            message = {
-                'dose2_product_name': f'The EDC has a no record that the participate '
-                                      f'received AstraZeneca (AZD 1222) as a second dose, '
-                                      f'Please recheck the participants\'s dose record'}
-            raise ValidationError(message)
+            self.raise_validation_error(
+                'The EDC has a no record that the participate '
+                'received AstraZeneca (AZD 1222) as a second dose, '
+                'Please recheck the participants\'s dose record',
+                VAX_HISTORY_SECOND_DOSE_NOT_IN_EDC, field='dose2_product_name')
 
     def validate_second_dose_date(self):
-        subject_identifier = self.cleaned_data.get('subject_identifier')
         dose2_date = self.cleaned_data.get('dose2_date')
         dose2_product_name = self.cleaned_data.get('dose2_product_name')
-        second_dose = self.dose_received(subject_identifier=subject_identifier,
-                                         dose=SECOND_DOSE)
+        second_dose = self.dose_date(SECOND_DOSE)
         if dose2_product_name == 'azd_1222' and second_dose:
-            second_dose_date = second_dose.vaccination_date.date()
+            second_dose_date = second_dose.date()
             if not second_dose_date == dose2_date:
-                message = {
-                    'dose2_date': f'The participant received AstraZeneca (AZD 1222) as '
-                                  f'second dose on date {second_dose_date}'}
-                raise ValidationError(message)
+                self.raise_validation_error(
+                    'The participant received AstraZeneca (AZD 1222) as '
+                    'second dose on date %(second_dose_date)s',
+                    VAX_HISTORY_SECOND_DOSE_DATE, field='dose2_date',
+                    second_dose_date=second_dose_date)
@@ -1,30 +1,28 @@
 from edc_form_validators import FormValidator
 from .crf_form_validator import CRFFormValidator
+from .rule_table import APPLICABLE_IF, REQUIRED_IF, RuleTable
 from edc_constants.constants import NO, YES
 
 
 class VitalSignsFormValidator(CRFFormValidator, FormValidator):
 
-    def clean(self):
+    conditional_rules = RuleTable(
+        ('vital_signs_measured', NO, 'reason_vitals_nd', APPLICABLE_IF),
+        ('vital_signs_measured', YES, 'assessment_dt', REQUIRED_IF),
+        ('vital_signs_measured', YES, 'systolic_bp', REQUIRED_IF),
+        ('vital_signs_measured', YES, 'diastolic_bp', REQUIRED_IF),
+        ('vital_signs_measured', YES, 'heart_rate', REQUIRED_IF),
+        ('vital_signs_measured', YES, 'body_temp', REQUIRED_IF),
+        ('vital_signs_measured', YES, 'oxygen_saturated', REQUIRED_IF))
 
-        self.applicable_if(NO,
-                           field='vital_signs_measured',
-                           field_applicable='reason_vitals_nd')
+    def clean(self):
 
-        self.required_if(YES,
-                         field='vital_signs_measured',
-                         field_required='assessment_dt')
+        self.run_rule_table(self.conditional_rules)
 
-        fields_required = ['assessment_dt', 'systolic_bp',
-                           'diastolic_bp', 'heart_rate',
-                           'body_temp', 'oxygen_saturated']
+        self.run_rules(self.validate_body_temp_unit)
 
-        for field in fields_required:
-            self.required_if(YES,
-                             field='vital_signs_measured',
-                             field_required=field)
+        super().clean()
 
+    def validate_body_temp_unit(self):
         self.applicable_if_true(self.cleaned_data.get('body_temp') is not None,
                                 field_applicable='body_temp_unit')
-
-        super().clean()
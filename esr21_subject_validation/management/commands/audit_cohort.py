@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...cohort_audit import audit_cohort, load_rows, read_rows, write_report
+from ...form_validators import VaccineDetailsFormValidator
+
+
+class Command(BaseCommand):
+
+    help = ('Audits the dose intervals, next vaccination dates and expiry '
+            'dates of every vaccination details row and writes the '
+            'violations to a CSV report.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--csv', metavar='PATH',
+            help='Audit a CSV export of the vaccination details instead of '
+                 'the database, see cohort_audit.columns.')
+        parser.add_argument(
+            '--report', default='cohort_audit.csv',
+            help='Path of the CSV report, default cohort_audit.csv.')
+
+    def handle(self, *args, **options):
+        model_label = VaccineDetailsFormValidator.vaccination_details_cls
+        try:
+            if options['csv']:
+                rows = read_rows(options['csv'])
+            else:
+                rows = load_rows(VaccineDetailsFormValidator)
+        except (OSError, LookupError) as e:
+            raise CommandError(e)
+        violations = audit_cohort(rows, model_label=model_label)
+        write_report(violations, options['report'])
+        self.stdout.write(
+            f'{model_label}: {len(rows)} records, {len(violations)} violations.')
+        self.stdout.write(self.style.SUCCESS(f'Report written to {options["report"]}.'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...form_validators.model_resolver import get_subject_status_model
+from ...subject_status import rebuild_subject_status
+
+
+class Command(BaseCommand):
+
+    help = ('Rebuilds the subject status table from the consent, eligibility '
+            'confirmation, vaccination details and vaccination history models.')
+
+    def handle(self, *args, **options):
+        model_cls = get_subject_status_model()
+        if not model_cls:
+            raise CommandError('ESR21_SUBJECT_STATUS_MODEL is not set.')
+        try:
+            count = rebuild_subject_status()
+        except LookupError as e:
+            raise CommandError(e)
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {count} {model_cls._meta.verbose_name_plural}.'))
@@ -0,0 +1,90 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, make_aware
+
+from ...revalidation import get_validators, revalidate, revalidate_incremental
+
+
+class Command(BaseCommand):
+
+    help = ('Re-runs the form validators over stored records and writes '
+            'every failing rule to a CSV report.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--models', nargs='+', metavar='LABEL',
+            help='Model labels to revalidate, default all registered models.')
+        parser.add_argument(
+            '--since', metavar='DATE',
+            help='Only revalidate records modified on or after this date '
+                 'or datetime (ISO 8601).')
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Number of worker processes, each validating one shard of '
+                 'the subjects.')
+        parser.add_argument('--chunk-size', dest='chunk_size', type=int, default=500)
+        parser.add_argument(
+            '--report', default='revalidation.csv',
+            help='Path of the CSV report, default revalidation.csv.')
+        parser.add_argument(
+            '--checkpoint', metavar='PATH',
+            help='SQLite file to record progress in. If it exists, the run '
+                 'resumes from it.')
+        parser.add_argument(
+            '--watermarks', metavar='PATH',
+            help='SQLite file of the time of the last incremental run of each '
+                 'model. Only records changed since then, and the records of '
+                 'subjects with a changed record the validator reads, are '
+                 'revalidated.')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since']) or parse_date(options['since'])
+            if not since:
+                raise CommandError(f'Invalid --since {options["since"]!r}.')
+            if not hasattr(since, 'hour'):
+                since = parse_datetime(f'{since.isoformat()}T00:00:00')
+            if is_naive(since):
+                since = make_aware(since)
+        if options['workers'] < 1 or options['chunk_size'] < 1:
+            raise CommandError('--workers and --chunk-size must be at least 1.')
+        if since and options['watermarks']:
+            raise CommandError('--since and --watermarks cannot be combined.')
+
+        if options['checkpoint'] and os.path.exists(options['checkpoint']):
+            self.stdout.write(f'Resuming from {options["checkpoint"]}.')
+
+        model_labels = options['models'] or list(get_validators())
+        try:
+            if options['watermarks']:
+                results = revalidate_incremental(
+                    model_labels,
+                    options['report'],
+                    options['watermarks'],
+                    workers=options['workers'],
+                    chunk_size=options['chunk_size'],
+                    checkpoint=options['checkpoint'])
+            else:
+                results = revalidate(
+                    model_labels,
+                    options['report'],
+                    workers=options['workers'],
+                    since=since,
+                    chunk_size=options['chunk_size'],
+                    checkpoint=options['checkpoint'])
+        except (ImproperlyConfigured, LookupError) as e:
+            raise CommandError(e)
+
+        totals = {}
+        for model_label, _, processed, violations in results:
+            total = totals.setdefault(model_label, [0, 0])
+            total[0] += processed
+            total[1] += violations
+        for model_label, (processed, violations) in totals.items():
+            self.stdout.write(
+                f'{model_label}: {processed} records, {violations} violations.')
+        self.stdout.write(self.style.SUCCESS(f'Report written to {options["report"]}.'))
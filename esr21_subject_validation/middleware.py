@@ -0,0 +1,14 @@
+from .form_validators.subject_context import SubjectContext
+
+
+class SubjectContextMiddleware:
+    """Shares one SubjectContext between all the form validators run
+    while handling a request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with SubjectContext():
+            return self.get_response(request)
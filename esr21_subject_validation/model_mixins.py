@@ -0,0 +1,57 @@
+from django.db import models
+
+from .constants import BOOSTER_DOSE, FIRST_DOSE, SECOND_DOSE
+
+
+class SubjectStatusModelMixin(models.Model):
+    """One row per subject of the state the form validators derive from
+    the consent, eligibility confirmation, vaccination details and
+    vaccination history, kept current by signals, see subject_status.
+
+    Enable it with a concrete model and its label, e.g.:
+
+        ESR21_SUBJECT_STATUS_MODEL = 'esr21_subject.subjectstatus'
+    """
+
+    subject_identifier = models.CharField(
+        max_length=50, unique=True, null=True, blank=True)
+
+    screening_identifier = models.CharField(
+        max_length=50, unique=True, null=True, blank=True)
+
+    consented = models.BooleanField(default=False)
+
+    consent_datetime = models.DateTimeField(null=True, blank=True)
+
+    dob = models.DateField(null=True, blank=True)
+
+    eligibility_confirmed = models.BooleanField(default=False)
+
+    age_in_years = models.IntegerField(null=True, blank=True)
+
+    dose_count = models.IntegerField(default=0)
+
+    first_dose_datetime = models.DateTimeField(null=True, blank=True)
+
+    second_dose_datetime = models.DateTimeField(null=True, blank=True)
+
+    booster_dose_datetime = models.DateTimeField(null=True, blank=True)
+
+    received_vaccine = models.CharField(max_length=25, null=True, blank=True)
+
+    dose_quantity = models.CharField(max_length=25, null=True, blank=True)
+
+    modified = models.DateTimeField(auto_now=True)
+
+    @property
+    def vaccination_dates(self):
+        """Returns the vaccination dates keyed by `received_dose_before`,
+        as SubjectContext.vaccination_dates() does.
+        """
+        dates = {FIRST_DOSE: self.first_dose_datetime,
+                 SECOND_DOSE: self.second_dose_datetime,
+                 BOOSTER_DOSE: self.booster_dose_datetime}
+        return {dose: date for dose, date in dates.items() if date}
+
+    class Meta:
+        abstract = True
@@ -0,0 +1,424 @@
+"""Re-runs the form validators over stored records, see the
+`revalidate_crfs` management command.
+
+Subjects are split into `shards` by a hash of their identifier. The
+primary keys of the rows of each shard are read once, with one query of
+the keys and identifiers, and each shard is validated by one worker
+process that loads only its own rows, in primary key order. Every
+failing rule is written to a CSV report.
+
+If given a checkpoint file, each shard records its progress there after
+every chunk, and a run that is restarted with the same file continues
+where it stopped.
+
+An incremental run only revalidates the rows modified since the model's
+watermark, the time of its last incremental run, and the rows of the
+subjects of any row modified since then in a model its validator reads.
+"""
+import csv
+import multiprocessing
+import os
+import sqlite3
+import zlib
+from contextlib import closing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+from . import form_validators
+from .form_validators.batch_validation import validate_many
+from .form_validators.dependency_graph import read_models
+from .form_validators.model_resolver import get_model
+from .form_validators.result_cache import get_result_cache
+
+# Model label to the name of the form validator that validates it,
+# extended or overridden by settings.ESR21_REVALIDATION_VALIDATORS.
+validators = {
+    'esr21_subject.eligibilityconfirmation': 'EligibilityConfirmationFormValidator',
+    'esr21_subject.informedconsent': 'InformedConsentFormValidator',
+    'esr21_subject.vaccinationdetails': 'VaccineDetailsFormValidator',
+    'esr21_subject.vaccinationhistory': 'VaccinationHistoryFormValidator',
+}
+
+report_fields = ['model', 'pk', 'subject_identifier', 'field', 'rule', 'code',
+                 'message']
+
+
+def get_validators():
+    return {**validators,
+            **getattr(settings, 'ESR21_REVALIDATION_VALIDATORS', {})}
+
+
+def get_validator_cls(model_label):
+    try:
+        name = get_validators()[model_label]
+    except KeyError:
+        raise ImproperlyConfigured(
+            f'No form validator registered for {model_label}. '
+            'See settings.ESR21_REVALIDATION_VALIDATORS.')
+    return getattr(form_validators, name)
+
+
+def shard_of(subject_identifier, shards):
+    return zlib.crc32((subject_identifier or '').encode()) % shards
+
+
+def has_field(model_cls, name):
+    try:
+        model_cls._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def get_queryset(model_cls, since=None, q=None):
+    queryset = model_cls._default_manager.order_by('pk')
+    if q is not None:
+        queryset = queryset.filter(q)
+    if has_field(model_cls, 'subject_visit'):
+        queryset = queryset.select_related('subject_visit__appointment')
+    if since:
+        if not has_field(model_cls, 'modified'):
+            raise ImproperlyConfigured(
+                f'{model_cls._meta.label_lower} has no modified field, '
+                'cannot select records since a date.')
+        queryset = queryset.filter(modified__gte=since)
+    return queryset
+
+
+def subject_of(obj):
+    """Returns the identifier a row is sharded on, as subject_key()
+    does for its cleaned_data.
+    """
+    subject_visit = getattr(obj, 'subject_visit', None)
+    return (getattr(subject_visit, 'subject_identifier', None)
+            or getattr(obj, 'subject_identifier', None)
+            or getattr(obj, 'screening_identifier', None)
+            or '')
+
+
+def shard_lookups(model_cls):
+    """Returns the lookups of the identifiers a row of `model_cls` is
+    sharded on, in the order subject_of() tries them.
+    """
+    return [lookup for name, lookup in [
+        ('subject_visit', 'subject_visit__subject_identifier'),
+        ('subject_identifier', 'subject_identifier'),
+        ('screening_identifier', 'screening_identifier')]
+        if has_field(model_cls, name)]
+
+
+def partition(model_cls, queryset, shards):
+    """Returns a list of the primary keys of the rows of `queryset` in
+    each shard, in primary key order, read with one query.
+    """
+    pks = [[] for _ in range(shards)]
+    for pk, *identifiers in queryset.values_list(
+            'pk', *shard_lookups(model_cls)).iterator():
+        subject_identifier = next(
+            (identifier for identifier in identifiers if identifier), '')
+        pks[shard_of(subject_identifier, shards)].append(pk)
+    return pks
+
+
+def cleaned_data_from(obj):
+    """Returns the cleaned_data the model form of `obj` would have.
+    """
+    cleaned_data = {
+        field.name: getattr(obj, field.name) for field in obj._meta.concrete_fields}
+    for field in obj._meta.many_to_many:
+        cleaned_data[field.name] = getattr(obj, field.name).all()
+    return cleaned_data
+
+
+class StateFile:
+    """A SQLite file of one table, created on first use.
+    """
+
+    create_table = None
+
+    def __init__(self, path):
+        self.path = path
+        self.execute(self.create_table)
+
+    def execute(self, sql, params=()):
+        with closing(sqlite3.connect(self.path, timeout=30)) as db:
+            with db:
+                return db.execute(sql, params).fetchall()
+
+    def delete(self):
+        os.remove(self.path)
+
+
+class Checkpoints(StateFile):
+    """The progress of a revalidation run, per model and shard, in a
+    SQLite file: the last primary key read, the length of the shard's
+    part of the report, and running counts of the records processed and
+    violations found.
+    """
+
+    columns = ['model', 'shard', 'shards', 'since', 'last_pk', 'report_offset',
+               'processed', 'violations', 'done']
+
+    create_table = (
+        'CREATE TABLE IF NOT EXISTS checkpoint ('
+        'model TEXT, shard INTEGER, shards INTEGER, since TEXT, '
+        'last_pk TEXT, report_offset INTEGER, processed INTEGER, '
+        'violations INTEGER, done INTEGER, PRIMARY KEY (model, shard))')
+
+    def get(self, model_label, shard):
+        rows = self.execute(
+            f'SELECT {", ".join(self.columns)} FROM checkpoint '
+            'WHERE model = ? AND shard = ?', (model_label, shard))
+        return dict(zip(self.columns, rows[0])) if rows else None
+
+    def save(self, model_label, shard, shards, since, last_pk, report_offset,
+             processed, violations, done=False):
+        self.execute(
+            f'INSERT OR REPLACE INTO checkpoint ({", ".join(self.columns)}) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (model_label, shard, shards, since_key(since), str(last_pk),
+             report_offset, processed, violations, int(done)))
+
+    def check(self, shards, since):
+        """Raises if the checkpoints were written by a run with other
+        workers or another --since, as their shards would not match.
+        """
+        for row_shards, row_since in self.execute(
+                'SELECT DISTINCT shards, since FROM checkpoint'):
+            if row_shards != shards or row_since != since_key(since):
+                raise ImproperlyConfigured(
+                    f'Checkpoint {self.path} is of a run with {row_shards} '
+                    f'workers since {row_since or "the start"}. Resume with the '
+                    'same options or remove the checkpoint.')
+
+
+class Watermarks(StateFile):
+    """The time of the last incremental run of each model.
+    """
+
+    create_table = (
+        'CREATE TABLE IF NOT EXISTS watermark (model TEXT PRIMARY KEY, modified TEXT)')
+
+    def get(self, model_label):
+        rows = self.execute(
+            'SELECT modified FROM watermark WHERE model = ?', (model_label, ))
+        return datetime.fromisoformat(rows[0][0]) if rows else None
+
+    def set(self, model_label, modified):
+        self.execute(
+            'INSERT OR REPLACE INTO watermark (model, modified) VALUES (?, ?)',
+            (model_label, modified.isoformat()))
+
+
+def since_key(since):
+    return since.isoformat() if since else ''
+
+
+def part_path(report, model_label, shard):
+    return f'{report}.{model_label}.{shard}.part'
+
+
+def validate_chunk(validator_cls, model_label, objs, writer):
+    """Validates `objs` and writes a report row per failing rule.
+    Returns the number of violations.
+    """
+    records = [cleaned_data_from(obj) for obj in objs]
+    violations = 0
+    results = validate_many(
+        validator_cls, records, batch_size=len(records), collect=True,
+        cache=get_result_cache())
+    for obj, result in zip(objs, results):
+        for rule_error in result.rule_errors:
+            writer.writerow([
+                model_label, obj.pk, subject_of(obj), rule_error.field,
+                rule_error.rule, rule_error.code, rule_error.message])
+            violations += 1
+    return violations
+
+
+def revalidate_shard(model_label, shard, shards, report, since=None,
+                     chunk_size=500, checkpoint=None, q=None, pks=None):
+    """Validates the rows of the model of `model_label` whose subject
+    falls in `shard` and writes their violations to the shard's part of
+    the report.
+
+    `pks` are the primary keys of the shard's rows, see partition(),
+    read here if not given. The rows are loaded `chunk_size` at a time.
+
+    If `checkpoint` is the path of a checkpoint file, the shard resumes
+    after the last row it recorded there and records its progress after
+    each chunk.
+
+    `q` further filters the rows, see changed_filter().
+
+    Returns (model_label, shard, rows processed, violations).
+    """
+    model_cls = get_model(model_label)
+    validator_cls = get_validator_cls(model_label)
+    queryset = get_queryset(model_cls, since, q)
+    checkpoints = Checkpoints(checkpoint) if checkpoint else None
+    state = checkpoints.get(model_label, shard) if checkpoints else None
+    processed = violations = report_offset = 0
+    last_pk = None
+    if state and state['done']:
+        return model_label, shard, state['processed'], state['violations']
+    if pks is None:
+        pks = partition(model_cls, queryset, shards)[shard]
+    if state:
+        processed, violations = state['processed'], state['violations']
+        report_offset = state['report_offset']
+        last_pk = model_cls._meta.pk.to_python(state['last_pk'])
+        pks = [pk for pk in pks if pk > last_pk]
+
+    with open(part_path(report, model_label, shard), 'a', newline='') as f:
+        # drop rows written after the last checkpoint, or by an earlier run
+        f.truncate(report_offset)
+        writer = csv.writer(f)
+
+        def save(done=False):
+            f.flush()
+            if checkpoints:
+                checkpoints.save(model_label, shard, shards, since, last_pk,
+                                 f.tell(), processed, violations, done=done)
+
+        for start in range(0, len(pks), chunk_size):
+            chunk_pks = pks[start:start + chunk_size]
+            chunk = list(queryset.filter(pk__in=chunk_pks))
+            if chunk:
+                violations += validate_chunk(validator_cls, model_label, chunk, writer)
+                processed += len(chunk)
+            last_pk = chunk_pks[-1]
+            save()
+        save(done=True)
+    return model_label, shard, processed, violations
+
+
+def revalidate(model_labels, report, workers=1, since=None, chunk_size=500,
+               checkpoint=None, filters=None):
+    """Revalidates the stored rows of each model, `workers` subject
+    shards at a time, and writes the violations to the CSV `report`.
+
+    Progress is recorded in the SQLite file `checkpoint`, if given, and
+    a run with an existing checkpoint resumes from it. The checkpoint is
+    removed once the report is written.
+
+    `filters` is an optional dictionary of model label to a Q the rows
+    of the model are filtered on.
+
+    Returns a list of (model_label, shard, processed, violations).
+    """
+    for model_label in model_labels:
+        # fail before starting any worker
+        get_model(model_label)
+        get_validator_cls(model_label)
+    if checkpoint:
+        Checkpoints(checkpoint).check(workers, since)
+    filters = filters or {}
+    tasks = []
+    for model_label in model_labels:
+        model_cls = get_model(model_label)
+        q = filters.get(model_label)
+        partitions = partition(model_cls, get_queryset(model_cls, since, q), workers)
+        tasks.extend(
+            (model_label, shard, workers, report, since, chunk_size, checkpoint, q,
+             partitions[shard])
+            for shard in range(workers))
+    if workers == 1:
+        results = [revalidate_shard(*task) for task in tasks]
+    else:
+        # Each forked worker must open its own database connections.
+        connections.close_all()
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('fork')) as executor:
+            results = list(executor.map(revalidate_shard, *zip(*tasks)))
+
+    with open(report, 'w', newline='') as f:
+        csv.writer(f).writerow(report_fields)
+        for model_label, shard, *_ in results:
+            path = part_path(report, model_label, shard)
+            with open(path, newline='') as part:
+                f.writelines(part)
+            os.remove(path)
+    if checkpoint:
+        Checkpoints(checkpoint).delete()
+    return results
+
+
+def subject_lookups(model_cls):
+    """Returns a dictionary of the kind of identifier the rows of
+    `model_cls` belong to, subject or screening, to its lookup.
+    """
+    lookups = {}
+    if has_field(model_cls, 'screening_identifier'):
+        lookups['screening_identifier'] = 'screening_identifier'
+    if has_field(model_cls, 'subject_visit'):
+        lookups['subject_identifier'] = 'subject_visit__subject_identifier'
+    if has_field(model_cls, 'subject_identifier'):
+        lookups['subject_identifier'] = 'subject_identifier'
+    return lookups
+
+
+def dependencies(model_label):
+    """Returns the labels of the models the validator of `model_label`
+    reads, see dependency_graph.read_models(), and the model itself.
+    """
+    labels = [model_label]
+    for label in read_models(get_validator_cls(model_label)):
+        if label not in labels:
+            labels.append(label)
+    return labels
+
+
+def changed_filter(model_label, since):
+    """Returns a Q of the rows of `model_label` modified since `since`,
+    or of a subject with a row modified since then in a model the
+    validator reads, e.g. every VaccinationHistory of a subject whose
+    VaccinationDetails changed.
+    """
+    model_cls = get_model(model_label)
+    if not has_field(model_cls, 'modified'):
+        raise ImproperlyConfigured(
+            f'{model_label} has no modified field, cannot revalidate incrementally.')
+    q = Q(modified__gte=since)
+    lookups = subject_lookups(model_cls)
+    for label in dependencies(model_label):
+        dependency_cls = get_model(label)
+        if not has_field(dependency_cls, 'modified'):
+            continue
+        changed = dependency_cls._default_manager.filter(modified__gte=since)
+        for kind, lookup in subject_lookups(dependency_cls).items():
+            if kind in lookups:
+                q |= Q(**{f'{lookups[kind]}__in': changed.values(lookup)})
+    return q
+
+
+def revalidate_incremental(model_labels, report, watermarks, workers=1,
+                           chunk_size=500, checkpoint=None):
+    """Revalidates the rows of each model changed since its watermark in
+    the SQLite file `watermarks`, and their dependants, see
+    changed_filter(). A model without a watermark is revalidated in
+    full.
+
+    Watermarks are advanced to the time the run started once the report
+    is written, so rows changed during the run are picked up next time.
+    """
+    started = timezone.now()
+    marks = Watermarks(watermarks)
+    filters = {}
+    for model_label in model_labels:
+        since = marks.get(model_label)
+        if since:
+            filters[model_label] = changed_filter(model_label, since)
+    results = revalidate(
+        model_labels, report, workers=workers, chunk_size=chunk_size,
+        checkpoint=checkpoint, filters=filters)
+    for model_label in model_labels:
+        marks.set(model_label, started)
+    return results
@@ -0,0 +1,101 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal
+
+from .form_validators.dependency_graph import default_read_models, get_graph
+from .form_validators.model_resolver import get_model
+from .form_validators.repositories import identifiers_of
+from .form_validators.result_cache import ResultCache, get_result_cache
+from .form_validators.subject_context import SubjectContext
+from .subject_status import default_source_models, source_models, update_for
+
+# sent with `instance`, `identifiers` and `validators`, the validators
+# whose results for those subjects may have changed
+validation_inputs_changed = Signal()
+
+# the (signal, sender, dispatch_uid) of the connected receivers, see
+# connect_receivers()
+connected = set()
+
+
+def invalidate(model_cls, instance, fields=None):
+    """Drops the rows of the subjects of `instance` from every live
+    SubjectContext, misses the cached results that read them, in every
+    live cache and in the configured cache shared by processes, and
+    notifies the validators that read the changed fields, if any
+    validator reads `model_cls`.
+    """
+    model_label = model_cls._meta.label_lower
+    validators = get_graph().dependants(model_label, fields)
+    if not validators:
+        return
+    identifiers = identifiers_of(instance)
+    for subject_context in list(SubjectContext.live):
+        subject_context.invalidate(model_cls, identifiers)
+    caches = {*ResultCache.live, get_result_cache()}
+    caches.discard(None)
+    for cache in caches:
+        cache.invalidate(model_label, identifiers)
+    validation_inputs_changed.send(
+        sender=model_cls, instance=instance, identifiers=identifiers,
+        validators=validators)
+
+
+def on_post_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        invalidate(sender, instance, update_fields)
+
+
+def on_post_delete(sender, instance, **kwargs):
+    invalidate(sender, instance)
+
+
+def on_source_post_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_for(sender, instance)
+
+
+def on_source_post_delete(sender, instance, **kwargs):
+    update_for(sender, instance)
+
+
+def connect(receivers, labels):
+    """Connects each (signal, receiver, dispatch_uid) of `receivers` to
+    the installed models of `labels`.
+    """
+    for label in labels:
+        try:
+            sender = get_model(label)
+        except LookupError:
+            continue
+        for signal, receiver, dispatch_uid in receivers:
+            signal.connect(receiver, sender=sender, dispatch_uid=dispatch_uid)
+            connected.add((signal, sender, dispatch_uid))
+
+
+def connect_receivers(read_models=default_read_models,
+                      status_source_models=default_source_models):
+    """Connects the invalidation receivers to the models of the
+    `read_models` labels and the subject status receivers to those of
+    `status_source_models` only, not installed models skipped.
+
+    The defaults are declared without importing the validators, so
+    connecting them when the app is ready keeps the validators lazily
+    imported; the dependency graph is built on the first signal. After
+    changing a validator's label attributes call reconnect_receivers().
+    """
+    for signal, sender, dispatch_uid in connected:
+        signal.disconnect(sender=sender, dispatch_uid=dispatch_uid)
+    connected.clear()
+    connect([(post_save, on_post_save, 'esr21_validation_on_post_save'),
+             (post_delete, on_post_delete, 'esr21_validation_on_post_delete')],
+            read_models)
+    connect([(post_save, on_source_post_save, 'esr21_status_on_post_save'),
+             (post_delete, on_source_post_delete, 'esr21_status_on_post_delete')],
+            status_source_models)
+
+
+def reconnect_receivers():
+    """Connects the receivers to the models the validators' label
+    attributes name now, call after `get_graph.cache_clear()`.
+    """
+    connect_receivers(get_graph().models, source_models())
@@ -0,0 +1,261 @@
+"""Maintains the optional subject status table, one row per subject of
+the consent, eligibility confirmation, dose and vaccination history
+state the form validators read, see model_mixins.SubjectStatusModelMixin.
+
+A row is recomputed from the source models whenever a row of one of
+them is saved or deleted, see signals, with the subject's rows locked,
+and all rows are rebuilt by the rebuild_subject_status management
+command.
+
+The source models are those of the InformedConsentFormValidator and
+VaccineDetailsFormValidator label attributes.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .constants import BOOSTER_DOSE, FIRST_DOSE, SECOND_DOSE
+from .form_validators.model_resolver import get_model, get_subject_status_model
+from .form_validators.subject_context import SubjectContext
+
+
+# the source models of the validators' default label attributes, so the
+# signal receivers are connected without importing the validators
+default_source_models = {
+    'esr21_subject.informedconsent': 'consent',
+    'esr21_subject.eligibilityconfirmation': 'eligibility',
+    'esr21_subject.vaccinationdetails': 'details',
+    'esr21_subject.vaccinationhistory': 'history'}
+
+
+def source_models():
+    """Returns a dictionary of source model label to its kind.
+    """
+    from .form_validators import InformedConsentFormValidator, VaccineDetailsFormValidator
+
+    return {
+        InformedConsentFormValidator.informed_consent_model: 'consent',
+        InformedConsentFormValidator.eligibility_confirmation_model: 'eligibility',
+        VaccineDetailsFormValidator.vaccination_details_cls: 'details',
+        VaccineDetailsFormValidator.vaccination_history_cls: 'history'}
+
+
+def source_model(kind):
+    for label, source_kind in source_models().items():
+        if source_kind == kind:
+            return get_model(label)
+
+
+def identifiers_of(kind, instance):
+    """Returns the (subject_identifier, screening_identifier) of a row of
+    a source model.
+    """
+    if kind == 'details':
+        return instance.subject_visit.subject_identifier, None
+    return (getattr(instance, 'subject_identifier', None),
+            getattr(instance, 'screening_identifier', None))
+
+
+def status_fields(consent, eligibility_confirmation, doses, vaccination_history):
+    """Returns a dictionary of the status fields of the source rows of a
+    subject, `doses` the vaccination dates keyed by received_dose_before,
+    or None if there are none.
+    """
+    if not (consent or eligibility_confirmation or doses or vaccination_history):
+        return None
+    return {
+        'consented': bool(consent),
+        'consent_datetime': getattr(consent, 'consent_datetime', None),
+        'dob': getattr(consent, 'dob', None),
+        'eligibility_confirmed': bool(eligibility_confirmation),
+        'age_in_years': getattr(eligibility_confirmation, 'age_in_years', None),
+        'dose_count': len(doses),
+        'first_dose_datetime': doses.get(FIRST_DOSE),
+        'second_dose_datetime': doses.get(SECOND_DOSE),
+        'booster_dose_datetime': doses.get(BOOSTER_DOSE),
+        'received_vaccine': getattr(vaccination_history, 'received_vaccine', None),
+        'dose_quantity': getattr(vaccination_history, 'dose_quantity', None)}
+
+
+def derive(subject_identifier=None, screening_identifier=None):
+    """Returns the subject and screening identifiers and a dictionary of
+    the status fields derived from the source models, or None if no
+    source model has a row for the subject.
+    """
+    consents = source_model('consent').objects.order_by('-consent_datetime')
+    if subject_identifier:
+        consent = consents.filter(subject_identifier=subject_identifier).first()
+    else:
+        consent = consents.filter(screening_identifier=screening_identifier).first()
+    if consent:
+        subject_identifier = consent.subject_identifier
+        screening_identifier = consent.screening_identifier
+
+    eligibility_confirmation = None
+    if screening_identifier:
+        eligibility_confirmation = source_model('eligibility').objects.filter(
+            screening_identifier=screening_identifier).first()
+    doses = {}
+    vaccination_history = None
+    if subject_identifier:
+        doses = dict(source_model('details').objects.filter(
+            subject_visit__subject_identifier=subject_identifier).values_list(
+                'received_dose_before', 'vaccination_date'))
+        vaccination_history = source_model('history').objects.filter(
+            subject_identifier=subject_identifier).first()
+    return subject_identifier, screening_identifier, status_fields(
+        consent, eligibility_confirmation, doses, vaccination_history)
+
+
+def derive_many(subject_context, subject_identifiers=(), screening_identifiers=()):
+    """Yields the subject and screening identifiers and the status fields
+    of each of the subjects and of the screenings not consented, the
+    source rows loaded with one query per source model.
+    """
+    consent_cls, eligibility_cls, details_cls, history_cls = (
+        source_model(kind) for kind in ('consent', 'eligibility', 'details', 'history'))
+    subject_context.prefetch_informed_consents(
+        consent_cls, 'subject_identifier', subject_identifiers)
+    consents = {
+        subject_identifier: subject_context.informed_consent(
+            consent_cls, subject_identifier=subject_identifier)
+        for subject_identifier in subject_identifiers}
+    subject_context.prefetch_eligibility_confirmations(
+        eligibility_cls, [consent.screening_identifier for consent in consents.values()
+                          if consent] + list(screening_identifiers))
+    subject_context.prefetch_vaccination_details(details_cls, subject_identifiers)
+    subject_context.prefetch_vaccination_histories(history_cls, subject_identifiers)
+
+    for subject_identifier, consent in consents.items():
+        screening_identifier = getattr(consent, 'screening_identifier', None)
+        eligibility_confirmation = None
+        if screening_identifier:
+            eligibility_confirmation = subject_context.eligibility_confirmation(
+                eligibility_cls, screening_identifier)
+        yield subject_identifier, screening_identifier, status_fields(
+            consent, eligibility_confirmation,
+            subject_context.vaccination_dates(details_cls, subject_identifier),
+            subject_context.vaccination_history(history_cls, subject_identifier))
+    for screening_identifier in screening_identifiers:
+        yield None, screening_identifier, status_fields(
+            None, subject_context.eligibility_confirmation(
+                eligibility_cls, screening_identifier), {}, None)
+
+
+def save_subject_status(model_cls, subject_identifier=None, screening_identifier=None):
+    """Recomputes the status row of the subject in a transaction with its
+    rows locked. Returns the row, or None, and the subject and screening
+    identifiers.
+    """
+    with transaction.atomic():
+        subject_identifier, screening_identifier, fields = derive(
+            subject_identifier, screening_identifier)
+
+        lookup = Q(pk__in=[])
+        for name, value in [('subject_identifier', subject_identifier),
+                            ('screening_identifier', screening_identifier)]:
+            if value:
+                lookup |= Q(**{name: value})
+        rows = list(model_cls.objects.select_for_update().filter(lookup).order_by('pk'))
+        # a screening row is merged into the subject's row once consented
+        for row in rows[1:]:
+            row.delete()
+        status = rows[0] if rows else None
+        if fields is None:
+            if status:
+                status.delete()
+            status = None
+        else:
+            status = status or model_cls()
+            status.subject_identifier = subject_identifier
+            status.screening_identifier = screening_identifier
+            for name, value in fields.items():
+                setattr(status, name, value)
+            status.save()
+    return status, {subject_identifier, screening_identifier} - {None}
+
+
+def update_subject_status(subject_identifier=None, screening_identifier=None):
+    """Recomputes the status row of the subject, creating it or deleting
+    it as needed, and drops it from every live SubjectContext.
+    """
+    model_cls = get_subject_status_model()
+    if not model_cls or not (subject_identifier or screening_identifier):
+        return None
+    try:
+        status, identifiers = save_subject_status(
+            model_cls, subject_identifier, screening_identifier)
+    except IntegrityError:
+        # the row was created by a concurrent save after it was looked
+        # up, it is locked and updated this time
+        status, identifiers = save_subject_status(
+            model_cls, subject_identifier, screening_identifier)
+
+    for subject_context in list(SubjectContext.live):
+        subject_context.invalidate(model_cls, identifiers)
+    return status
+
+
+def update_for(model_cls, instance):
+    """Updates the status row of the subject of `instance` if it is a
+    row of a source model and a status model is configured.
+    """
+    if not get_subject_status_model():
+        return
+    kind = source_models().get(model_cls._meta.label_lower)
+    if kind:
+        update_subject_status(*identifiers_of(kind, instance))
+
+
+def rebuild_subject_status(chunk_size=500):
+    """Recomputes the status row of every subject of the source models
+    and deletes the others. Returns the number of rows.
+
+    Subjects are rebuilt `chunk_size` at a time, each chunk read with a
+    few queries and written in its own transaction.
+    """
+    model_cls = get_subject_status_model()
+    subjects = set(source_model('details').objects.values_list(
+        'subject_visit__subject_identifier', flat=True))
+    subjects.update(source_model('history').objects.values_list(
+        'subject_identifier', flat=True))
+    screenings = set(source_model('eligibility').objects.values_list(
+        'screening_identifier', flat=True))
+    for subject_identifier, screening_identifier in source_model(
+            'consent').objects.values_list('subject_identifier', 'screening_identifier'):
+        subjects.add(subject_identifier)
+        screenings.discard(screening_identifier)
+    subjects = sorted(subjects - {None})
+    screenings = sorted(screenings - {None})
+
+    chunks = [(subjects[start:start + chunk_size], [])
+              for start in range(0, len(subjects), chunk_size)]
+    chunks += [([], screenings[start:start + chunk_size])
+               for start in range(0, len(screenings), chunk_size)]
+    for subject_identifiers, screening_identifiers in chunks:
+        rows = [
+            model_cls(subject_identifier=subject_identifier,
+                      screening_identifier=screening_identifier, **fields)
+            for subject_identifier, screening_identifier, fields in derive_many(
+                SubjectContext(), subject_identifiers, screening_identifiers)
+            if fields]
+        with transaction.atomic():
+            model_cls.objects.filter(
+                Q(subject_identifier__in=subject_identifiers)
+                | Q(screening_identifier__in=[
+                    row.screening_identifier for row in rows
+                    if row.screening_identifier])).delete()
+            model_cls.objects.bulk_create(rows)
+
+    # the rows of subjects no source model has a row for
+    kept_subjects, kept_screenings = set(subjects), set(screenings)
+    stale = [
+        pk for pk, subject_identifier, screening_identifier in model_cls.objects.values_list(
+            'pk', 'subject_identifier', 'screening_identifier')
+        if subject_identifier not in kept_subjects and (
+            subject_identifier or (screening_identifier not in kept_screenings))]
+    for start in range(0, len(stale), chunk_size):
+        model_cls.objects.filter(pk__in=stale[start:start + chunk_size]).delete()
+
+    for subject_context in list(SubjectContext.live):
+        subject_context.invalidate(model_cls)
+    return model_cls.objects.count()
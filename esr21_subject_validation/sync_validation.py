@@ -0,0 +1,106 @@
+"""Validates the records of an offline sync, e.g. of a tablet that
+captured a subject's eligibility, consent, visits and CRFs while
+offline, as one batch before any of them is saved.
+
+Records are validated in the order of the models their validators read,
+see dependency_graph, so eligibility confirmations come before consents,
+and visits before the CRFs of the visits. Each valid record is added to
+an OverlaySubjectContext as an unsaved instance, and the records after
+it look it up there as if it were saved. Rows that are not in the batch
+are read from the database, with the `IN` queries of each validator's
+`prefetch` once per model.
+
+For example:
+
+    results = validate_sync([
+        ('esr21_subject.eligibilityconfirmation', eligibility),
+        ('esr21_subject.informedconsent', consent)])
+"""
+from django.db import models
+
+from .form_validators.batch_validation import ValidationResult, validate_one
+from .form_validators.dependency_graph import read_models
+from .form_validators.model_resolver import get_model
+from .form_validators.subject_context import OverlaySubjectContext
+from .revalidation import get_validator_cls, get_validators
+
+
+def sync_order(model_labels):
+    """Returns `model_labels` ordered so that each model comes after the
+    models its validator reads. Ties, and models that read each other,
+    keep the order of `model_labels`.
+    """
+    model_labels = list(dict.fromkeys(model_labels))
+    validators = get_validators()
+    reads = {
+        label: set(read_models(get_validator_cls(label))).intersection(
+            model_labels) - {label} if label in validators else set()
+        for label in model_labels}
+    ordered = []
+    while reads:
+        ready = [label for label in reads if not reads[label]] or [next(iter(reads))]
+        for label in ready:
+            ordered.append(label)
+            del reads[label]
+        for label in reads:
+            reads[label].difference_update(ready)
+    return ordered
+
+
+def instance_from(model_cls, cleaned_data, subject_context):
+    """Returns an unsaved instance of `model_cls` of `cleaned_data`.
+
+    A foreign key given as a primary key is set to the pending row of
+    the batch with that key, if any.
+    """
+    obj = model_cls()
+    for field in model_cls._meta.concrete_fields:
+        if field.name in cleaned_data:
+            value = cleaned_data[field.name]
+        elif field.attname in cleaned_data:
+            value = cleaned_data[field.attname]
+        else:
+            continue
+        if field.is_relation and not isinstance(value, models.Model):
+            pending = subject_context.repository.rows.get(field.related_model, {})
+            if value is not None:
+                value = pending.get(field.target_field.to_python(value), value)
+            if not isinstance(value, models.Model):
+                setattr(obj, field.attname, value)
+                continue
+        setattr(obj, field.name, value)
+    return obj
+
+
+def validate_sync(records, collect=False):
+    """Validates `records`, a list of (model label, cleaned_data), as one
+    sync batch and returns a list of ValidationResults in the same order
+    as `records`.
+
+    Records of models without a registered validator, e.g. visits, are
+    valid. Invalid records are not added to the overlay, so the records
+    that read them see them as missing.
+    """
+    records = list(records)
+    results = [None] * len(records)
+    validators = get_validators()
+    with OverlaySubjectContext() as subject_context:
+        for label in sync_order(label for label, _ in records):
+            indexes = [i for i, (record_label, _) in enumerate(records)
+                       if record_label == label]
+            validator_cls = get_validator_cls(label) if label in validators else None
+            prefetch = getattr(validator_cls, 'prefetch', None)
+            if prefetch:
+                prefetch(subject_context, [records[i][1] for i in indexes])
+            model_cls = get_model(label)
+            for index in indexes:
+                cleaned_data = records[index][1]
+                if validator_cls:
+                    results[index] = validate_one(
+                        validator_cls, cleaned_data, collect=collect)
+                else:
+                    results[index] = ValidationResult(cleaned_data)
+                if results[index].valid:
+                    subject_context.add(
+                        instance_from(model_cls, cleaned_data, subject_context))
+    return results
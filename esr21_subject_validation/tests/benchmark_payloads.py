@@ -0,0 +1,323 @@
+"""The payloads of the run_benchmarks script and the benchmark
+tests, a valid and an invalid cleaned_data for each form validator
+built on the test models.
+"""
+from collections import namedtuple
+from contextlib import contextmanager
+
+from dateutil.relativedelta import relativedelta
+from edc_base.utils import get_utcnow
+from edc_constants.constants import FEMALE, NEG, NO, NOT_APPLICABLE, OTHER, YES
+
+from .. import form_validators
+from ..constants import FIRST_DOSE, SECOND_DOSE
+from .models import (
+    Appointment, EligibilityConfirmation, ListModel, SubjectVisit,
+    VaccinationDetails, VaccinationHistory)
+
+Scenario = namedtuple('Scenario', 'validator_cls valid invalid')
+
+SUBJECT_IDENTIFIER = '066-21310001-1'
+SCREENING_IDENTIFIER = 'S0000001'
+
+test_models = {
+    'eligibility_confirmation_model': 'esr21_subject_validation.eligibilityconfirmation',
+    'informed_consent_model': 'esr21_subject_validation.informedconsent',
+    'subject_consent_model': 'esr21_subject_validation.informedconsent',
+    'subject_visit_model': 'esr21_subject_validation.subjectvisit',
+    'vaccination_details_cls': 'esr21_subject_validation.vaccinationdetails',
+    'vaccination_history_cls': 'esr21_subject_validation.vaccinationhistory'}
+
+
+@contextmanager
+def test_model_labels():
+    """Points the validators' model labels at the test models, as the
+    tests do, and restores them on exit.
+    """
+    saved = []
+    for validator_cls in exported_validators():
+        for attr, label in test_models.items():
+            if hasattr(validator_cls, attr):
+                saved.append((validator_cls, attr, validator_cls.__dict__.get(attr)))
+                setattr(validator_cls, attr, label)
+    try:
+        yield
+    finally:
+        for validator_cls, attr, label in reversed(saved):
+            if label is None:
+                delattr(validator_cls, attr)
+            else:
+                setattr(validator_cls, attr, label)
+
+
+def exported_validators():
+    """Returns the form validator classes exported by form_validators.
+    """
+    return [getattr(form_validators, name) for name in form_validators.__all__
+            if name.endswith('FormValidator')]
+
+
+def list_model_qs(*short_names):
+    for short_name in short_names:
+        ListModel.objects.get_or_create(
+            short_name=short_name, defaults={'name': short_name})
+    return ListModel.objects.filter(short_name__in=short_names)
+
+
+def create_fixtures():
+    """Creates a subject with an enrolment visit, a first dose, the
+    vaccination history and a follow up visit at which the second dose
+    is given.
+    """
+    enrol_visit = SubjectVisit.objects.create(
+        appointment=Appointment.objects.create(
+            subject_identifier=SUBJECT_IDENTIFIER,
+            appt_datetime=get_utcnow() - relativedelta(days=60),
+            visit_code='1000',
+            schedule_name='esr21_enrol_schedule'),
+        schedule_name='esr21_enrol_schedule')
+
+    fu_visit = SubjectVisit.objects.create(
+        appointment=Appointment.objects.create(
+            subject_identifier=SUBJECT_IDENTIFIER,
+            appt_datetime=get_utcnow(),
+            visit_code='1070',
+            schedule_name='esr21_fu_schedule'),
+        schedule_name='esr21_fu_schedule')
+
+    first_dose = VaccinationDetails.objects.create(
+        subject_visit=enrol_visit,
+        report_datetime=get_utcnow() - relativedelta(days=60),
+        received_dose_before=FIRST_DOSE,
+        vaccination_date=get_utcnow() - relativedelta(days=60),
+        next_vaccination_date=(get_utcnow() - relativedelta(days=4)).date())
+
+    VaccinationHistory.objects.create(
+        subject_identifier=SUBJECT_IDENTIFIER,
+        received_vaccine=YES,
+        dose_quantity='1')
+
+    EligibilityConfirmation.objects.create(
+        screening_identifier=SCREENING_IDENTIFIER,
+        report_datetime=get_utcnow(),
+        age_in_years=30)
+
+    return fu_visit, first_dose
+
+
+def build_scenarios():
+    """Creates the fixtures and returns a dictionary of validator name
+    to Scenario, a valid and an invalid cleaned_data for each validator
+    exported by form_validators.
+
+    Validate the payloads inside `test_model_labels()`.
+    """
+    subject_visit, first_dose = create_fixtures()
+    now = get_utcnow()
+    today = now.date()
+
+    def crf(**options):
+        return dict(subject_visit=subject_visit, report_datetime=get_utcnow(),
+                    **options)
+
+    scenarios = {}
+
+    def add(validator_cls, valid, **invalid):
+        scenarios[validator_cls.__name__] = Scenario(
+            validator_cls, valid, dict(valid, **invalid))
+
+    add(form_validators.AdverseEventRecordFormValidator,
+        {'start_date': today - relativedelta(days=10),
+         'stop_date': today - relativedelta(days=2),
+         'status': 'resolved',
+         'outcome': 'resolved',
+         'medically_attended_ae': NO,
+         'treatment_given': YES,
+         'treatmnt_given_specify': 'Paracetamol',
+         'ae_study_discontinued': NO},
+        stop_date=today - relativedelta(days=12))
+
+    add(form_validators.ConcomitantMedicationFormValidator,
+        crf(unit='mg', frequency='daily', route='oral'),
+        unit=OTHER)
+
+    add(form_validators.Covid19SymptomaticInfectionsFormValidator,
+        {'symptomatic_experiences': YES,
+         'symptomatic_infections': list_model_qs('fever'),
+         'date_of_infection': today - relativedelta(days=10),
+         'hospitalisation_visit': NO},
+        symptomatic_infections=list_model_qs(OTHER))
+
+    add(form_validators.DemographicsDataFormValidator,
+        {'ethnicity': 'black_african',
+         'employment_status': 'employed',
+         'marital_status': 'single',
+         'household_members': 4},
+        household_members=-1)
+
+    add(form_validators.EligibilityConfirmationFormValidator,
+        {'report_datetime': now},
+        report_datetime=now.replace(year=2021, month=1, day=1))
+
+    add(form_validators.HospitalisationFormValidator,
+        {'ongoing': NO,
+         'stop_date': today,
+         'reason': 'covid19_related_symptoms',
+         'covid_symptoms': 'fever'},
+        stop_date=None)
+
+    consent_datetime = get_utcnow()
+    add(form_validators.InformedConsentFormValidator,
+        {'screening_identifier': SCREENING_IDENTIFIER,
+         'consent_datetime': consent_datetime,
+         'dob': (consent_datetime - relativedelta(years=30, days=10)).date(),
+         'gender': FEMALE,
+         'identity_type': 'national_identity_card',
+         'identity': '111121111',
+         'confirm_identity': '111121111'},
+        dob=(consent_datetime - relativedelta(years=25)).date())
+
+    add(form_validators.MedicalHistoryFormValidator,
+        crf(prior_covid_infection=YES,
+            covid_symptoms=list_model_qs('fever'),
+            comorbidities=list_model_qs('HIV'),
+            received_art=YES,
+            condition_related_meds=NO),
+        covid_symptoms=ListModel.objects.none())
+
+    add(form_validators.PersonalContactInformationFormValidator,
+        {'may_visit_home': YES,
+         'physical_address': 'Plot 1234, Gaborone',
+         'may_call': YES,
+         'subject_cell': '71234567',
+         'subject_phone': '3912345',
+         'may_call_work': NO,
+         'may_contact_indirectly': YES,
+         'indirect_contact_name': 'Kago',
+         'indirect_contact_relation': 'sibling',
+         'indirect_contact_physical_address': 'Plot 4321, Gaborone',
+         'indirect_contact_cell': '72345678',
+         'indirect_contact_phone': '3954321'},
+        subject_cell=None)
+
+    add(form_validators.PhysicalFormValidator,
+        {'physical_exam': YES,
+         'reason_not_done': NOT_APPLICABLE,
+         'exam_date': today,
+         'abnormalities_found': NO,
+         'general_appearance': 'normal',
+         'face_check': 'normal',
+         'neck_check': 'normal',
+         'respiratory_check': 'normal',
+         'cardiovascular_check': 'normal',
+         'abdominal_check': 'normal',
+         'skin_check': 'normal',
+         'neurological_check': 'normal'},
+        neck_check='abnormal')
+
+    add(form_validators.OutcomeInlineFormValidator,
+        crf(specify_outcome='full_term', method='vaginal'),
+        method=None)
+
+    add(form_validators.PregnancyStatusFormValidator,
+        crf(contraceptive_usage=YES,
+            contraceptive=list_model_qs('condoms'),
+            number_miscarriages=0,
+            post_menopausal=NO,
+            amenorrhea_history=NO,
+            primary_amenorrhea=NO,
+            start_date_menstrual_period=today - relativedelta(days=30),
+            expected_delivery=today + relativedelta(days=250)),
+        expected_delivery=today - relativedelta(days=30))
+
+    add(form_validators.PregnancyTestFormValidator,
+        {'preg_performed': YES, 'result': NEG},
+        result=None)
+
+    add(form_validators.RapidHivTestingFormValidator,
+        {'hiv_testing_consent': YES,
+         'prev_hiv_test': YES,
+         'hiv_test_date': today - relativedelta(days=30),
+         'hiv_result': NEG,
+         'evidence_hiv_status': YES,
+         'rapid_test_done': YES,
+         'rapid_test_date': today,
+         'rapid_test_result': NEG},
+        rapid_test_done=NO, rapid_test_date=None, rapid_test_result=None)
+
+    add(form_validators.ScreeningEligibilityFormValidator,
+        {'symptomatic_infections_experiences': NO,
+         'symptomatic_infections': ListModel.objects.none(),
+         'report_datetime': now,
+         'childbearing_potential': YES,
+         'birth_control': YES,
+         'birthcontrol_agreement': YES},
+        birthcontrol_agreement=None)
+
+    add(form_validators.SeriousAdverseEventRecordFormValidator,
+        {'start_date': today - relativedelta(days=10),
+         'date_aware_of': today - relativedelta(days=9),
+         'seriousness_criteria': list_model_qs('hospitalization'),
+         'admission_date': today - relativedelta(days=9),
+         'discharge_date': today - relativedelta(days=5),
+         'resolution_date': today - relativedelta(days=2)},
+        date_aware_of=today - relativedelta(days=12))
+
+    add(form_validators.SpecialInterestAERecordFormValidator,
+        {'start_date': today - relativedelta(days=10),
+         'end_date': today - relativedelta(days=2),
+         'date_aware_of': today - relativedelta(days=9)},
+        end_date=today - relativedelta(days=12))
+
+    add(form_validators.SubjectRequisitionFormValidator,
+        crf(reason_not_drawn=None, item_type='tube', priority='normal'),
+        priority='urgent')
+
+    add(form_validators.TargetedPhysicalExamFormValidator,
+        {'physical_exam_performed': YES,
+         'area_performed': 'chest',
+         'exam_date': today,
+         'abnormalities': NO},
+        abnormalities=YES)
+
+    add(form_validators.VaccineDetailsFormValidator,
+        crf(received_dose=YES,
+            vaccination_site='left_arm',
+            vaccination_date=get_utcnow(),
+            lot_number='A1234',
+            expiry_date=today + relativedelta(years=1),
+            provider_name='Nurse',
+            received_dose_before=SECOND_DOSE,
+            location='clinic',
+            admin_per_protocol=YES,
+            next_vaccination_date=today + relativedelta(days=180)),
+        expiry_date=today - relativedelta(days=1))
+
+    add(form_validators.VaccinationHistoryFormValidator,
+        {'subject_identifier': SUBJECT_IDENTIFIER,
+         'received_vaccine': YES,
+         'dose_quantity': '1',
+         'dose1_product_name': 'azd_1222',
+         'dose1_date': first_dose.vaccination_date.date()},
+        dose1_product_name='pfizer')
+
+    add(form_validators.VitalSignsFormValidator,
+        crf(vital_signs_measured=YES,
+            reason_vitals_nd=NOT_APPLICABLE,
+            assessment_dt=now,
+            systolic_bp=120,
+            diastolic_bp=80,
+            heart_rate=70,
+            body_temp=36.8,
+            body_temp_unit='C',
+            oxygen_saturated=98),
+        body_temp_unit=NOT_APPLICABLE)
+
+    add(form_validators.ProtocolDeviationFormValidator,
+        {'deviation_name': 'missed_visit',
+         'deviation_form_name': 'vaccination_details',
+         'subject_identifiers': SUBJECT_IDENTIFIER,
+         'deviation_description': 'Participant missed the day 70 visit.'},
+        deviation_description=None)
+
+    return scenarios
@@ -3,6 +3,8 @@ from django.db.models.deletion import PROTECT
 from edc_base.model_mixins import BaseUuidModel, ListModelMixin
 from edc_base.utils import get_utcnow
 
+from ..model_mixins import SubjectStatusModelMixin
+
 
 class Appointment(BaseUuidModel):
     subject_identifier = models.CharField(max_length=25)
@@ -94,6 +96,8 @@ class VaccinationDetails(models.Model):
 
     next_vaccination_date = models.DateField()
 
+    modified = models.DateTimeField(auto_now=True)
+
 
 class VaccinationHistory(models.Model):
     subject_identifier = models.CharField(max_length=25)
@@ -103,3 +107,25 @@ class VaccinationHistory(models.Model):
     received_vaccine = models.CharField(max_length=25)
 
     dose_quantity = models.CharField(max_length=25)
+
+    dose1_product_name = models.CharField(max_length=25, blank=True, null=True)
+
+    dose1_date = models.DateField(blank=True, null=True)
+
+    dose2_product_name = models.CharField(max_length=25, blank=True, null=True)
+
+    dose2_date = models.DateField(blank=True, null=True)
+
+    modified = models.DateTimeField(auto_now=True)
+
+
+class AdverseEventRecord(models.Model):
+    status = models.CharField(max_length=25, blank=True, null=True)
+
+    start_date = models.DateField()
+
+    stop_date = models.DateField(blank=True, null=True)
+
+
+class SubjectStatus(SubjectStatusModelMixin):
+    pass
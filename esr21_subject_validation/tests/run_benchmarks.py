@@ -0,0 +1,105 @@
+"""Benchmarks each form validator with a valid and an invalid payload
+against the test models, on a throw away test database, with the test
+settings, e.g.:
+
+    DJANGO_SETTINGS_MODULE=esr21_subject_validation.settings \\
+        python -m esr21_subject_validation.tests.run_benchmarks \\
+        --save-baseline baseline.json
+
+Results are listed slowest first. Exits with status 1 if --compare
+finds a regression.
+"""
+import argparse
+import sys
+
+import django
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        'validators', nargs='*',
+        help='Validator class names to benchmark, default all.')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument(
+        '--save-baseline', dest='save_baseline', metavar='PATH',
+        help='Write the results to a baseline JSON file.')
+    parser.add_argument(
+        '--compare', metavar='PATH',
+        help='Compare the results against a baseline JSON file and '
+             'fail if any benchmark regressed.')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.10,
+        help='Allowed slow down against the baseline, default 0.10.')
+    parser.add_argument(
+        '--import-time', dest='import_time', action='store_true',
+        help='Only time importing form_validators in a new process, '
+             'lazily and with every validator loaded.')
+    return parser.parse_args(argv)
+
+
+def report(run):
+    print(f'{"benchmark":<55} {"ops/sec":>10} {"p50 ms":>9} {"p95 ms":>9} '
+          f'{"p99 ms":>9} {"queries":>8}')
+    results = sorted(
+        run['results'].items(), key=lambda item: item[1]['p50_ms'], reverse=True)
+    for name, result in results:
+        line = (f'{name:<55} {result["ops_per_sec"]:>10} '
+                f'{result["p50_ms"]:>9} {result["p95_ms"]:>9} '
+                f'{result["p99_ms"]:>9} {result["queries_per_call"]:>8}')
+        if result['valid'] != result['expected']:
+            line = f'{line}  payload did not validate as expected'
+        print(line)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    django.setup()
+
+    from django.db import connection
+
+    from ..benchmarks import compare, load_baseline, run_benchmarks, save_baseline
+    from ..benchmarks.import_time import measure_import_time
+    from .benchmark_payloads import build_scenarios, test_model_labels
+
+    if options.import_time:
+        timings = measure_import_time()
+        for name, seconds in timings.items():
+            print(f'{name:<6} {seconds * 1000:>9.1f} ms')
+        print(f'saved  {(timings["eager"] - timings["lazy"]) * 1000:>9.1f} ms')
+        return 0
+
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False)
+    try:
+        with test_model_labels():
+            run = run_benchmarks(
+                build_scenarios(),
+                iterations=options.iterations,
+                warmup=options.warmup,
+                names=options.validators)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    report(run)
+
+    if options.save_baseline:
+        save_baseline(run, options.save_baseline)
+        print(f'Baseline saved to {options.save_baseline}.')
+
+    if options.compare:
+        regressions = compare(
+            load_baseline(options.compare), run, tolerance=options.tolerance)
+        for regression in regressions:
+            print(f'{regression.name} {regression.metric}: '
+                  f'{regression.baseline} -> {regression.current}')
+        if regressions:
+            print(f'{len(regressions)} regressions against {options.compare}.')
+            return 1
+        print(f'No regressions against {options.compare}.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -123,3 +123,19 @@ class TestAdverseEventRecordFormValidator(TestCase):
             form_validator.validate()
         except ValidationError as e:
             self.fail(f'ValidationError unexpectedly raised. Got{e}')
+
+    def test_collect_errors_runs_every_rule(self):
+        self.ae_options.update(stop_date=(get_utcnow() - relativedelta(days=1)).date(),
+                               status='resolved',
+                               outcome='resolved_with_sequelae',
+                               sequelae_specify=None,
+                               medically_attended_ae=YES,
+                               maae_specify=None)
+        form_validator = AdverseEventRecordFormValidator(
+            cleaned_data=self.ae_options)
+        errors = form_validator.collect_errors()
+        self.assertEqual(
+            [(error.field, error.rule) for error in errors],
+            [('stop_date', 'validate_ae_end_date'),
+             ('sequelae_specify', 'validate_outcome'),
+             ('maae_specify', 'validate_maae')])
@@ -0,0 +1,56 @@
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase, tag
+from edc_base.utils import get_utcnow
+
+from ..constants import FIRST_DOSE
+from ..form_validators import VaccinationHistoryFormValidator, validate_many
+from .models import Appointment, SubjectVisit, VaccinationDetails
+
+
+@tag('batch')
+class TestBatchValidation(TestCase):
+
+    def setUp(self):
+        VaccinationHistoryFormValidator.vaccination_details_cls = \
+            'esr21_subject_validation.vaccinationdetails'
+
+        appointment = Appointment.objects.create(
+            subject_identifier='222222',
+            appt_datetime=get_utcnow(),
+            visit_code='1000',
+            schedule_name='esr21_enrol_schedule')
+
+        subject_visit = SubjectVisit.objects.create(
+            appointment=appointment,
+            schedule_name='esr21_enrol_schedule')
+
+        VaccinationDetails.objects.create(
+            subject_visit=subject_visit,
+            report_datetime=get_utcnow(),
+            received_dose_before=FIRST_DOSE,
+            vaccination_date=get_utcnow(),
+            next_vaccination_date=(get_utcnow() + relativedelta(days=56)).date())
+
+        self.records = [
+            {'subject_identifier': '111111',
+             'dose_quantity': '2',
+             'dose1_product_name': 'azd_1',
+             'dose1_date': get_utcnow().date(),
+             'dose2_product_name': 'azd_12',
+             'dose2_date': get_utcnow().date()},
+            {'subject_identifier': '222222',
+             'dose_quantity': '1',
+             'dose1_product_name': 'azd_1',
+             'dose1_date': get_utcnow().date(),
+             'dose2_product_name': None}]
+
+    def test_results_in_record_order(self):
+        results = validate_many(VaccinationHistoryFormValidator, self.records)
+
+        self.assertEqual(len(results), 2)
+        self.assertTrue(results[0].valid)
+        self.assertIn('dose_quantity', results[1].errors)
+
+    def test_doses_prefetched_in_one_query(self):
+        with self.assertNumQueries(1):
+            validate_many(VaccinationHistoryFormValidator, self.records)
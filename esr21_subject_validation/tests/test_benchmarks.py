@@ -0,0 +1,57 @@
+from copy import deepcopy
+
+from django.test import TestCase, tag
+
+from ..benchmarks import compare, run_benchmarks
+from ..benchmarks.runner import validate
+from ..form_validators import VaccinationHistoryFormValidator
+from .benchmark_payloads import build_scenarios, exported_validators, test_model_labels
+
+
+@tag('benchmarks')
+class TestBenchmarks(TestCase):
+
+    def setUp(self):
+        labels = test_model_labels()
+        labels.__enter__()
+        self.addCleanup(labels.__exit__, None, None, None)
+        self.scenarios = build_scenarios()
+
+    def test_every_validator_has_a_scenario(self):
+        self.assertEqual(
+            sorted(self.scenarios),
+            sorted(cls.__name__ for cls in exported_validators()))
+
+    def test_payloads_validate_as_expected(self):
+        for name, scenario in self.scenarios.items():
+            with self.subTest(validator=name):
+                self.assertTrue(validate(scenario.validator_cls, scenario.valid))
+                self.assertFalse(validate(scenario.validator_cls, scenario.invalid))
+
+    def test_compare_against_baseline(self):
+        baseline = run_benchmarks(
+            self.scenarios, iterations=5, warmup=1,
+            names=['VaccinationHistoryFormValidator'])
+        self.assertEqual(compare(baseline, baseline), [])
+
+        run = deepcopy(baseline)
+        result = run['results']['VaccinationHistoryFormValidator.valid']
+        result['queries_per_call'] += 1
+        result['p50_ms'] *= 2
+        self.assertEqual(
+            [(r.name, r.metric) for r in compare(baseline, run)],
+            [('VaccinationHistoryFormValidator.valid', 'p50_ms'),
+             ('VaccinationHistoryFormValidator.valid', 'queries_per_call')])
+
+    def test_model_labels_restored(self):
+        self.addCleanup(
+            setattr, VaccinationHistoryFormValidator, 'vaccination_details_cls',
+            VaccinationHistoryFormValidator.vaccination_details_cls)
+        VaccinationHistoryFormValidator.vaccination_details_cls = 'esr21_subject.vaccinationdetails'
+        with test_model_labels():
+            self.assertEqual(
+                VaccinationHistoryFormValidator.vaccination_details_cls,
+                'esr21_subject_validation.vaccinationdetails')
+        self.assertEqual(
+            VaccinationHistoryFormValidator.vaccination_details_cls,
+            'esr21_subject.vaccinationdetails')
@@ -0,0 +1,58 @@
+import csv
+import os
+import tempfile
+from datetime import date, datetime
+
+from django.test import SimpleTestCase, tag
+from edc_constants.constants import NO, YES
+
+from ..cohort_audit import audit_cohort, columns, read_rows
+from ..constants import FIRST_DOSE, SECOND_DOSE
+from ..form_validators import DoseWindows
+
+
+def row(pk, subject_identifier, dose, vaccination_date, **options):
+    return {**dict.fromkeys(columns), 'pk': pk, 'subject_identifier': subject_identifier,
+            'received_dose_before': dose, 'vaccination_date': vaccination_date,
+            'visit_datetime': vaccination_date, 'schedule_name': 'esr21_fu_schedule',
+            **options}
+
+
+@tag('cohort_audit')
+class TestCohortAudit(SimpleTestCase):
+
+    def setUp(self):
+        self.rows = [
+            row(1, 'A', FIRST_DOSE, datetime(2021, 5, 1),
+                next_vaccination_date=date(2021, 6, 1), expiry_date=date(2021, 4, 1)),
+            row(2, 'A', SECOND_DOSE, datetime(2021, 6, 1)),
+            row(3, 'B', FIRST_DOSE, datetime(2021, 5, 1),
+                next_vaccination_date=date(2021, 7, 1)),
+            row(4, 'B', SECOND_DOSE, datetime(2021, 7, 1)),
+            row(5, 'C', SECOND_DOSE, datetime(2021, 7, 1),
+                schedule_name='esr21_enrol_schedule', received_vaccine=NO),
+            row(6, 'D', SECOND_DOSE, datetime(2021, 7, 1),
+                schedule_name='esr21_enrol_schedule', received_vaccine=YES)]
+
+    def test_violations(self):
+        self.assertEqual(
+            [(pk, field, code) for _, pk, _, field, _, code, _ in audit_cohort(
+                self.rows, DoseWindows())],
+            [(1, 'next_vaccination_date', 'VAX_NEXT_BEFORE_WINDOW'),
+             (1, 'expiry_date', 'VAX_EXPIRY_BEFORE_VISIT'),
+             (2, 'vaccination_date', 'VAX_SECOND_OUTSIDE_WINDOW'),
+             (5, 'received_dose_before', 'VAX_FIRST_DOSE_MISSING')])
+
+    def test_csv_export(self):
+        path = os.path.join(tempfile.mkdtemp(), 'export.csv')
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, columns)
+            writer.writeheader()
+            for data in self.rows:
+                writer.writerow({
+                    name: value.isoformat() if hasattr(value, 'isoformat') else value
+                    for name, value in data.items()})
+
+        self.assertEqual(
+            [violation[3:6] for violation in audit_cohort(read_rows(path), DoseWindows())],
+            [violation[3:6] for violation in audit_cohort(self.rows, DoseWindows())])
@@ -0,0 +1,163 @@
+from django import forms
+from django.test import TestCase, override_settings, tag
+from edc_base.utils import get_utcnow, relativedelta
+from edc_constants.constants import NO, YES
+
+from ..constants import FIRST_DOSE, SECOND_DOSE
+from ..form_validators import (
+    ConcomitantMedicationFormValidator, DataLoader, VaccineDetailsFormValidator,
+    validate_formset)
+from .models import (
+    Appointment, SubjectStatus, SubjectVisit, VaccinationDetails, VaccinationHistory)
+
+
+class MedicationForm(forms.Form):
+    subject_visit = forms.CharField()
+    report_datetime = forms.DateTimeField()
+    unit = forms.CharField()
+    frequency = forms.CharField()
+    route = forms.CharField()
+
+
+class VaccinationForm(forms.Form):
+    subject_visit = forms.ModelChoiceField(queryset=SubjectVisit.objects.all())
+    report_datetime = forms.DateTimeField()
+    received_dose = forms.CharField()
+    received_dose_before = forms.CharField()
+    vaccination_site = forms.CharField()
+    vaccination_date = forms.DateTimeField()
+    admin_per_protocol = forms.CharField()
+    lot_number = forms.CharField()
+    expiry_date = forms.DateField()
+    provider_name = forms.CharField()
+    location = forms.CharField()
+    next_vaccination_date = forms.DateField()
+
+
+def create_subject_visit(subject_identifier, visit_code, schedule_name):
+    return SubjectVisit.objects.create(
+        appointment=Appointment.objects.create(
+            subject_identifier=subject_identifier,
+            appt_datetime=get_utcnow(),
+            visit_code=visit_code,
+            schedule_name=schedule_name),
+        schedule_name=schedule_name)
+
+
+@tag('data_loader')
+class TestDataLoader(TestCase):
+
+    def setUp(self):
+        ConcomitantMedicationFormValidator.subject_visit_model = \
+            'esr21_subject_validation.subjectvisit'
+
+        self.subject_visits = [
+            SubjectVisit.objects.create(
+                appointment=Appointment.objects.create(
+                    subject_identifier=f'11111{i}',
+                    appt_datetime=get_utcnow(),
+                    visit_code='1000',
+                    schedule_name='esr21_enrol_schedule'),
+                schedule_name='esr21_enrol_schedule')
+            for i in range(3)]
+
+    def test_wanted_keys_loaded_together(self):
+        loader = DataLoader(SubjectVisit, select_related=('appointment', ))
+        loader.want(*[str(subject_visit.pk) for subject_visit in self.subject_visits])
+        with self.assertNumQueries(1):
+            subject_visit = loader.load(str(self.subject_visits[0].pk))
+            self.assertEqual(subject_visit, self.subject_visits[0])
+            self.assertEqual(
+                loader.load(self.subject_visits[2].pk).appointment.subject_identifier,
+                '111112')
+
+    def test_formset_visits_in_one_query(self):
+        MedicationFormSet = forms.formset_factory(MedicationForm, extra=0)
+        # the last report is before its visit
+        report_datetimes = [get_utcnow() + relativedelta(minutes=1),
+                            get_utcnow() + relativedelta(minutes=1),
+                            get_utcnow() - relativedelta(days=1)]
+        data = {'form-TOTAL_FORMS': '3', 'form-INITIAL_FORMS': '0'}
+        for i, (subject_visit, report_datetime) in enumerate(
+                zip(self.subject_visits, report_datetimes)):
+            data.update({
+                f'form-{i}-subject_visit': str(subject_visit.pk),
+                f'form-{i}-report_datetime': report_datetime.strftime('%Y-%m-%d %H:%M:%S'),
+                f'form-{i}-unit': 'mg',
+                f'form-{i}-frequency': 'daily',
+                f'form-{i}-route': 'oral'})
+        formset = MedicationFormSet(data)
+        self.assertTrue(formset.is_valid())
+
+        with self.assertNumQueries(1):
+            results = validate_formset(ConcomitantMedicationFormValidator, formset)
+
+        self.assertEqual([result.valid for _, result in results], [True, True, False])
+        self.assertTrue(formset.forms[2].non_field_errors())
+
+
+@tag('data_loader')
+class TestModelChoiceFormset(TestCase):
+    """Validates a formset whose subject visits are model instances, as
+    a ModelChoiceField or a ModelForm cleans them.
+    """
+
+    def setUp(self):
+        VaccineDetailsFormValidator.vaccination_details_cls = \
+            'esr21_subject_validation.vaccinationdetails'
+        VaccineDetailsFormValidator.vaccination_history_cls = \
+            'esr21_subject_validation.vaccinationhistory'
+        VaccineDetailsFormValidator.subject_visit_model = \
+            'esr21_subject_validation.subjectvisit'
+
+        first_dose_date = get_utcnow() - relativedelta(days=60)
+        self.subject_visits = []
+        for i in range(3):
+            subject_identifier = f'11111{i}'
+            VaccinationDetails.objects.create(
+                subject_visit=create_subject_visit(
+                    subject_identifier, '1000', 'esr21_enrol_schedule'),
+                report_datetime=first_dose_date,
+                received_dose_before=FIRST_DOSE,
+                vaccination_date=first_dose_date,
+                next_vaccination_date=get_utcnow().date())
+            VaccinationHistory.objects.create(
+                subject_identifier=subject_identifier, received_vaccine=NO,
+                dose_quantity='0')
+            self.subject_visits.append(create_subject_visit(
+                subject_identifier, '1028', 'esr21_enrol_schedule'))
+
+        data = {'form-TOTAL_FORMS': '3', 'form-INITIAL_FORMS': '0'}
+        for i, subject_visit in enumerate(self.subject_visits):
+            data.update({
+                f'form-{i}-subject_visit': str(subject_visit.pk),
+                f'form-{i}-report_datetime': format(
+                    get_utcnow() + relativedelta(minutes=1), '%Y-%m-%d %H:%M:%S'),
+                f'form-{i}-received_dose': YES,
+                f'form-{i}-received_dose_before': SECOND_DOSE,
+                f'form-{i}-vaccination_site': 'ABC',
+                f'form-{i}-vaccination_date': format(
+                    get_utcnow() + relativedelta(minutes=1), '%Y-%m-%d %H:%M:%S'),
+                f'form-{i}-admin_per_protocol': YES,
+                f'form-{i}-lot_number': '123',
+                f'form-{i}-expiry_date': format(
+                    get_utcnow() + relativedelta(days=30), '%Y-%m-%d'),
+                f'form-{i}-provider_name': 'SPA',
+                f'form-{i}-location': 'Arm',
+                f'form-{i}-next_vaccination_date': format(
+                    get_utcnow() + relativedelta(days=56), '%Y-%m-%d')})
+        self.formset = forms.formset_factory(VaccinationForm, extra=0)(data)
+        self.assertTrue(self.formset.is_valid())
+
+    def test_lookups_batched(self):
+        # the appointments, vaccination details and histories
+        with self.assertNumQueries(3):
+            results = validate_formset(VaccineDetailsFormValidator, self.formset)
+        self.assertEqual([result.errors for _, result in results], [{}, {}, {}])
+
+    @override_settings(ESR21_SUBJECT_STATUS_MODEL='esr21_subject_validation.subjectstatus')
+    def test_subject_statuses_batched(self):
+        self.assertFalse(SubjectStatus.objects.exists())
+        with self.assertNumQueries(4):
+            results = validate_formset(VaccineDetailsFormValidator, self.formset)
+        self.assertEqual([result.errors for _, result in results], [{}, {}, {}])
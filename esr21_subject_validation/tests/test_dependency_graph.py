@@ -0,0 +1,76 @@
+from django.db.models.signals import post_save
+from django.test import TestCase, tag
+from edc_base.utils import get_utcnow
+
+from ..constants import FIRST_DOSE
+from ..form_validators import (
+    SubjectContext, VaccinationHistoryFormValidator, VaccineDetailsFormValidator)
+from ..form_validators.dependency_graph import DependencyGraph, get_graph
+from ..signals import reconnect_receivers, validation_inputs_changed
+from .models import Appointment, SubjectVisit, VaccinationDetails
+
+
+@tag('dependency_graph')
+class TestDependencyGraph(TestCase):
+
+    def setUp(self):
+        VaccinationHistoryFormValidator.vaccination_details_cls = \
+            'esr21_subject_validation.vaccinationdetails'
+        VaccineDetailsFormValidator.vaccination_details_cls = \
+            'esr21_subject_validation.vaccinationdetails'
+        VaccineDetailsFormValidator.vaccination_history_cls = \
+            'esr21_subject_validation.vaccinationhistory'
+        get_graph.cache_clear()
+        self.addCleanup(get_graph.cache_clear)
+        reconnect_receivers()
+
+        self.subject_visit = SubjectVisit.objects.create(
+            appointment=Appointment.objects.create(
+                subject_identifier='111111',
+                appt_datetime=get_utcnow(),
+                visit_code='1000',
+                schedule_name='esr21_enrol_schedule'),
+            schedule_name='esr21_enrol_schedule')
+
+    def test_dependants(self):
+        graph = DependencyGraph(
+            [VaccinationHistoryFormValidator, VaccineDetailsFormValidator])
+        label = 'esr21_subject_validation.vaccinationdetails'
+        self.assertEqual(
+            graph.dependants(label),
+            [VaccinationHistoryFormValidator, VaccineDetailsFormValidator])
+        self.assertEqual(
+            graph.dependants('esr21_subject_validation.vaccinationhistory'),
+            [VaccineDetailsFormValidator])
+        self.assertEqual(graph.dependants(label, fields=['lot_number']), [])
+
+    def test_save_invalidates_subject_rows(self):
+        calls = []
+
+        def receiver(sender, identifiers=None, validators=None, **kwargs):
+            calls.append((sender, identifiers))
+        validation_inputs_changed.connect(receiver)
+        self.addCleanup(validation_inputs_changed.disconnect, receiver)
+
+        subject_context = SubjectContext()
+        subject_context.vaccination_dates(VaccinationDetails, subject_identifier='111111')
+        subject_context.vaccination_dates(VaccinationDetails, subject_identifier='222222')
+
+        VaccinationDetails.objects.create(
+            subject_visit=self.subject_visit,
+            report_datetime=get_utcnow(),
+            received_dose_before=FIRST_DOSE,
+            vaccination_date=get_utcnow(),
+            next_vaccination_date=get_utcnow().date())
+
+        self.assertEqual(calls, [(VaccinationDetails, {'111111'})])
+        with self.assertNumQueries(1):
+            self.assertIn(FIRST_DOSE, subject_context.vaccination_dates(
+                VaccinationDetails, subject_identifier='111111'))
+        with self.assertNumQueries(0):
+            subject_context.vaccination_dates(
+                VaccinationDetails, subject_identifier='222222')
+
+    def test_receivers_connected_to_read_models_only(self):
+        self.assertTrue(post_save.has_listeners(VaccinationDetails))
+        self.assertFalse(post_save.has_listeners(Appointment))
@@ -0,0 +1,39 @@
+from datetime import date, datetime
+
+from django.test import SimpleTestCase, tag
+
+from ..constants import BOOSTER_DOSE, FIRST_DOSE, SECOND_DOSE
+from ..form_validators import DoseWindows, audit_dose_windows
+
+
+@tag('dose_windows')
+class TestDoseWindows(SimpleTestCase):
+
+    def setUp(self):
+        self.dose_windows = DoseWindows({
+            (FIRST_DOSE, SECOND_DOSE): (56, None),
+            (SECOND_DOSE, BOOSTER_DOSE): (90, 365)})
+
+    def test_check(self):
+        self.assertIsNone(self.dose_windows.check(
+            FIRST_DOSE, date(2021, 5, 1), SECOND_DOSE, date(2021, 6, 26)))
+        self.assertEqual(self.dose_windows.check(
+            FIRST_DOSE, datetime(2021, 5, 1, 9), SECOND_DOSE, datetime(2021, 6, 25, 8)), 55)
+        self.assertEqual(self.dose_windows.check(
+            SECOND_DOSE, date(2021, 5, 1), BOOSTER_DOSE, date(2022, 5, 2)), 366)
+
+    def test_default_window(self):
+        self.assertEqual(DoseWindows().following(FIRST_DOSE), (SECOND_DOSE, (56, None)))
+        self.assertIsNone(DoseWindows().window(SECOND_DOSE, BOOSTER_DOSE))
+
+    def test_audit(self):
+        rows = [
+            ('A', FIRST_DOSE, datetime(2021, 5, 1)),
+            ('B', BOOSTER_DOSE, date(2021, 8, 1)),
+            ('A', SECOND_DOSE, datetime(2021, 6, 1)),
+            ('B', SECOND_DOSE, date(2021, 6, 1)),
+            ('C', SECOND_DOSE, date(2021, 6, 1))]
+        self.assertEqual(
+            [(violation.subject_identifier, violation.to_dose, violation.days)
+             for violation in audit_dose_windows(rows, self.dose_windows)],
+            [('A', SECOND_DOSE, 31), ('B', BOOSTER_DOSE, 61)])
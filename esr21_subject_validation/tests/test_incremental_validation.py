@@ -0,0 +1,73 @@
+from dateutil.relativedelta import relativedelta
+from django.core.exceptions import ValidationError
+from django.test import TestCase, tag
+from edc_base.utils import get_utcnow
+from edc_constants.constants import YES
+
+from ..constants import FIRST_DOSE
+from ..form_validators import VaccinationHistoryFormValidator
+from ..form_validators.rule_runner_mixin import changed_fields
+from .models import Appointment, SubjectVisit, VaccinationDetails, VaccinationHistory
+
+
+@tag('incremental')
+class TestIncrementalValidation(TestCase):
+
+    def setUp(self):
+        VaccinationHistoryFormValidator.vaccination_details_cls = \
+            'esr21_subject_validation.vaccinationdetails'
+
+        VaccinationDetails.objects.create(
+            subject_visit=SubjectVisit.objects.create(
+                appointment=Appointment.objects.create(
+                    subject_identifier='111111',
+                    appt_datetime=get_utcnow(),
+                    visit_code='1000',
+                    schedule_name='esr21_enrol_schedule'),
+                schedule_name='esr21_enrol_schedule'),
+            report_datetime=get_utcnow(),
+            received_dose_before=FIRST_DOSE,
+            vaccination_date=get_utcnow(),
+            next_vaccination_date=(get_utcnow() + relativedelta(days=56)).date())
+
+        # saved before the first dose was captured, so no longer valid
+        self.instance = VaccinationHistory.objects.create(
+            subject_identifier='111111',
+            received_vaccine=YES,
+            dose_quantity='2',
+            dose1_product_name='pfizer',
+            dose1_date=get_utcnow().date(),
+            dose2_product_name='pfizer',
+            dose2_date=get_utcnow().date())
+        self.cleaned_data = {
+            field: getattr(self.instance, field) for field in [
+                'subject_identifier', 'report_datetime', 'received_vaccine',
+                'dose_quantity', 'dose1_product_name', 'dose1_date',
+                'dose2_product_name', 'dose2_date']}
+
+    def test_changed_fields(self):
+        self.cleaned_data['report_datetime'] = get_utcnow() + relativedelta(days=1)
+        self.assertEqual(
+            changed_fields(self.instance, self.cleaned_data), {'report_datetime'})
+
+    def test_unchanged_rules_skipped(self):
+        self.cleaned_data['report_datetime'] = get_utcnow() + relativedelta(days=1)
+        form_validator = VaccinationHistoryFormValidator(
+            cleaned_data=self.cleaned_data, instance=self.instance,
+            incremental=True)
+        with self.assertNumQueries(0):
+            form_validator.validate()
+
+    def test_changed_rules_run(self):
+        self.cleaned_data['dose1_product_name'] = 'moderna'
+        form_validator = VaccinationHistoryFormValidator(
+            cleaned_data=self.cleaned_data, instance=self.instance,
+            incremental=True)
+        with self.assertRaises(ValidationError) as cm:
+            form_validator.validate()
+        self.assertIn('dose1_product_name', cm.exception.error_dict)
+
+    def test_all_rules_run_by_default(self):
+        form_validator = VaccinationHistoryFormValidator(
+            cleaned_data=self.cleaned_data, instance=self.instance)
+        self.assertRaises(ValidationError, form_validator.validate)
@@ -0,0 +1,54 @@
+from dateutil.relativedelta import relativedelta
+from django.core.exceptions import ValidationError
+from django.test import TestCase, tag
+from edc_base.utils import get_utcnow
+
+from ..form_validators import (
+    AdverseEventRecordFormValidator, InMemoryAggregator,
+    VaccinationHistoryFormValidator, register_sink, unregister_sink)
+
+
+@tag('instrumentation')
+class TestInstrumentation(TestCase):
+
+    def setUp(self):
+        VaccinationHistoryFormValidator.vaccination_details_cls = \
+            'esr21_subject_validation.vaccinationdetails'
+        self.aggregator = register_sink(InMemoryAggregator())
+
+    def tearDown(self):
+        unregister_sink(self.aggregator)
+
+    def stats(self, rule):
+        return {(s['validator'], s['rule']): s
+                for s in self.aggregator.summary()}.get(rule)
+
+    def test_validate_and_rules_recorded(self):
+        today = get_utcnow().date()
+        form_validator = AdverseEventRecordFormValidator(cleaned_data={
+            'start_date': today,
+            'stop_date': today - relativedelta(days=1)})
+        self.assertRaises(ValidationError, form_validator.validate)
+
+        validate = self.stats(('AdverseEventRecordFormValidator', 'validate'))
+        rule = self.stats(
+            ('AdverseEventRecordFormValidator', 'validate_ae_end_date'))
+        self.assertEqual(validate['calls'], 1)
+        self.assertEqual(validate['failures'], 1)
+        self.assertEqual(rule['failures'], 1)
+        self.assertIsNone(
+            self.stats(('AdverseEventRecordFormValidator', 'validate_outcome')))
+
+    def test_queries_counted_per_rule(self):
+        form_validator = VaccinationHistoryFormValidator(cleaned_data={
+            'subject_identifier': '111111',
+            'dose_quantity': '1',
+            'dose1_product_name': 'azd_1222',
+            'dose1_date': get_utcnow().date()})
+        self.assertRaises(ValidationError, form_validator.validate)
+
+        self.assertEqual(
+            self.stats(('VaccinationHistoryFormValidator', 'validate'))['queries'], 1)
+        self.assertEqual(
+            self.stats(('VaccinationHistoryFormValidator',
+                        'validate_number_of_doses'))['queries'], 1)
@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.test import TestCase, tag
+
+from .. import form_validators
+
+# Run in a fresh interpreter, prints the validator modules imported by
+# setting up Django and whether the default labels the receivers are
+# connected to are those the validators read.
+script = """
+import json
+import sys
+import django
+django.setup()
+modules = sorted(
+    name for name in sys.modules
+    if name.startswith('esr21_subject_validation.form_validators.')
+    and name.endswith('_validator'))
+from esr21_subject_validation.form_validators.dependency_graph import (
+    default_read_models, get_graph)
+from esr21_subject_validation.subject_status import (
+    default_source_models, source_models)
+print(json.dumps([
+    modules,
+    sorted(default_read_models) == sorted(get_graph().models),
+    default_source_models == source_models()]))
+"""
+
+
+@tag('lazy_imports')
+class TestLazyImports(TestCase):
+
+    def test_every_export_resolves(self):
+        for name in form_validators.__all__:
+            with self.subTest(name=name):
+                self.assertIsNotNone(getattr(form_validators, name))
+        self.assertTrue(set(form_validators.__all__) <= set(dir(form_validators)))
+
+    def test_unknown_name_raises(self):
+        with self.assertRaises(AttributeError):
+            form_validators.UnknownFormValidator
+
+    def test_protocol_resolved_on_use(self):
+        self.assertIs(
+            form_validators.VaccineDetailsFormValidator.edc_protocol,
+            django_apps.get_app_config('edc_protocol'))
+
+    def test_setup_imports_no_validator(self):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        output = subprocess.run(
+            [sys.executable, '-c', script], env=env, check=True,
+            capture_output=True, text=True).stdout
+        modules, read_models_declared, source_models_declared = json.loads(
+            output.splitlines()[-1])
+        self.assertEqual(modules, [])
+        self.assertTrue(read_models_declared)
+        self.assertTrue(source_models_declared)
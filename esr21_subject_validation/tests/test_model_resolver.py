@@ -0,0 +1,29 @@
+from django.test import TestCase, tag
+
+from ..form_validators import VaccineDetailsFormValidator
+from ..form_validators.model_resolver import get_model
+from .models import VaccinationDetails, VaccinationHistory
+
+
+@tag('model_resolver')
+class TestModelResolver(TestCase):
+
+    def test_model_resolved_once(self):
+        get_model.cache_clear()
+        get_model('esr21_subject_validation.vaccinationdetails')
+        get_model('esr21_subject_validation.vaccinationdetails')
+        self.assertEqual(get_model.cache_info().misses, 1)
+        self.assertEqual(get_model.cache_info().hits, 1)
+
+    def test_label_override_honoured(self):
+        form_validator = VaccineDetailsFormValidator(cleaned_data={})
+        VaccineDetailsFormValidator.vaccination_details_cls = \
+            'esr21_subject_validation.vaccinationdetails'
+        self.assertIs(
+            form_validator.vaccination_details_model_cls, VaccinationDetails)
+        VaccineDetailsFormValidator.vaccination_details_cls = \
+            'esr21_subject_validation.vaccinationhistory'
+        self.assertIs(
+            form_validator.vaccination_details_model_cls, VaccinationHistory)
+        VaccineDetailsFormValidator.vaccination_details_cls = \
+            'esr21_subject_validation.vaccinationdetails'
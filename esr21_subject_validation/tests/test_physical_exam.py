@@ -56,3 +56,10 @@ class TestPhysicalExamForm(TestCase):
         data_check8 = {'neurological_check': 'abnormal'}
         form = PhysicalFormValidator(cleaned_data=data_check8)
         self.assertRaises(ValidationError, form.validate)
+
+    def test_abnormal_descriptions_collected_in_one_pass(self):
+        data = {'face_check': 'abnormal', 'neck_check': 'abnormal'}
+        form = PhysicalFormValidator(cleaned_data=data)
+        self.assertEqual(
+            [error.field for error in form.collect_errors()],
+            ['face_description', 'neck_description'])
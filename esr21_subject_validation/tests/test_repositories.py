@@ -0,0 +1,103 @@
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase, tag
+from edc_base.utils import get_utcnow, relativedelta
+from edc_constants.constants import NO, YES
+
+from ..constants import FIRST_DOSE, SECOND_DOSE
+from ..form_validators import (
+    InMemoryRepository, OverlayRepository, VaccineDetailsFormValidator, validate_many)
+from .models import Appointment, SubjectVisit, VaccinationDetails, VaccinationHistory
+
+
+def subject_visit(report_datetime):
+    return SubjectVisit(
+        appointment=Appointment(
+            subject_identifier='1234567',
+            appt_datetime=report_datetime,
+            visit_code='1070',
+            schedule_name='esr21_fu_schedule'),
+        subject_identifier='1234567',
+        report_datetime=report_datetime,
+        schedule_name='esr21_fu_schedule')
+
+
+@tag('repositories')
+class TestInMemoryRepository(SimpleTestCase):
+    """Validates against unsaved instances, any query fails the test.
+    """
+
+    def setUp(self):
+        VaccineDetailsFormValidator.vaccination_details_cls = \
+            'esr21_subject_validation.vaccinationdetails'
+        VaccineDetailsFormValidator.vaccination_history_cls = \
+            'esr21_subject_validation.vaccinationhistory'
+        VaccineDetailsFormValidator.subject_visit_model = \
+            'esr21_subject_validation.subjectvisit'
+
+        first_visit = subject_visit(get_utcnow() - relativedelta(days=60))
+        self.subject_visit = subject_visit(get_utcnow() - relativedelta(days=1))
+        self.repository = InMemoryRepository([
+            first_visit,
+            self.subject_visit,
+            VaccinationDetails(
+                subject_visit=first_visit,
+                report_datetime=first_visit.report_datetime,
+                received_dose_before=FIRST_DOSE,
+                vaccination_date=first_visit.report_datetime,
+                next_vaccination_date=get_utcnow().date()),
+            VaccinationHistory(
+                subject_identifier='1234567', received_vaccine=NO, dose_quantity='0')])
+
+        self.data = {
+            'subject_visit': self.subject_visit,
+            'received_dose': YES,
+            'report_datetime': get_utcnow(),
+            'received_dose_before': SECOND_DOSE,
+            'vaccination_site': 'ABC',
+            'vaccination_date': get_utcnow(),
+            'admin_per_protocol': YES,
+            'lot_number': '123',
+            'expiry_date': (get_utcnow() + relativedelta(days=30)).date(),
+            'provider_name': 'SPA',
+            'location': 'Arm',
+            'next_vaccination_date': (get_utcnow() + relativedelta(days=56)).date()}
+
+    def test_second_dose_after_window_valid(self):
+        result, = validate_many(
+            VaccineDetailsFormValidator, [self.data], repository=self.repository)
+        self.assertEqual(result.errors, {})
+
+    def test_second_dose_within_window_invalid(self):
+        self.data['vaccination_date'] = get_utcnow() - relativedelta(days=30)
+        self.data['subject_visit'].report_datetime = get_utcnow() - relativedelta(days=31)
+
+        form_validator = VaccineDetailsFormValidator(
+            cleaned_data=self.data, repository=self.repository)
+        with self.assertRaises(ValidationError) as e:
+            form_validator.validate()
+        self.assertIn('vaccination_date', e.exception.message_dict)
+
+    def test_positional_cleaned_data(self):
+        form_validator = VaccineDetailsFormValidator(
+            self.data, None, repository=self.repository)
+        form_validator.validate()
+        self.assertIs(form_validator.subject_context.repository, self.repository)
+
+
+@tag('repositories')
+class TestOverlayRepository(TestCase):
+
+    def test_added_rows_replace_saved_rows(self):
+        history = VaccinationHistory.objects.create(
+            subject_identifier='1234567', received_vaccine=NO, dose_quantity='0')
+        VaccinationHistory.objects.create(
+            subject_identifier='7654321', received_vaccine=NO, dose_quantity='0')
+
+        history.dose_quantity = '1'
+        repository = OverlayRepository(rows=[history])
+
+        self.assertEqual(
+            repository.get(VaccinationHistory, subject_identifier='1234567').dose_quantity,
+            '1')
+        self.assertEqual(
+            len(repository.filter(VaccinationHistory, received_vaccine=NO)), 2)
@@ -0,0 +1,146 @@
+import os
+import tempfile
+from uuid import uuid4
+
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase, override_settings, tag
+from edc_base.utils import get_utcnow
+
+from ..constants import FIRST_DOSE, SECOND_DOSE
+from ..form_validators import (
+    LRUResultCache, SQLiteResultCache, SubjectContext, VaccinationHistoryFormValidator,
+    VaccineDetailsFormValidator, validate_many)
+from ..form_validators.dependency_graph import get_graph
+from ..form_validators.result_cache import ResultCache
+from ..signals import reconnect_receivers
+from .models import Appointment, SubjectVisit, VaccinationDetails
+
+
+@tag('result_cache')
+class TestResultCache(TestCase):
+
+    def setUp(self):
+        VaccinationHistoryFormValidator.vaccination_details_cls = \
+            'esr21_subject_validation.vaccinationdetails'
+        VaccineDetailsFormValidator.vaccination_details_cls = \
+            'esr21_subject_validation.vaccinationdetails'
+        VaccineDetailsFormValidator.vaccination_history_cls = \
+            'esr21_subject_validation.vaccinationhistory'
+        VaccineDetailsFormValidator.subject_visit_model = \
+            'esr21_subject_validation.subjectvisit'
+        get_graph.cache_clear()
+        self.addCleanup(get_graph.cache_clear)
+        reconnect_receivers()
+
+        self.subject_visit = SubjectVisit.objects.create(
+            appointment=Appointment.objects.create(
+                subject_identifier='222222',
+                appt_datetime=get_utcnow(),
+                visit_code='1000',
+                schedule_name='esr21_enrol_schedule'),
+            schedule_name='esr21_enrol_schedule')
+        VaccinationDetails.objects.create(
+            subject_visit=self.subject_visit,
+            report_datetime=get_utcnow(),
+            received_dose_before=FIRST_DOSE,
+            vaccination_date=get_utcnow(),
+            next_vaccination_date=(get_utcnow() + relativedelta(days=56)).date())
+
+        self.records = [
+            {'subject_identifier': '111111',
+             'dose_quantity': '2',
+             'dose1_product_name': 'azd_1',
+             'dose1_date': get_utcnow().date(),
+             'dose2_product_name': 'azd_12',
+             'dose2_date': get_utcnow().date()},
+            {'subject_identifier': '222222',
+             'dose_quantity': '1',
+             'dose1_product_name': 'azd_1',
+             'dose1_date': get_utcnow().date(),
+             'dose2_product_name': None}]
+
+    def create_second_dose(self):
+        return VaccinationDetails.objects.create(
+            subject_visit=SubjectVisit.objects.create(
+                appointment=Appointment.objects.create(
+                    subject_identifier='222222',
+                    appt_datetime=get_utcnow(),
+                    visit_code='1001',
+                    schedule_name='esr21_enrol_schedule'),
+                schedule_name='esr21_enrol_schedule'),
+            report_datetime=get_utcnow(),
+            received_dose_before=SECOND_DOSE,
+            vaccination_date=get_utcnow(),
+            next_vaccination_date=get_utcnow().date())
+
+    def assert_cached(self, cache):
+        results = validate_many(VaccinationHistoryFormValidator, self.records, cache=cache)
+        with self.assertNumQueries(0):
+            cached = validate_many(
+                VaccinationHistoryFormValidator, self.records, cache=cache)
+        self.assertEqual(
+            [result.errors for result in cached], [result.errors for result in results])
+        self.assertFalse(cached[1].valid)
+
+    def test_lru_cache(self):
+        self.assert_cached(LRUResultCache())
+
+    def test_sqlite_cache(self):
+        path = os.path.join(tempfile.mkdtemp(), 'cache.db')
+        self.assert_cached(SQLiteResultCache(path))
+        self.assertEqual(
+            SQLiteResultCache(path).get(
+                VaccinationHistoryFormValidator, self.records[0]).errors, {})
+
+    def test_changed_record_missed(self):
+        cache = LRUResultCache()
+        validate_many(VaccinationHistoryFormValidator, self.records, cache=cache)
+        self.records[1]['dose1_product_name'] = 'azd_1222'
+        self.assertIsNone(cache.get(VaccinationHistoryFormValidator, self.records[1]))
+        self.assertIsNotNone(cache.get(VaccinationHistoryFormValidator, self.records[0]))
+
+    def test_dependent_row_saved_misses_subject_results(self):
+        cache = LRUResultCache()
+        validate_many(VaccinationHistoryFormValidator, self.records, cache=cache)
+        self.create_second_dose()
+        self.assertIsNotNone(cache.get(VaccinationHistoryFormValidator, self.records[0]))
+        self.assertIsNone(cache.get(VaccinationHistoryFormValidator, self.records[1]))
+
+    def test_other_process_save_misses_configured_cache(self):
+        path = os.path.join(tempfile.mkdtemp(), 'cache.db')
+        cache = SQLiteResultCache(path)
+        validate_many(VaccinationHistoryFormValidator, self.records, cache=cache)
+        # a cache of another process, only the configured cache is bumped
+        ResultCache.live.discard(cache)
+        with override_settings(ESR21_VALIDATION_CACHE=(
+                'esr21_subject_validation.form_validators.result_cache.SQLiteResultCache',
+                {'path': path})):
+            self.create_second_dose()
+        self.assertIsNotNone(cache.get(VaccinationHistoryFormValidator, self.records[0]))
+        self.assertIsNone(cache.get(VaccinationHistoryFormValidator, self.records[1]))
+
+    def test_subject_visit_pk_record_missed(self):
+        record = {'subject_visit': self.subject_visit.pk,
+                  'report_datetime': get_utcnow(),
+                  'received_dose_before': SECOND_DOSE,
+                  'vaccination_date': get_utcnow()}
+        cache = LRUResultCache()
+        validate_many(VaccineDetailsFormValidator, [record], cache=cache)
+        with SubjectContext() as subject_context:
+            self.assertIsNotNone(cache.get(
+                VaccineDetailsFormValidator, record, subject_context=subject_context))
+        self.create_second_dose()
+        with SubjectContext() as subject_context:
+            self.assertIsNone(cache.get(
+                VaccineDetailsFormValidator, record, subject_context=subject_context))
+
+    def test_unknown_subject_visit_not_cached(self):
+        cache = LRUResultCache()
+        record = {'subject_visit': self.subject_visit.pk}
+        self.assertIsNone(cache.key(VaccineDetailsFormValidator, record))
+        with SubjectContext() as subject_context:
+            self.assertIsNotNone(cache.key(
+                VaccineDetailsFormValidator, record, subject_context=subject_context))
+            self.assertIsNone(cache.key(
+                VaccineDetailsFormValidator, {'subject_visit': uuid4()},
+                subject_context=subject_context))
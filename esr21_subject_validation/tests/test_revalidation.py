@@ -0,0 +1,102 @@
+import csv
+import os
+import tempfile
+
+from dateutil.relativedelta import relativedelta
+from django.core.management import call_command
+from django.test import TestCase, override_settings, tag
+from edc_base.utils import get_utcnow
+from edc_constants.constants import YES
+
+from ..constants import FIRST_DOSE
+from ..form_validators import VaccinationHistoryFormValidator
+from ..revalidation import (
+    Checkpoints, partition, revalidate, revalidate_incremental, shard_of)
+from .models import Appointment, SubjectVisit, VaccinationDetails, VaccinationHistory
+
+
+@tag('revalidation')
+@override_settings(ESR21_REVALIDATION_VALIDATORS={
+    'esr21_subject_validation.vaccinationhistory': 'VaccinationHistoryFormValidator'})
+class TestRevalidateCrfs(TestCase):
+
+    def setUp(self):
+        VaccinationHistoryFormValidator.vaccination_details_cls = \
+            'esr21_subject_validation.vaccinationdetails'
+
+        subject_visit = SubjectVisit.objects.create(
+            appointment=Appointment.objects.create(
+                subject_identifier='111111',
+                appt_datetime=get_utcnow(),
+                visit_code='1000',
+                schedule_name='esr21_enrol_schedule'),
+            schedule_name='esr21_enrol_schedule')
+        self.details = VaccinationDetails.objects.create(
+            subject_visit=subject_visit,
+            report_datetime=get_utcnow(),
+            received_dose_before=FIRST_DOSE,
+            vaccination_date=get_utcnow(),
+            next_vaccination_date=(get_utcnow() + relativedelta(days=56)).date())
+
+        # the first dose is in the EDC but not in the history
+        self.history = VaccinationHistory.objects.create(
+            subject_identifier='111111', received_vaccine=YES, dose_quantity='1',
+            dose1_product_name='pfizer', dose1_date=get_utcnow().date())
+        VaccinationHistory.objects.create(
+            subject_identifier='222222', received_vaccine=YES, dose_quantity='1',
+            dose1_product_name='pfizer', dose1_date=get_utcnow().date())
+
+        self.report = os.path.join(tempfile.mkdtemp(), 'report.csv')
+
+    def test_violations_reported(self):
+        call_command(
+            'revalidate_crfs', models=['esr21_subject_validation.vaccinationhistory'],
+            report=self.report, chunk_size=1)
+
+        with open(self.report, newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(
+            [(row['pk'], row['subject_identifier'], row['rule']) for row in rows],
+            [(str(self.history.pk), '111111', 'validate_number_of_doses'),
+             (str(self.history.pk), '111111', 'validate_first_dose')])
+
+    def test_resume_from_checkpoint(self):
+        label = 'esr21_subject_validation.vaccinationhistory'
+        checkpoint = os.path.join(os.path.dirname(self.report), 'checkpoint.db')
+        # the first row was validated before the run stopped
+        Checkpoints(checkpoint).save(label, 0, 1, None, self.history.pk, 0, 1, 0)
+
+        results = revalidate([label], self.report, checkpoint=checkpoint)
+
+        self.assertEqual(results, [(label, 0, 2, 0)])
+        with open(self.report, newline='') as f:
+            self.assertEqual(list(csv.DictReader(f)), [])
+        self.assertFalse(os.path.exists(checkpoint))
+
+    def test_incremental_rechecks_dependants(self):
+        label = 'esr21_subject_validation.vaccinationhistory'
+        watermarks = os.path.join(os.path.dirname(self.report), 'watermarks.db')
+
+        # no watermark yet, every record is revalidated
+        results = revalidate_incremental([label], self.report, watermarks)
+        self.assertEqual(results, [(label, 0, 2, 2)])
+
+        results = revalidate_incremental([label], self.report, watermarks)
+        self.assertEqual(results, [(label, 0, 0, 0)])
+
+        # a changed dose rechecks the subject's history
+        self.details.save()
+        results = revalidate_incremental([label], self.report, watermarks)
+        self.assertEqual(results, [(label, 0, 1, 2)])
+
+    def test_shards_stable(self):
+        self.assertEqual(shard_of('111111', 4), shard_of('111111', 4))
+        self.assertEqual(
+            {shard_of(str(i), 4) for i in range(100)}, {0, 1, 2, 3})
+
+    def test_partition(self):
+        pks = partition(VaccinationHistory, VaccinationHistory.objects.order_by('pk'), 4)
+        self.assertEqual(
+            sorted(pk for shard_pks in pks for pk in shard_pks),
+            sorted(VaccinationHistory.objects.values_list('pk', flat=True)))
+        self.assertIn(self.history.pk, pks[shard_of('111111', 4)])
@@ -0,0 +1,65 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, tag
+from edc_constants.constants import NONE, OTHER
+from edc_form_validators import REQUIRED_ERROR
+
+from ..form_validators import DemographicsDataFormValidator, validate_many
+from ..form_validators.rule_codes import (
+    DEMOGRAPHICS_HOUSEHOLD_MEMBERS_NEGATIVE, ERROR, FIELD_REQUIRED, UNCODED,
+    stable_code)
+
+
+@tag('rule_codes')
+class TestRuleCodes(SimpleTestCase):
+
+    def setUp(self):
+        self.data = {
+            'ethnicity': NONE,
+            'employment_status': NONE,
+            'marital_status': NONE,
+            'household_members': -1}
+
+    def test_raise_validation_error(self):
+        form_validator = DemographicsDataFormValidator(cleaned_data=self.data)
+        with self.assertRaises(ValidationError) as e:
+            form_validator.validate()
+        self.assertIn('household_members', form_validator._errors)
+        self.assertIn(DEMOGRAPHICS_HOUSEHOLD_MEMBERS_NEGATIVE,
+                      form_validator._error_codes)
+        self.assertEqual(
+            e.exception.error_dict['household_members'][0].code,
+            DEMOGRAPHICS_HOUSEHOLD_MEMBERS_NEGATIVE)
+
+    def test_collect_errors(self):
+        rule_errors = DemographicsDataFormValidator(
+            cleaned_data={**self.data, 'ethnicity': OTHER}).collect_errors()
+        self.assertEqual(
+            sorted((rule_error.field, rule_error.code) for rule_error in rule_errors),
+            [('ethnicity_other', FIELD_REQUIRED),
+             ('household_members', DEMOGRAPHICS_HOUSEHOLD_MEMBERS_NEGATIVE)])
+
+    def test_collect_records_without_raising(self):
+        form_validator = DemographicsDataFormValidator(cleaned_data=self.data)
+        form_validator.collect = True
+        form_validator.rule_errors = []
+        form_validator.current_rule = form_validator.validate_household_members
+        self.assertIsNone(form_validator.validate_household_members())
+        self.assertEqual(
+            [(rule_error.rule, rule_error.code) for rule_error in form_validator.rule_errors],
+            [('validate_household_members', DEMOGRAPHICS_HOUSEHOLD_MEMBERS_NEGATIVE)])
+        self.assertIn('household_members', form_validator._errors)
+
+    def test_records(self):
+        result, = validate_many(
+            DemographicsDataFormValidator, [self.data], collect=True)
+        self.assertEqual(
+            result.records,
+            [(DEMOGRAPHICS_HOUSEHOLD_MEMBERS_NEGATIVE, 'household_members', ERROR, {})])
+        json.dumps(result.records)
+
+    def test_stable_code(self):
+        self.assertEqual(stable_code(REQUIRED_ERROR), FIELD_REQUIRED)
+        self.assertEqual(stable_code(None, 'required_if'), FIELD_REQUIRED)
+        self.assertEqual(stable_code(None, 'validate_unknown'), UNCODED)
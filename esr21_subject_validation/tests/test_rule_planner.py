@@ -0,0 +1,57 @@
+from django.core.exceptions import ValidationError
+from django.test import TestCase, tag
+from edc_base.utils import get_utcnow, relativedelta
+from edc_constants.constants import FEMALE
+
+from ..form_validators import InformedConsentFormValidator, refine_rule_costs
+from ..form_validators.instrumentation import InMemoryAggregator, Measurement
+from ..form_validators.rule_planner import reset_rule_costs
+
+
+@tag('rule_planner')
+class TestRulePlanner(TestCase):
+
+    def setUp(self):
+        InformedConsentFormValidator.eligibility_confirmation_model = \
+            'esr21_subject_validation.eligibilityconfirmation'
+        InformedConsentFormValidator.informed_consent_model = \
+            'esr21_subject_validation.informedconsent'
+        self.addCleanup(reset_rule_costs)
+
+        # no eligibility confirmation and an invalid identity
+        self.cleaned_data = {
+            'screening_identifier': 'S0000009',
+            'consent_datetime': get_utcnow(),
+            'dob': (get_utcnow() - relativedelta(years=45)).date(),
+            'identity': 'abc',
+            'confirm_identity': 'abc',
+            'gender': FEMALE}
+
+    def validate(self, **kwargs):
+        form_validator = InformedConsentFormValidator(
+            cleaned_data=self.cleaned_data, **kwargs)
+        with self.assertRaises(ValidationError) as cm:
+            form_validator.validate()
+        return cm.exception
+
+    def test_declared_order_by_default(self):
+        with self.assertNumQueries(1):
+            error = self.validate()
+        self.assertNotIn('identity', getattr(error, 'error_dict', {}))
+
+    def test_cheap_rules_first(self):
+        with self.assertNumQueries(0):
+            error = self.validate(plan=True)
+        self.assertIn('identity', error.error_dict)
+
+    def test_refined_from_measurements(self):
+        aggregator = InMemoryAggregator()
+        aggregator.record(Measurement(
+            'InformedConsentFormValidator', 'validate_identity_number', 0.5, 3, False))
+        aggregator.record(Measurement(
+            'InformedConsentFormValidator', 'validate_consent_dob_valid', 0.001, 0, False))
+        refine_rule_costs(aggregator)
+
+        with self.assertNumQueries(1):
+            error = self.validate(plan=True)
+        self.assertNotIn('identity', getattr(error, 'error_dict', {}))
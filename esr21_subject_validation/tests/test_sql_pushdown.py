@@ -0,0 +1,60 @@
+from dateutil.relativedelta import relativedelta
+from django.core.exceptions import ValidationError
+from django.forms.models import model_to_dict
+from django.test import TestCase, tag
+from edc_base.utils import get_utcnow
+
+from ..form_validators import (
+    AdverseEventRecordFormValidator, VaccinationHistoryFormValidator,
+    find_violations)
+from .models import AdverseEventRecord
+
+
+@tag('pushdown')
+class TestSqlPushdown(TestCase):
+
+    def setUp(self):
+        today = get_utcnow().date()
+        self.stop_before_start = AdverseEventRecord.objects.create(
+            status='resolved', start_date=today,
+            stop_date=today - relativedelta(days=1))
+        self.stop_date_missing = AdverseEventRecord.objects.create(
+            status='resolved', start_date=today, stop_date=None)
+        self.stop_date_not_required = AdverseEventRecord.objects.create(
+            status='ongoing', start_date=today,
+            stop_date=today + relativedelta(days=1))
+        AdverseEventRecord.objects.create(
+            status='resolved', start_date=today,
+            stop_date=today + relativedelta(days=2))
+        AdverseEventRecord.objects.create(
+            status='ongoing', start_date=today, stop_date=None)
+
+    def test_violations_one_query_per_rule(self):
+        violations = find_violations(
+            AdverseEventRecordFormValidator, AdverseEventRecord)
+        with self.assertNumQueries(2):
+            pks = {label: set(qs.values_list('pk', flat=True))
+                   for label, qs in violations.items()}
+        self.assertEqual(pks, {
+            'required_if:status:stop_date': {
+                self.stop_date_missing.pk, self.stop_date_not_required.pk},
+            'validate_ae_end_date': {self.stop_before_start.pk}})
+
+    def test_violations_match_validator(self):
+        violating = set()
+        for qs in find_violations(
+                AdverseEventRecordFormValidator, AdverseEventRecord).values():
+            violating.update(qs.values_list('pk', flat=True))
+        for obj in AdverseEventRecord.objects.all():
+            form_validator = AdverseEventRecordFormValidator(
+                cleaned_data=model_to_dict(obj))
+            try:
+                form_validator.validate_ae_end_date()
+            except ValidationError:
+                self.assertIn(obj.pk, violating)
+            else:
+                self.assertNotIn(obj.pk, violating)
+
+    def test_rules_without_columns_skipped(self):
+        self.assertEqual(
+            find_violations(VaccinationHistoryFormValidator, AdverseEventRecord), {})
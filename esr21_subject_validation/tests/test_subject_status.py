@@ -0,0 +1,148 @@
+from unittest import mock
+
+from dateutil.relativedelta import relativedelta
+from django.core.management import call_command
+from django.test import TestCase, override_settings, tag
+from edc_base.utils import get_utcnow
+from edc_constants.constants import YES
+
+from ..constants import FIRST_DOSE, SECOND_DOSE
+from ..form_validators import (
+    InformedConsentFormValidator, VaccinationHistoryFormValidator,
+    VaccineDetailsFormValidator)
+from ..form_validators.dependency_graph import get_graph
+from ..signals import connected, reconnect_receivers
+from ..subject_status import rebuild_subject_status, update_subject_status
+from .models import (
+    Appointment, EligibilityConfirmation, InformedConsent, SubjectStatus,
+    SubjectVisit, VaccinationDetails, VaccinationHistory)
+
+
+@tag('subject_status')
+@override_settings(ESR21_SUBJECT_STATUS_MODEL='esr21_subject_validation.subjectstatus')
+class TestSubjectStatus(TestCase):
+
+    def setUp(self):
+        InformedConsentFormValidator.eligibility_confirmation_model = \
+            'esr21_subject_validation.eligibilityconfirmation'
+        InformedConsentFormValidator.informed_consent_model = \
+            'esr21_subject_validation.informedconsent'
+        VaccineDetailsFormValidator.vaccination_details_cls = \
+            'esr21_subject_validation.vaccinationdetails'
+        VaccineDetailsFormValidator.vaccination_history_cls = \
+            'esr21_subject_validation.vaccinationhistory'
+        VaccinationHistoryFormValidator.vaccination_details_cls = \
+            'esr21_subject_validation.vaccinationdetails'
+        get_graph.cache_clear()
+        self.addCleanup(get_graph.cache_clear)
+        reconnect_receivers()
+
+        EligibilityConfirmation.objects.create(
+            screening_identifier='S0000001', report_datetime=get_utcnow(),
+            age_in_years=45)
+        self.consent = InformedConsent.objects.create(
+            screening_identifier='S0000001',
+            subject_identifier='111111',
+            dob=(get_utcnow() - relativedelta(years=45)).date())
+        self.first_dose = self.create_dose(FIRST_DOSE, '1000')
+        VaccinationHistory.objects.create(
+            subject_identifier='111111', received_vaccine=YES, dose_quantity='1')
+
+    def create_dose(self, dose, visit_code):
+        subject_visit = SubjectVisit.objects.create(
+            appointment=Appointment.objects.create(
+                subject_identifier='111111',
+                appt_datetime=get_utcnow(),
+                visit_code=visit_code,
+                schedule_name='esr21_enrol_schedule'),
+            schedule_name='esr21_enrol_schedule')
+        return VaccinationDetails.objects.create(
+            subject_visit=subject_visit,
+            report_datetime=get_utcnow(),
+            received_dose_before=dose,
+            vaccination_date=get_utcnow(),
+            next_vaccination_date=(get_utcnow() + relativedelta(days=56)).date())
+
+    def test_status_maintained(self):
+        status = SubjectStatus.objects.get(subject_identifier='111111')
+        self.assertEqual(status.screening_identifier, 'S0000001')
+        self.assertTrue(status.consented)
+        self.assertEqual(status.dob, self.consent.dob)
+        self.assertEqual(status.age_in_years, 45)
+        self.assertEqual(status.dose_count, 1)
+        self.assertEqual(status.dose_quantity, '1')
+
+        second_dose = self.create_dose(SECOND_DOSE, '2000')
+        self.assertEqual(
+            SubjectStatus.objects.get(subject_identifier='111111').vaccination_dates,
+            {FIRST_DOSE: self.first_dose.vaccination_date,
+             SECOND_DOSE: second_dose.vaccination_date})
+
+        second_dose.delete()
+        self.assertEqual(
+            SubjectStatus.objects.get(subject_identifier='111111').dose_count, 1)
+
+    def test_status_receivers_connected_to_source_models_only(self):
+        self.assertEqual(
+            {sender for _, sender, dispatch_uid in connected
+             if dispatch_uid == 'esr21_status_on_post_save'},
+            {EligibilityConfirmation, InformedConsent, VaccinationDetails,
+             VaccinationHistory})
+
+    def test_rebuild(self):
+        SubjectStatus.objects.all().delete()
+        EligibilityConfirmation.objects.create(
+            screening_identifier='S0000002', report_datetime=get_utcnow(),
+            age_in_years=30)
+        SubjectStatus.objects.all().delete()
+
+        call_command('rebuild_subject_status')
+
+        self.assertEqual(
+            list(SubjectStatus.objects.order_by('screening_identifier').values_list(
+                'subject_identifier', 'screening_identifier', 'dose_count')),
+            [('111111', 'S0000001', 1), (None, 'S0000002', 0)])
+
+    def test_rebuild_in_chunks(self):
+        SubjectStatus.objects.all().delete()
+        for i in range(3):
+            EligibilityConfirmation.objects.create(
+                screening_identifier=f'S100000{i}', report_datetime=get_utcnow(),
+                age_in_years=30)
+        # a row of a subject without source rows
+        SubjectStatus.objects.create(subject_identifier='999999')
+
+        self.assertEqual(rebuild_subject_status(chunk_size=2), 4)
+        self.assertEqual(
+            list(SubjectStatus.objects.order_by('screening_identifier').values_list(
+                'subject_identifier', 'screening_identifier', 'dose_count')),
+            [('111111', 'S0000001', 1), (None, 'S1000000', 0),
+             (None, 'S1000001', 0), (None, 'S1000002', 0)])
+
+    def test_row_created_concurrently_retried(self):
+        SubjectStatus.objects.all().delete()
+        save = SubjectStatus.save
+        saves = []
+
+        def save_after_other_save(status, *args, **kwargs):
+            if not saves:
+                # a concurrent save creates the row after it is looked up
+                SubjectStatus.objects.bulk_create([SubjectStatus(subject_identifier='111111')])
+            saves.append(status)
+            save(status, *args, **kwargs)
+
+        with mock.patch.object(
+                SubjectStatus, 'save', autospec=True, side_effect=save_after_other_save):
+            update_subject_status(subject_identifier='111111')
+        self.assertEqual(len(saves), 2)
+        status = SubjectStatus.objects.get(subject_identifier='111111')
+        self.assertEqual(status.screening_identifier, 'S0000001')
+        self.assertEqual(status.dose_count, 1)
+
+    def test_validator_reads_status(self):
+        form_validator = VaccinationHistoryFormValidator(
+            cleaned_data={'subject_identifier': '111111'})
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                form_validator.dose_map,
+                {FIRST_DOSE: self.first_dose.vaccination_date})
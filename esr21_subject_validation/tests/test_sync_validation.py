@@ -0,0 +1,50 @@
+from django.test import TestCase, override_settings, tag
+from edc_base.utils import get_utcnow, relativedelta
+from edc_constants.constants import FEMALE, YES
+
+from ..form_validators import InformedConsentFormValidator
+from ..sync_validation import sync_order, validate_sync
+from .models import EligibilityConfirmation, InformedConsent
+
+consent_model = 'esr21_subject_validation.informedconsent'
+eligibility_model = 'esr21_subject_validation.eligibilityconfirmation'
+
+
+@tag('sync_validation')
+@override_settings(ESR21_REVALIDATION_VALIDATORS={
+    consent_model: 'InformedConsentFormValidator'})
+class TestSyncValidation(TestCase):
+
+    def setUp(self):
+        InformedConsentFormValidator.eligibility_confirmation_model = eligibility_model
+        InformedConsentFormValidator.informed_consent_model = consent_model
+
+        self.eligibility = {
+            'screening_identifier': 'S12345',
+            'report_datetime': get_utcnow(),
+            'age_in_years': 45}
+        self.consent = {
+            'screening_identifier': 'S12345',
+            'subject_identifier': '123-9871',
+            'consent_datetime': get_utcnow(),
+            'dob': (get_utcnow() - relativedelta(years=45)).date(),
+            'identity': '123425678',
+            'confirm_identity': '123425678',
+            'gender': FEMALE,
+            'is_literate': YES}
+
+    def test_consent_ordered_after_eligibility(self):
+        self.assertEqual(
+            sync_order([consent_model, eligibility_model]),
+            [eligibility_model, consent_model])
+
+    def test_consent_reads_pending_eligibility(self):
+        results = validate_sync([
+            (consent_model, self.consent), (eligibility_model, self.eligibility)])
+        self.assertEqual([result.errors for result in results], [{}, {}])
+        self.assertFalse(EligibilityConfirmation.objects.exists())
+        self.assertFalse(InformedConsent.objects.exists())
+
+    def test_consent_without_eligibility(self):
+        result, = validate_sync([(consent_model, self.consent)])
+        self.assertIn('Eligibility Confirmation', str(result.errors))
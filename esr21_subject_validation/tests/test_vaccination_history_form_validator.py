@@ -193,3 +193,23 @@ class TestVaccinationHistoryFormValidator(TestCase):
         self.assertIn('dose2_date', form_validator._errors)
         
        
+
+    def test_deprecated_dose_helpers(self):
+        first_dose = VaccinationDetails.objects.create(
+            subject_visit=self.visit_1000,
+            report_datetime=get_utcnow(),
+            received_dose_before=FIRST_DOSE,
+            vaccination_date=get_utcnow(),
+            next_vaccination_date=(get_utcnow() + relativedelta(days=56)).date())
+
+        form_validator = VaccinationHistoryFormValidator(
+            cleaned_data={'subject_identifier': self.subject_identifier})
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(
+                form_validator.dose_received(self.subject_identifier, FIRST_DOSE),
+                first_dose)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(
+                form_validator.vaccination_details_objs(self.subject_identifier).count(), 1)
+        self.assertEqual(
+            form_validator.dose_date(FIRST_DOSE), first_dose.vaccination_date)
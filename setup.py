@@ -15,7 +15,8 @@ setup(
     version='0.1.26',
     author=u'Software Engineering & Data Management',
     author_email='se-dmc@bhp.org.bw',
-    packages=find_packages(),
+    packages=find_packages(exclude=[
+        'esr21_subject_validation.tests', 'esr21_subject_validation.tests.*']),
     include_package_data=True,
     url='https://github.com/covid19-vaccine/esr21-subject-validation',
     license='GPL license, see LICENSE',